@@ -1,14 +1,33 @@
-from .core.cognitive_core import CognitiveCore
-from .web.create_cognitive_app import create_cognitive_app
-from .plugins.cognitive_core_plugin_default_memory_manager import (
-    CognitiveCorePluginDefaultMemoryManager,
-)
-from .core.plugin_interfaces import MemoryManagerPlugin
+from typing import TYPE_CHECKING
+from .utils.lazy_import import lazy_import
 
 __version__ = "0.1.0"
+
+if TYPE_CHECKING:
+    from .core.cognitive_core import CognitiveCore
+    from .core.session_manager import SessionManager
+    from .web.create_cognitive_app import create_cognitive_app
+    from .plugins.cognitive_core_plugin_default_memory_manager import (
+        CognitiveCorePluginDefaultMemoryManager,
+    )
+    from .core.plugin_interfaces import MemoryManagerPlugin
+
 __all__ = [
     "CognitiveCore",
+    "SessionManager",
     "create_cognitive_app",
     "MemoryManagerPlugin",
     "CognitiveCorePluginDefaultMemoryManager",
 ]
+
+# 按需导入，只在第一次访问时加载对应模块
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "CognitiveCore": ".core.cognitive_core",
+        "SessionManager": ".core.session_manager",
+        "create_cognitive_app": ".web.create_cognitive_app",
+        "CognitiveCorePluginDefaultMemoryManager": ".plugins.cognitive_core_plugin_default_memory_manager",
+        "MemoryManagerPlugin": ".core.plugin_interfaces",
+    },
+)
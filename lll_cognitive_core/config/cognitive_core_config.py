@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -7,3 +8,80 @@ class CognitiveCoreConfig:
     episodic_memories_direct_threshold: int = 5
     # 一次循环最多执行多少次事件
     max_processed_count_on_loop: int = 10
+    # 情景记忆缓存最多保留多少条，0 表示不限制
+    episodic_cache_max_count: int = 2000
+    # 情景记忆缓存估算占用的最大字节数，0 表示不限制
+    episodic_cache_max_bytes: int = 32 * 1024 * 1024
+    # 记忆查询方式 keyword 关键词匹配 semantic 向量语义检索
+    memory_query_mode: str = "keyword"
+    # 语义检索最多返回多少条记忆
+    semantic_query_top_k: int = 20
+    # 关键词前缀匹配的最短查询长度，0 表示不使用前缀匹配；同时应用于记忆缓存和记忆管理插件的词典
+    keyword_prefix_min_length: int = 0
+    # 关键词模糊匹配允许的最大编辑距离，0 表示不使用模糊匹配；同时应用于记忆缓存和记忆管理插件的词典
+    keyword_fuzzy_max_edits: int = 0
+    # 排序后最多保留多少条记忆进入回想和行为生成，0 表示不限制；与token预算都为 0 时不排序
+    ranked_memories_top_k: int = 0
+    # 排序后记忆内容的token预算，0 表示不限制
+    ranked_memories_token_budget: int = 0
+    # 联想回忆结果缓存的最大条目数，0 表示不缓存
+    recall_cache_size: int = 256
+    # 距上次浅度整理处理了多少事件后触发后台浅度整理，0 表示不使用
+    light_consolidation_event_count: int = 0
+    # 认知负荷达到多少时触发后台浅度整理，0 表示不使用
+    light_consolidation_cognitive_load: float = 0.0
+    # 按认知负荷触发时，距上次浅度整理至少需要处理的事件数，避免整理后负荷仍高时反复触发
+    light_consolidation_load_min_events: int = 10
+    # 距上次浅度整理多少秒后触发后台浅度整理，0 表示不使用
+    light_consolidation_interval: float = 0.0
+    # 记忆提取时每个事件窗口的token预算，0 表示不按token切分
+    extraction_window_tokens: int = 3000
+    # 记忆提取时每个事件窗口的最大时间跨度(秒)，0 表示不按时间切分
+    extraction_window_seconds: float = 0.0
+    # 相邻事件窗口重叠的事件数
+    extraction_window_overlap: int = 3
+    # 并发提取记忆的最大线程数
+    extraction_max_workers: int = 4
+    # 工作记忆快照文件路径，可以包含 {session_id}，为空时不保存快照
+    snapshot_path: Optional[str] = None
+    # 定期保存快照的间隔(秒)，0 表示只在退出时保存
+    snapshot_interval: float = 60.0
+    # 状态快照的最短发布间隔(秒)
+    status_publish_interval: float = 0.5
+    # 事件预写日志路径，可以包含 {session_id}，为空时不记录
+    event_log_path: Optional[str] = None
+    # 接收事件时是否等待日志写入磁盘
+    event_log_sync: bool = True
+    # 行为生成插件支持时流式生成，每个动作解析完成后立即执行
+    # 需要模型服务同时支持 stream 和 json_object 输出格式，默认关闭，确认服务支持后再开启
+    behavior_streaming: bool = False
+    # Orchestrator 地址，为空时行为只记录到工作记忆不发送
+    orchestrator_url: Optional[str] = None
+    # 接收行为动作的接口路径
+    orchestrator_path: str = "/actions"
+    # 发送线程数，每个线程持有一个长连接
+    action_dispatch_workers: int = 2
+    # 待发送队列长度，队列满时丢弃新动作
+    action_queue_size: int = 1000
+    # 同一会话同一目标模块每批最多合并的动作数
+    action_batch_size: int = 16
+    # 发送失败的最大重试次数
+    action_max_retries: int = 3
+    # 请求超时(秒)
+    orchestrator_timeout: float = 5.0
+    # 快速路径规则，在记忆查询和行为生成之前匹配，可参考 DEFAULT_FAST_PATH_RULES
+    fast_path_rules: List[Dict[str, Any]] = field(default_factory=list)
+    # 暂存的事件达到多少个时批量生成一次行为
+    fast_path_defer_batch_size: int = 10
+    # 暂存的事件最多等待多久(秒)
+    fast_path_defer_max_wait: float = 5.0
+    # 事件队列积压达到多少时批量理解，0 表示不批量
+    batch_understanding_threshold: int = 0
+    # 每次批量理解最多包含多少个事件
+    batch_understanding_size: int = 8
+    # 每个会话的 token 预算，超出后改走更便宜的路径，0 表示不限制
+    session_token_budget: int = 0
+    # 每个会话的费用预算，按 model_prices 计算，0 表示不限制
+    session_cost_budget: float = 0.0
+    # 模型每千 token 的价格 {模型名: [输入价格, 输出价格]}
+    model_prices: Dict[str, List[float]] = field(default_factory=dict)
@@ -1,15 +1,86 @@
-from .cache_memory_manager import CacheMemoryManager
-from .plugin_interfaces import (
-    AssociativeRecallPlugin,
-    BehaviorGenerationPlugin,
-    MemoryManagerPlugin,
-)
-from .data_structures import CoreStatus
+from typing import TYPE_CHECKING
+from ..utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from .cache_memory_manager import CacheMemoryManager
+    from .posting_list import PostingList
+    from .keyword_dictionary import KeywordDictionary
+    from .embedding_index import (
+        EmbeddingIndex,
+        HashingEmbedder,
+    )
+    from .memory_ranker import MemoryRanker
+    from .recall_cache import RecallCache
+    from .consolidation_scheduler import ConsolidationScheduler
+    from .fair_worker_pool import FairWorkerPool
+    from .snapshot_store import SnapshotStore
+    from .event_log import EventLog
+    from .status_publisher import StatusPublisher
+    from .action_dispatcher import ActionDispatcher
+    from .fast_path_rules import (
+        DEFAULT_FAST_PATH_RULES,
+        FastPathEngine,
+        FastPathRule,
+    )
+    from .understanding_classifier import UnderstandingClassifier
+    from .session_manager import SessionManager
+    from .plugin_interfaces import (
+        AssociativeRecallPlugin,
+        BehaviorGenerationPlugin,
+        MemoryManagerPlugin,
+    )
+    from .data_structures import CoreStatus
 
 __all__ = [
     "CacheMemoryManager",
+    "PostingList",
+    "KeywordDictionary",
+    "EmbeddingIndex",
+    "HashingEmbedder",
+    "MemoryRanker",
+    "RecallCache",
+    "ConsolidationScheduler",
+    "FairWorkerPool",
+    "SnapshotStore",
+    "EventLog",
+    "StatusPublisher",
+    "ActionDispatcher",
+    "DEFAULT_FAST_PATH_RULES",
+    "FastPathEngine",
+    "FastPathRule",
+    "UnderstandingClassifier",
+    "SessionManager",
     "AssociativeRecallPlugin",
     "BehaviorGenerationPlugin",
     "MemoryManagerPlugin",
     "CoreStatus",
 ]
+
+# 按需导入，只在第一次访问时加载对应模块
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "CacheMemoryManager": ".cache_memory_manager",
+        "PostingList": ".posting_list",
+        "KeywordDictionary": ".keyword_dictionary",
+        "EmbeddingIndex": ".embedding_index",
+        "HashingEmbedder": ".embedding_index",
+        "MemoryRanker": ".memory_ranker",
+        "RecallCache": ".recall_cache",
+        "ConsolidationScheduler": ".consolidation_scheduler",
+        "FairWorkerPool": ".fair_worker_pool",
+        "SnapshotStore": ".snapshot_store",
+        "EventLog": ".event_log",
+        "StatusPublisher": ".status_publisher",
+        "ActionDispatcher": ".action_dispatcher",
+        "DEFAULT_FAST_PATH_RULES": ".fast_path_rules",
+        "FastPathEngine": ".fast_path_rules",
+        "FastPathRule": ".fast_path_rules",
+        "UnderstandingClassifier": ".understanding_classifier",
+        "SessionManager": ".session_manager",
+        "AssociativeRecallPlugin": ".plugin_interfaces",
+        "BehaviorGenerationPlugin": ".plugin_interfaces",
+        "MemoryManagerPlugin": ".plugin_interfaces",
+        "CoreStatus": ".data_structures",
+    },
+)
@@ -0,0 +1,254 @@
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import http.client
+import urllib.parse
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from ..config.cognitive_core_config import CognitiveCoreConfig
+
+# 队列中的一条待发送动作: (会话ID, 目标模块, 动作数据, 入队时间)
+_PendingAction = Tuple[str, str, Dict[str, Any], float]
+
+# 可以重试的错误状态码，其他错误状态直接放弃
+_RETRYABLE_STATUS = frozenset((408, 425, 429, 500, 502, 503, 504))
+
+
+class ActionDispatcher:
+    """
+    行为动作异步发送器
+    动作先进入有界队列，发送线程各自持有一个长连接，按 (会话, 目标模块) 合并成批发送到 Orchestrator，
+    失败时按带抖动的指数退避重试，处理循环只负责入队，不会被网络阻塞
+    每个发送线程有自己的队列，同一会话的动作总由同一个线程按顺序发送
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        path: str = "/actions",
+        num_workers: int = 2,
+        queue_size: int = 1000,
+        batch_size: int = 16,
+        batch_wait: float = 0.005,
+        max_retries: int = 3,
+        retry_backoff: float = 0.1,
+        timeout: float = 5.0,
+        latency_window: int = 1000,
+    ):
+        parsed = urllib.parse.urlsplit(base_url)
+        self._scheme = parsed.scheme or "http"
+        self._host = parsed.hostname or "127.0.0.1"
+        self._port = parsed.port
+        self.path = parsed.path.rstrip("/") + path
+
+        self.num_workers = num_workers
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+
+        # 每个发送线程一个队列，元素为 _PendingAction，None 表示让发送线程退出
+        worker_queue_size = max(1, -(-queue_size // max(1, num_workers)))
+        self._queues: List[queue.Queue] = [
+            queue.Queue(maxsize=worker_queue_size) for _ in range(num_workers)
+        ]
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._closed = False
+
+        self.stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "sent_actions": 0,
+            "sent_batches": 0,
+            "failed_actions": 0,
+            "retries": 0,
+            "reconnects": 0,
+        }
+
+        self.logger = logging.getLogger("ActionDispatcher")
+
+        self._threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(worker_queue,),
+                name=f"action-dispatcher-{i}",
+                daemon=True,
+            )
+            for i, worker_queue in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def dispatch(self, session_id: str, action: Any, target: str = None) -> bool:
+        """动作入队，队列已满时丢弃并返回 False"""
+        if self._closed:
+            return False
+
+        data = (
+            action.model_dump(mode="json") if hasattr(action, "model_dump") else action
+        )
+        target = target or data.get("type", "default")
+        # 按会话选择队列，同一会话的动作不会被不同线程并发发送而乱序
+        worker_queue = self._queues[hash(session_id) % len(self._queues)]
+        try:
+            worker_queue.put_nowait((session_id, target, data, time.time()))
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+            return False
+
+        with self._lock:
+            self.stats["enqueued"] += 1
+        return True
+
+    def shutdown(self, wait: bool = True, timeout: float = None):
+        """停止接收新动作，发送完队列中剩余的动作后退出"""
+        if self._closed:
+            return
+        self._closed = True
+
+        for worker_queue in self._queues:
+            worker_queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self.stats)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        return {
+            **stats,
+            "queued": sum(worker_queue.qsize() for worker_queue in self._queues),
+            "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        connection_class = (
+            http.client.HTTPSConnection
+            if self._scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_class(self._host, self._port, timeout=self.timeout)
+
+    def _worker(self, worker_queue: queue.Queue):
+        connection = self._new_connection()
+        try:
+            while True:
+                item = worker_queue.get()
+                if item is None:
+                    return
+
+                # 短暂等待凑批，最多 batch_size 条
+                pending = [item]
+                stop = False
+                deadline = time.time() + self.batch_wait
+                while len(pending) < self.batch_size:
+                    try:
+                        next_item = worker_queue.get(
+                            timeout=max(0.0, deadline - time.time())
+                        )
+                    except queue.Empty:
+                        break
+                    if next_item is None:
+                        stop = True
+                        break
+                    pending.append(next_item)
+
+                batches: Dict[Tuple[str, str], List[_PendingAction]] = {}
+                for pending_action in pending:
+                    batches.setdefault(pending_action[:2], []).append(pending_action)
+
+                for (session_id, target), batch in batches.items():
+                    connection = self._send_batch(connection, session_id, target, batch)
+
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def _send_batch(
+        self,
+        connection: http.client.HTTPConnection,
+        session_id: str,
+        target: str,
+        batch: List[_PendingAction],
+    ) -> http.client.HTTPConnection:
+        body = json.dumps(
+            {
+                "session_id": session_id,
+                "target": target,
+                "actions": [data for _, _, data, _ in batch],
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(
+                    self.retry_backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                )
+
+            try:
+                connection.request(
+                    "POST",
+                    self.path,
+                    body=body,
+                    headers={"Content-Type": "application/json"},
+                )
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as e:
+                # 连接断开或超时，重建连接后重试
+                self.logger.warning(f"发送动作失败: {e}")
+                connection.close()
+                connection = self._new_connection()
+                with self._lock:
+                    self.stats["reconnects"] += 1
+                continue
+
+            if response.status < 300:
+                now = time.time()
+                with self._lock:
+                    self.stats["sent_actions"] += len(batch)
+                    self.stats["sent_batches"] += 1
+                    self._latencies.extend(now - enqueued for *_, enqueued in batch)
+                return connection
+
+            self.logger.warning(f"Orchestrator 返回错误状态: {response.status}")
+            if response.status not in _RETRYABLE_STATUS:
+                break
+
+        with self._lock:
+            self.stats["failed_actions"] += len(batch)
+        return connection
+
+
+def create_action_dispatcher(config: CognitiveCoreConfig) -> ActionDispatcher:
+    """按配置创建发送器"""
+    return ActionDispatcher(
+        config.orchestrator_url,
+        path=config.orchestrator_path,
+        num_workers=config.action_dispatch_workers,
+        queue_size=config.action_queue_size,
+        batch_size=config.action_batch_size,
+        max_retries=config.action_max_retries,
+        timeout=config.orchestrator_timeout,
+    )
@@ -1,50 +1,125 @@
-from typing import List, Dict
-from datetime import datetime
+import heapq
+import math
+import time
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
 from lll_simple_ai_shared import EpisodicMemoriesModels
 from .data_structures import EpisodicMemory
+from .embedding_index import EmbeddingIndex
+from .posting_list import PostingList
+from .keyword_dictionary import KeywordDictionary
 from .plugin_interfaces import MemoryManagerPlugin
 
+# 每条缓存记忆的固定开销估算(模型对象、索引项等)
+MEMORY_BASE_BYTES = 512
+
 
 class CacheMemoryManager(MemoryManagerPlugin):
-    def __init__(self):
+    def __init__(
+        self,
+        max_count: int = 0,
+        max_bytes: int = 0,
+        importance_weight: float = 0.5,
+        access_weight: float = 0.3,
+        recency_weight: float = 0.2,
+        half_life_seconds: float = 3600.0,
+        low_water_ratio: float = 0.9,
+        embedding_dim: int = 256,
+        keyword_dictionary: KeywordDictionary = None,
+    ):
         self.episodic_memory = EpisodicMemory()
 
+        # 关键词词典，关键词索引的键为其中的词项ID；传入的词典可能与记忆管理插件共享
+        self.keyword_dictionary = (
+            KeywordDictionary() if keyword_dictionary is None else keyword_dictionary
+        )
+        self._owns_keyword_dictionary = keyword_dictionary is None
+
+        # 语义检索的向量索引，只存在于内存中
+        self.embedding_index = EmbeddingIndex(embedding_dim)
+
+        # 缓存预算，0 表示不限制
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+
+        # 淘汰策略权重
+        self.importance_weight = importance_weight
+        self.access_weight = access_weight
+        self.recency_weight = recency_weight
+        self.half_life_seconds = half_life_seconds
+        # 触发淘汰后一次清理到预算的多少比例，避免每次写入都淘汰
+        self.low_water_ratio = low_water_ratio
+
+        self._last_access: Dict[str, float] = {}
+        self._memory_bytes: Dict[str, int] = {}
+        self.total_bytes = 0
+
+        self.eviction_stats = {
+            "evictions": 0,
+            "evicted_bytes": 0,
+            "eviction_runs": 0,
+            "last_eviction_time": None,
+        }
+
     def query_episodic_memories(
-        self, date_range, importance_min=0, keywords=None, associations=None
+        self,
+        date_range,
+        importance_min=0,
+        keywords=None,
+        associations=None,
+        mode: str = "keyword",
+        query_text: Optional[str] = None,
+        top_k: int = 20,
     ) -> List[EpisodicMemoriesModels]:
         """
         多维度记忆查询
         支持时间范围、重要性过滤、关键词和联想词查询
+        mode 为 semantic 时按向量相似度返回前 top_k 条
         """
         try:
             # 解析时间范围
             start_date, end_date = self.parse_date_range(date_range)
 
-            # 通过time_index.json快速筛选相关日期
+            # 日期字符串为YYYY-MM-DD格式，可以直接按字符串比较
+            start_str = start_date.strftime("%Y-%m-%d")
+            end_str = end_date.strftime("%Y-%m-%d")
+
+            if mode == "semantic":
+                return self._query_semantic(
+                    query_text or " ".join((keywords or []) + (associations or [])),
+                    start_str,
+                    end_str,
+                    importance_min or 0,
+                    top_k,
+                )
+
             time_index = self.episodic_memory.time_index
             keyword_index = self.episodic_memory.keyword_index
 
-            idList: List[str] = []
             episodic_memories: List[EpisodicMemoriesModels] = []
 
-            for date_str, dateIdList in time_index.items():
-                current_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-
-                # 时间范围过滤
-                if not (start_date <= current_date <= end_date):
-                    continue
-
-                idList.extend(dateIdList)
+            # 时间范围过滤
+            matched: List[PostingList] = [
+                date_id_list
+                for date_str, date_id_list in time_index.items()
+                if start_str <= date_str <= end_str
+            ]
 
+            # 关键词规范化后查词典，包括前缀和模糊匹配到的词项
             if keywords is not None:
-                for keyword, keywordIdList in keyword_index.items():
-                    if keyword in keywords:
-                        idList = list(dict.fromkeys(idList + keywordIdList))
+                for term_id in self.keyword_dictionary.lookup_all(keywords):
+                    keyword_id_list = keyword_index.get(term_id)
+                    if keyword_id_list:
+                        matched.append(keyword_id_list)
 
+            idList = PostingList.union(*matched)
+
+            now = time.time()
             for id in idList:
                 memory = self.episodic_memory.episodic_memories.get(id, None)
                 if memory is not None:
                     episodic_memories.append(memory)
+                    self._last_access[id] = now
 
             return episodic_memories
         except Exception as e:
@@ -64,27 +139,43 @@ class CacheMemoryManager(MemoryManagerPlugin):
         )
 
         # 处理每个日期的记忆文件
+        now = time.time()
         for memory in episodic_memories:
+            existing = self.episodic_memory.episodic_memories.get(memory.id)
+            if existing is not None:
+                # 覆盖旧记忆前先移除旧的索引项，避免残留
+                self._remove_from_indexes(existing)
+                self.total_bytes -= self._memory_bytes.get(memory.id, 0)
+
             self.episodic_memory.episodic_memories[memory.id] = memory
+            size = self.estimate_memory_bytes(memory)
+            self._memory_bytes[memory.id] = size
+            self.total_bytes += size
+            self._last_access[memory.id] = now
 
         # 更新索引
         time_index = self.episodic_memory.time_index
         keyword_index = self.episodic_memory.keyword_index
+        keyword_dictionary = self.keyword_dictionary
 
         for date_str, memories in memories_by_date.items():
             if date_str not in time_index:
-                time_index[date_str] = []
-
-            memory_ids = [memory.id for memory in memories]
-            time_index[date_str].extend(memory_ids)
-            time_index[date_str] = list(dict.fromkeys(time_index[date_str]))
+                time_index[date_str] = PostingList()
+            time_index[date_str].update(memory.id for memory in memories)
 
             for memory in memories:
                 for keyword in memory.keywords:
-                    if keyword not in keyword_index:
-                        keyword_index[keyword] = []
-                    if memory.id not in keyword_index[keyword]:
-                        keyword_index[keyword].append(memory.id)
+                    term_id = keyword_dictionary.intern(keyword)
+                    if term_id is None:
+                        continue
+                    if term_id not in keyword_index:
+                        keyword_index[term_id] = PostingList()
+                    keyword_index[term_id].add(memory.id)
+
+        # 增量更新向量索引
+        self.embedding_index.add_memories(episodic_memories)
+
+        self._evict_if_needed()
 
     def group_memories_by_date(
         self, memories: List[EpisodicMemoriesModels]
@@ -105,7 +196,16 @@ class CacheMemoryManager(MemoryManagerPlugin):
 
     def parse_date_range(self, date_range):
         """解析时间范围，支持多种格式"""
-        if isinstance(date_range, list) and len(date_range) == 2:
+        if (
+            isinstance(date_range, list)
+            and len(date_range) == 2
+            and all(isinstance(days, int) for days in date_range)
+        ):
+            # [起始天数, 结束天数] 格式，按距今天数计算，如[0, 7]表示最近7天
+            today = datetime.now().date()
+            start_date = today - timedelta(days=max(date_range))
+            end_date = today - timedelta(days=min(date_range))
+        elif isinstance(date_range, list) and len(date_range) == 2:
             # [起始日期, 结束日期] 格式
             start_date = datetime.strptime(date_range[0], "%Y-%m-%d").date()
             end_date = datetime.strptime(date_range[1], "%Y-%m-%d").date()
@@ -116,7 +216,142 @@ class CacheMemoryManager(MemoryManagerPlugin):
 
         return start_date, end_date
 
+    def estimate_memory_bytes(self, memory: EpisodicMemoriesModels) -> int:
+        """粗略估算单条记忆占用的字节数"""
+        size = MEMORY_BASE_BYTES + len(memory.id) + len(memory.content) * 2
+        # 向量索引中的一行
+        size += self.embedding_index.dim * 4
+        for text in memory.keywords + memory.associations + memory.entities:
+            size += len(text) * 2 + 64
+        return size
+
+    def evict(self, memory_id: str) -> bool:
+        """淘汰单条记忆，同时从关键词索引和时间索引中移除"""
+        memory = self.episodic_memory.episodic_memories.pop(memory_id, None)
+        if memory is None:
+            return False
+
+        self._remove_from_indexes(memory)
+        self.embedding_index.remove(memory_id)
+
+        size = self._memory_bytes.pop(memory_id, 0)
+        self._last_access.pop(memory_id, None)
+        self.total_bytes -= size
+
+        self.eviction_stats["evictions"] += 1
+        self.eviction_stats["evicted_bytes"] += size
+        return True
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """缓存占用与淘汰统计"""
+        return {
+            "memory_count": len(self.episodic_memory.episodic_memories),
+            "estimated_bytes": self.total_bytes,
+            "max_count": self.max_count,
+            "max_bytes": self.max_bytes,
+            "keyword_terms": len(self.keyword_dictionary),
+            **self.eviction_stats,
+        }
+
+    def _query_semantic(
+        self,
+        query_text: str,
+        start_str: str,
+        end_str: str,
+        importance_min: int,
+        top_k: int,
+    ) -> List[EpisodicMemoriesModels]:
+        """向量检索"""
+        memories = self.episodic_memory.episodic_memories
+        now = time.time()
+
+        results: List[EpisodicMemoriesModels] = []
+        for memory_id, _ in self.embedding_index.search(
+            query_text, top_k, start_str, end_str
+        ):
+            memory = memories.get(memory_id)
+            if memory is None or memory.importance < importance_min:
+                continue
+            results.append(memory)
+            self._last_access[memory_id] = now
+
+        return results
+
+    def _remove_from_indexes(self, memory: EpisodicMemoriesModels):
+        time_index = self.episodic_memory.time_index
+        keyword_index = self.episodic_memory.keyword_index
+
+        date_str = memory.timestamp.strftime("%Y-%m-%d")
+        date_id_list = time_index.get(date_str)
+        if date_id_list is not None:
+            date_id_list.discard(memory.id)
+            if not date_id_list:
+                del time_index[date_str]
+
+        for keyword in memory.keywords:
+            term_id = self.keyword_dictionary.get_id(keyword)
+            keyword_id_list = keyword_index.get(term_id)
+            if keyword_id_list is not None:
+                keyword_id_list.discard(memory.id)
+                if not keyword_id_list:
+                    del keyword_index[term_id]
+
+    def _over_budget(self, count_limit: float, bytes_limit: float) -> bool:
+        count = len(self.episodic_memory.episodic_memories)
+        if self.max_count and count > count_limit:
+            return True
+        if self.max_bytes and self.total_bytes > bytes_limit:
+            return True
+        return False
+
+    def _evict_if_needed(self):
+        """
+        超出预算时按保留分数从低到高淘汰，直到低于低水位
+        只需要取出分数最低的少量记忆，建堆后逐个弹出，不对全部记忆排序
+        """
+        if not self._over_budget(self.max_count, self.max_bytes):
+            return
+
+        now = time.time()
+        heap = [
+            (self._retention_score(memory, now), memory_id)
+            for memory_id, memory in self.episodic_memory.episodic_memories.items()
+        ]
+        heapq.heapify(heap)
+
+        count_limit = self.max_count * self.low_water_ratio
+        bytes_limit = self.max_bytes * self.low_water_ratio
+
+        while heap and self._over_budget(count_limit, bytes_limit):
+            _, memory_id = heapq.heappop(heap)
+            self.evict(memory_id)
+
+        self.eviction_stats["eviction_runs"] += 1
+        self.eviction_stats["last_eviction_time"] = now
+
+    def _retention_score(self, memory: EpisodicMemoriesModels, now: float) -> float:
+        """保留分数，综合重要性、最近访问和记忆发生时间"""
+        decay = math.log(2) / self.half_life_seconds
+
+        importance = max(0, min(memory.importance or 0, 100)) / 100
+        last_access = self._last_access.get(memory.id, 0.0)
+        access = math.exp(-decay * max(0.0, now - last_access))
+        recency = math.exp(-decay * max(0.0, now - memory.timestamp.timestamp()))
+
+        return (
+            self.importance_weight * importance
+            + self.access_weight * access
+            + self.recency_weight * recency
+        )
+
     def clear(self):
         self.episodic_memory.episodic_memories.clear()
         self.episodic_memory.keyword_index.clear()
+        # 共享的词典中还有其他索引引用的词项ID，只清空自己创建的词典
+        if self._owns_keyword_dictionary:
+            self.keyword_dictionary.clear()
         self.episodic_memory.time_index.clear()
+        self.embedding_index.clear()
+        self._last_access.clear()
+        self._memory_bytes.clear()
+        self.total_bytes = 0
@@ -1,7 +1,9 @@
 import time
 import threading
+import itertools
+import contextvars
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from lll_simple_ai_shared import (
     UnderstoodData,
     RecallResultsModels,
@@ -13,9 +15,29 @@ from lll_simple_ai_shared import (
 
 import queue
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from ..config.cognitive_core_config import CognitiveCoreConfig
 from .cache_memory_manager import CacheMemoryManager
+from .keyword_dictionary import KeywordDictionary
+from .memory_ranker import MemoryRanker
+from .recall_cache import RecallCache
+from .consolidation_scheduler import ConsolidationScheduler
+from .event_windows import split_event_windows
+from .fair_worker_pool import FairWorkerPool
+from .fast_path_rules import FAST_PATH_CANNED, FAST_PATH_DEFER, FastPathEngine
+from .action_dispatcher import ActionDispatcher, create_action_dispatcher
+from ..utils.model_router import ModelRouter
+from ..utils.usage_tracker import UsageTracker, usage_scope
+from .event_log import EventLog
+from .status_publisher import StatusPublisher, StatusSnapshot
+from .snapshot_store import (
+    SnapshotStore,
+    dump_episodic_memories,
+    dump_working_memory,
+    load_episodic_memories,
+    load_working_memory,
+)
 from .data_structures import *
 from .plugin_interfaces import (
     EventUnderstandingPlugin,
@@ -24,6 +46,16 @@ from .plugin_interfaces import (
     MemoryManagerPlugin,
 )
 
+# 快照中保存并在恢复时还原的统计项
+SNAPSHOT_STATS_KEYS = (
+    "events_processed",
+    "memory_consolidations",
+    "average_processing_time",
+    "last_deep_consolidation",
+    "last_light_consolidation",
+    "memories_ranked_out",
+)
+
 
 class CognitiveCore:
     """
@@ -31,11 +63,57 @@ class CognitiveCore:
     负责协调所有AI插件，维护记忆系统，生成智能行为
     """
 
-    def __init__(self, config: CognitiveCoreConfig = None):
+    def __init__(
+        self,
+        config: CognitiveCoreConfig = None,
+        session_id: str = "default",
+        worker_pool: Optional[FairWorkerPool] = None,
+        extraction_executor: Optional[ThreadPoolExecutor] = None,
+        action_dispatcher: Optional[ActionDispatcher] = None,
+        model_router: Optional[ModelRouter] = None,
+        usage_tracker: Optional[UsageTracker] = None,
+    ):
+        config = config or CognitiveCoreConfig()
+        self.config = config
+
+        # 行为动作发送到 Orchestrator，多会话托管时由 SessionManager 传入共享的发送器
+        self._owns_action_dispatcher = False
+        if action_dispatcher is None and config.orchestrator_url:
+            action_dispatcher = create_action_dispatcher(config)
+            self._owns_action_dispatcher = True
+        self.action_dispatcher = action_dispatcher
+
+        # 插件使用 ModelRouter 时由核心上报认知负荷和排队事件数
+        self.model_router = model_router
+
+        # 模型调用用量，多会话托管时由 SessionManager 传入共享的统计器
+        self._owns_usage_tracker = usage_tracker is None
+        self.usage_tracker = usage_tracker or UsageTracker(
+            model_prices=config.model_prices,
+            session_token_budget=config.session_token_budget,
+            session_cost_budget=config.session_cost_budget,
+        )
+
+        # 多会话托管时由 SessionManager 传入共享线程池，此时不再创建独立的处理线程
+        self.session_id = session_id
+        self.worker_pool = worker_pool
+        self._tick_lock = threading.Lock()
+        self._tick_scheduled = False
+        # 已提交的定时迭代的到期时间，没有新事件时由它处理到期的工作
+        self._timed_tick_due: Optional[float] = None
+
         # 运行时记忆
         self.working_memory = WorkingMemory()
 
-        self.episodic_memory_manager = CacheMemoryManager()  # 活跃情景记忆缓存
+        # 活跃情景记忆缓存
+        self.episodic_memory_manager = CacheMemoryManager(
+            max_count=config.episodic_cache_max_count,
+            max_bytes=config.episodic_cache_max_bytes,
+            keyword_dictionary=KeywordDictionary(
+                prefix_min_length=config.keyword_prefix_min_length,
+                fuzzy_max_edits=config.keyword_fuzzy_max_edits,
+            ),
+        )
 
         # 插件初始化
         self.plugins = {
@@ -51,12 +129,76 @@ class CognitiveCore:
             config.episodic_memories_direct_threshold or 5
         )
         self.max_processed_count_on_loop = config.max_processed_count_on_loop or 10
+        # 记忆查询方式
+        self.memory_query_mode = config.memory_query_mode
+        self.semantic_query_top_k = config.semantic_query_top_k
+
+        # 回想前的记忆排序
+        self.memory_ranker = MemoryRanker(
+            top_k=config.ranked_memories_top_k,
+            token_budget=config.ranked_memories_token_budget,
+        )
+
+        # 联想回忆结果缓存
+        self.recall_cache = RecallCache(config.recall_cache_size)
+
+        # 后台浅度整理
+        self.consolidation_scheduler = ConsolidationScheduler(
+            event_count_threshold=config.light_consolidation_event_count,
+            cognitive_load_threshold=config.light_consolidation_cognitive_load,
+            interval_seconds=config.light_consolidation_interval,
+            load_min_events=config.light_consolidation_load_min_events,
+            run_job=self._submit_consolidation_job,
+        )
+        # 已完成后台整理的工作记忆
+        self._light_consolidation_results: queue.Queue = queue.Queue()
+        # 分窗口并发提取记忆的线程池
+        self._extraction_executor: Optional[ThreadPoolExecutor] = extraction_executor
+        # 整理线程，浅度整理和睡眠时冻结的工作记忆的深度整理按顺序执行
+        self._consolidation_executor: Optional[ThreadPoolExecutor] = None
+        self._memory_save_lock = threading.Lock()
 
         # 事件处理系统
         self.event_queue = queue.Queue()
         self.status: CoreStatus = CoreStatus.AWAITING
         self.processing_thread = None
 
+        # 事件预写日志，进程崩溃后重放尚未处理的事件
+        self.event_log: Optional[EventLog] = None
+        if config.event_log_path:
+            self.event_log = EventLog(
+                config.event_log_path.format(session_id=session_id),
+                sync=config.event_log_sync,
+            )
+        # 没有事件日志时的事件序号，从当前微秒时间开始，重启后也不会重复
+        self._event_sequence = itertools.count(time.time_ns() // 1000)
+
+        # 工作记忆快照，用于进程重启后的热恢复
+        self.snapshot_store: Optional[SnapshotStore] = None
+        if config.snapshot_path:
+            self.snapshot_store = SnapshotStore(
+                config.snapshot_path.format(session_id=session_id)
+            )
+        self._snapshot_restore_pending = (
+            self.snapshot_store is not None and self.snapshot_store.exists()
+        )
+        self._pending_cache_snapshot: Optional[List[Dict[str, Any]]] = None
+        self._last_snapshot_time = time.time()
+        # 上次保存快照时已处理的事件数，之后没有新事件时不需要定时保存
+        self._snapshot_events_processed = 0
+        # 整理线程和处理线程都会保存快照，串行写入
+        self._snapshot_lock = threading.Lock()
+        # 整理完成后由处理线程补存快照
+        self._snapshot_requested = False
+        # 已冻结但深度整理尚未完成的工作记忆，随快照保存，重启后重新整理
+        self._pending_consolidations: List[WorkingMemory] = []
+        self._pending_consolidations_lock = threading.Lock()
+        self._created_time = time.time()
+
+        # 快速路径规则，以及被规则暂存等待批量处理的事件 (暂存时间, 理解结果)
+        self.fast_path = FastPathEngine(config.fast_path_rules)
+        self._deferred_events: List[Tuple[float, UnderstoodData]] = []
+
         # 统计信息
         self.stats = {
             "events_processed": 0,
@@ -64,14 +206,45 @@ class CognitiveCore:
             "average_processing_time": 0.0,
             "last_deep_consolidation": time.time(),
             "last_light_consolidation": time.time(),
+            "memories_ranked_out": 0,
+            "last_extraction_windows": 0,
+            "last_consolidation_wall_time": 0.0,
+            "deep_consolidations_pending": 0,
+            "time_to_first_response": None,
+            "deferred_batches": 0,
+            "batched_understanding_calls": 0,
+            "batched_events": 0,
+            "batched_understanding_mismatches": 0,
+            "behavior_generations": 0,
+            "last_behavior_generation_time": 0.0,
+            "actions_dispatched_generations": 0,
+            "time_to_first_action": None,
+            "average_time_to_first_action": 0.0,
+            "snapshot_restore_time": None,
+            "budget_skipped_recalls": 0,
         }
 
+        # 处理线程是工作记忆的唯一写入方，只在修改工作记忆、修改整理线程也会写入的统计、
+        # 以及复制状态和快照时持有，不在模型调用期间持有
+        self._state_lock = threading.RLock()
+
+        # 状态快照，由处理线程按间隔发布，读取时不需要加锁或重新序列化
+        self.status_publisher = StatusPublisher(
+            self._copy_system_status, config.status_publish_interval
+        )
+        self._published_status: Optional[CoreStatus] = None
+
         self.logger = logging.getLogger("CognitiveCore")
 
+        # 先发布一次，读取方不会在自己的线程中生成状态
+        self._publish_status(force=True)
+
     def register_plugin(self, plugin_type: str, plugin_instance):
         """注册自定义插件"""
         if plugin_type in self.plugins:
             self.plugins[plugin_type] = plugin_instance
+            if plugin_type == "memory_manager":
+                self._configure_keyword_dictionary(plugin_instance)
             self.logger.info(f"注册插件: {plugin_type}")
         else:
             self.logger.error(f"未知插件类型: {plugin_type}")
@@ -80,16 +253,33 @@ class CognitiveCore:
         """获取插件实例"""
         return self.plugins.get(plugin_type)
 
+    def _configure_keyword_dictionary(self, memory_manager):
+        """记忆管理插件使用关键词词典时，按配置设置前缀匹配和模糊匹配"""
+        keyword_dictionary = getattr(memory_manager, "keyword_dictionary", None)
+        if isinstance(keyword_dictionary, KeywordDictionary):
+            keyword_dictionary.prefix_min_length = self.config.keyword_prefix_min_length
+            keyword_dictionary.fuzzy_max_edits = self.config.keyword_fuzzy_max_edits
+
     def wake_up(self):
         if self.status != CoreStatus.AWAITING:
             return
 
         """启动认知核心"""
-        self.status = CoreStatus.AWARE
-        self.processing_thread = threading.Thread(
-            target=self._processing_loop, daemon=True
-        )
-        self.processing_thread.start()
+        with self._state_lock:
+            self._restore_snapshot()
+            self._replay_event_log()
+
+            self.status = CoreStatus.AWARE
+        self._publish_status(force=True)
+
+        if self.worker_pool is None:
+            self.processing_thread = threading.Thread(
+                target=self._processing_loop, daemon=True
+            )
+            self.processing_thread.start()
+        elif not self.event_queue.empty():
+            # 有重放的事件时立即调度
+            self._schedule_tick()
         self.logger.info("CognitiveCore 启动成功")
 
     def sleep(self):
@@ -98,6 +288,7 @@ class CognitiveCore:
             return
 
         self.status = CoreStatus.WINDING_DOWN
+        self._schedule_tick()
 
     def receive_event(self, raw_event: Dict[str, str]):
         """接收事件"""
@@ -106,28 +297,33 @@ class CognitiveCore:
             raw_data = raw_event.get("data", "")
 
             if self.status == CoreStatus.AWARE and raw_type and raw_data:
-                event_with_context = UnderstandEventData(
-                    type=raw_type,
-                    data=raw_data,
-                    source=raw_event.get("source", ""),
-                    timestamp=time.time(),
+                record = {
+                    "type": raw_type,
+                    "data": raw_data,
+                    "source": raw_event.get("source", ""),
+                    "timestamp": time.time(),
+                }
+                # 先写日志再入队，写入后才算接收成功
+                sequence = (
+                    self.event_log.append(record)
+                    if self.event_log is not None
+                    else next(self._event_sequence)
                 )
+                event_with_context = UnderstandEventData(**record, sequence=sequence)
                 self.event_queue.put(event_with_context)
+                self._schedule_tick()
         except Exception as e:
             self.logger.error(f"接收事件失败: {e}")
 
     def _processing_loop(self):
         """主处理循环"""
-        while self.status == CoreStatus.AWARE:
+        current_thread = threading.current_thread()
+        while (
+            self.status in (CoreStatus.AWARE, CoreStatus.WINDING_DOWN)
+            and self.processing_thread is current_thread
+        ):
             try:
-                # 处理事件队列
-                self._process_events()
-
-                # 更新系统状态
-                self._update_system_state()
-
-                # 检测是否进入睡眠
-                self._check_sleep()
+                self._run_loop_iteration()
 
                 time.sleep(0.02)  # 避免CPU过度占用
 
@@ -135,14 +331,151 @@ class CognitiveCore:
                 self.logger.error(f"处理循环错误: {e}")
                 time.sleep(0.1)
 
+    def _run_loop_iteration(self):
+        """处理循环的单次迭代，修改完成后再发布状态"""
+        with usage_scope(self.usage_tracker, session_id=self.session_id):
+            # 处理事件队列
+            self._process_events()
+
+            # 更新系统状态
+            self._update_system_state()
+
+            # 检测是否进入睡眠
+            self._check_sleep()
+
+        self._publish_status()
+
+    def _schedule_tick(self):
+        """共享线程池模式下，有新工作时提交一次迭代，同一会话最多排队一次"""
+        if self.worker_pool is None:
+            return
+
+        with self._tick_lock:
+            if self._tick_scheduled:
+                return
+            self._tick_scheduled = True
+
+        self.worker_pool.submit(self.session_id, self._pool_tick)
+
+    def _pool_tick(self):
+        """共享线程池中执行的一次迭代，处理不完的事件让出线程后重新排队"""
+        with self._tick_lock:
+            self._tick_scheduled = False
+
+        if self.status not in (CoreStatus.AWARE, CoreStatus.WINDING_DOWN):
+            return
+
+        try:
+            self._run_loop_iteration()
+        except Exception as e:
+            self.logger.error(f"处理循环错误: {e}")
+
+        if not self.event_queue.empty() or self.status == CoreStatus.WINDING_DOWN:
+            self._schedule_tick()
+        elif self.status == CoreStatus.AWARE:
+            self._schedule_timed_tick()
+
+    def _schedule_timed_tick(self):
+        """有到期时间的工作时提交一次定时迭代，只保留最早到期的一次"""
+        due_at = self._next_due_time()
+        if due_at is None:
+            return
+
+        with self._tick_lock:
+            if self._timed_tick_due is not None and self._timed_tick_due <= due_at:
+                return
+            self._timed_tick_due = due_at
+
+        self.worker_pool.submit_after(
+            due_at - time.time(), self.session_id, self._timed_tick, due_at
+        )
+
+    def _timed_tick(self, due_at: float):
+        with self._tick_lock:
+            if self._timed_tick_due == due_at:
+                self._timed_tick_due = None
+        self._pool_tick()
+
+    def _next_due_time(self) -> Optional[float]:
+        """最早需要处理的时间点: 暂存事件的等待超时、浅度整理的间隔触发、定期快照"""
+        due_times = []
+        if self._deferred_events:
+            oldest_time, _ = self._deferred_events[0]
+            due_times.append(oldest_time + self.config.fast_path_defer_max_wait)
+        if self.get_plugin("memory_extraction") is not None:
+            due_times.append(self.consolidation_scheduler.next_due_time())
+        if (
+            self.snapshot_store is not None
+            and self.config.snapshot_interval
+            and self.stats["events_processed"] != self._snapshot_events_processed
+        ):
+            due_times.append(self._last_snapshot_time + self.config.snapshot_interval)
+
+        due_times = [due_at for due_at in due_times if due_at is not None]
+        return min(due_times) if due_times else None
+
     def _check_sleep(self):
         if self.status == CoreStatus.WINDING_DOWN and self.event_queue.empty():
-
-            if self.processing_thread:
-                self.processing_thread.join(timeout=5.0)
+            self._flush_deferred_events(force=True)
             self.logger.info("CognitiveCore 开始整理信息")
 
-            self._consolidate_memories("deep")
+            # 冻结的工作记忆交给整理线程，新的会话可以立即开始
+            with self._state_lock:
+                frozen = self._swap_working_memory()
+                self.status = CoreStatus.AWAITING
+                # 事件日志已把冻结的事件标记为处理完成，整理完成前快照中保留冻结的工作记忆，
+                # 整理中途崩溃时重启后重新整理
+                with self._pending_consolidations_lock:
+                    self._pending_consolidations.append(frozen)
+            self.save_snapshot()
+            self._submit_deep_consolidation(frozen)
+
+    def _submit_deep_consolidation(self, frozen: WorkingMemory):
+        """把冻结的工作记忆交给深度整理线程，多次整理按顺序执行"""
+        with self._state_lock:
+            self.stats["deep_consolidations_pending"] += 1
+
+        def run():
+            try:
+                if self._consolidate_memories("deep", frozen):
+                    self._finish_pending_consolidation(frozen)
+            finally:
+                with self._state_lock:
+                    self.stats["deep_consolidations_pending"] -= 1
+                # 睡眠中没有处理循环，由整理线程发布状态
+                if self.status == CoreStatus.AWAITING:
+                    self._publish_status(force=True)
+
+        self._submit_consolidation_job(run)
+
+    def _submit_consolidation_job(self, job: Callable[[], None]) -> Future:
+        """整理任务按会话串行执行，不占用事件处理"""
+        if self.worker_pool is not None:
+            # 共享线程池中与事件处理使用不同的键
+            return self.worker_pool.submit(f"{self.session_id}#consolidation", job)
+
+        if self._consolidation_executor is None:
+            self._consolidation_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="consolidation"
+            )
+        return self._consolidation_executor.submit(job)
+
+    def _finish_pending_consolidation(self, frozen: WorkingMemory):
+        """深度整理成功后才从快照中移除冻结的工作记忆"""
+        with self._pending_consolidations_lock:
+            self._pending_consolidations = [
+                working_memory
+                for working_memory in self._pending_consolidations
+                if working_memory is not frozen
+            ]
+
+        if self.status == CoreStatus.AWAITING:
+            # 睡眠中工作记忆不会变化，直接在整理线程保存
+            self.save_snapshot()
+        else:
+            # 新会话已经开始，由处理线程保存，避免读取正在修改的工作记忆
+            self._snapshot_requested = True
+            self._schedule_tick()
 
     def _process_events(self):
         """处理事件队列"""
@@ -154,6 +487,18 @@ class CognitiveCore:
             and processed_count < self.max_processed_count_on_loop
         ):  # 每轮最多处理10个事件
             try:
+                self._report_model_router_signals()
+
+                # 积压较多时批量理解，减少模型调用次数
+                batch = self._take_understanding_batch(
+                    self.max_processed_count_on_loop - processed_count
+                )
+                if batch:
+                    self._process_event_batch(batch)
+                    processed_count += len(batch)
+                    self.stats["events_processed"] += len(batch)
+                    continue
+
                 event_data: UnderstandEventData = self.event_queue.get_nowait()
                 self._process_single_event(event_data)
                 processed_count += 1
@@ -171,22 +516,119 @@ class CognitiveCore:
             self.stats["average_processing_time"] = (
                 self.stats["average_processing_time"] * 0.9 + avg_time * 0.1
             )
+            self.consolidation_scheduler.record_events(processed_count)
 
-    def _process_single_event(self, event_data: UnderstandEventData):
-        """处理单个事件"""
-        start_time = time.time()
+        self._flush_deferred_events()
+
+    def _flush_deferred_events(self, force: bool = False):
+        """暂存的事件攒够一批或等待超时后，只生成一次行为"""
+        if not self._deferred_events:
+            return
+
+        oldest_time, _ = self._deferred_events[0]
+        if not (
+            force
+            or len(self._deferred_events) >= self.config.fast_path_defer_batch_size
+            or time.time() - oldest_time >= self.config.fast_path_defer_max_wait
+        ):
+            return
+
+        # 暂存的事件都已在工作记忆中，以最后一个事件的理解结果生成行为即可
+        _, understood_data = self._deferred_events[-1]
+        self._deferred_events = []
+        self.stats["deferred_batches"] += 1
+        self._generate_and_execute_behavior(understood_data)
+
+    def _take_understanding_batch(self, limit: int) -> List[UnderstandEventData]:
+        """队列深度超过阈值且插件支持批量理解时，取出一批事件"""
+        threshold = self.config.batch_understanding_threshold
+        if not threshold or self.event_queue.qsize() < threshold:
+            return []
+
+        plugin = self.get_plugin("event_understanding")
+        if not hasattr(plugin, "understand_events"):
+            return []
+
+        batch: List[UnderstandEventData] = []
+        while len(batch) < min(limit, self.config.batch_understanding_size):
+            try:
+                batch.append(self.event_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _process_event_batch(self, batch: List[UnderstandEventData]):
+        """一次调用理解整批事件，再按顺序逐个处理"""
+        results = self._understand_events(batch)
+
+        self.stats["batched_understanding_calls"] += 1
+        self.stats["batched_events"] += len(batch)
+
+        for event_data, understood_data in zip(batch, results):
+            if understood_data is None:
+                # 批量结果缺失时单独理解
+                self._process_single_event(event_data)
+            else:
+                self._process_single_event(event_data, understood_data)
+
+    def _understand_events(
+        self, batch: List[UnderstandEventData]
+    ) -> List[Optional[UnderstoodData]]:
+        """批量事件理解，结果与输入一一对应，失败的位置为 None"""
+        plugin: EventUnderstandingPlugin = self.get_plugin("event_understanding")
+
+        input_data = UnderstandEventsInput(
+            understand_events=batch,
+            recent_events=self.working_memory.recent_events,
+            active_goals=self.working_memory.active_goals,
+        )
 
         try:
-            # 事件理解
-            understood_data: UnderstoodData = self._understand_event(event_data)
-            if not understood_data:
-                return
+            results = list(plugin.understand_events(input_data) or [])
+        except Exception as e:
+            self.logger.error(f"批量事件理解插件错误: {e}")
+            results = []
 
-            # 更新工作记忆
-            self._update_working_memory(event_data, understood_data)
+        if len(results) != len(batch):
+            # 数量不一致时无法确定结果对应哪个事件，整批丢弃后逐个理解
+            self.logger.warning(
+                f"批量事件理解结果数量不匹配: {len(results)}/{len(batch)}"
+            )
+            self.stats["batched_understanding_mismatches"] += 1
+            return [None] * len(batch)
+        return results
+
+    def _process_single_event(
+        self,
+        event_data: UnderstandEventData,
+        understood_data: Optional[UnderstoodData] = None,
+    ):
+        """处理单个事件，已经批量理解过的事件直接传入理解结果"""
+        start_time = time.time()
+        event_id = self._new_event_id(event_data.sequence)
 
-            # 行为生成和执行
-            self._generate_and_execute_behavior(understood_data)
+        try:
+            with usage_scope(event_id=event_id):
+                # 事件理解
+                if understood_data is None:
+                    understood_data = self._understand_event(event_data)
+                if not understood_data:
+                    return
+
+                # 更新工作记忆
+                self._update_working_memory(event_data, understood_data, event_id)
+
+                # 快速路径规则，命中时不走完整的记忆查询和行为生成
+                rule = self.fast_path.evaluate(event_data, understood_data)
+                if rule is None:
+                    self._generate_and_execute_behavior(understood_data)
+                elif rule.action == FAST_PATH_CANNED:
+                    self._execute_behavior_plan(rule.behavior_plan)
+                elif rule.action == FAST_PATH_DEFER:
+                    self._deferred_events.append((time.time(), understood_data))
+
+            if self.stats["time_to_first_response"] is None:
+                self.stats["time_to_first_response"] = time.time() - self._created_time
 
             processing_time = time.time() - start_time
             self.logger.debug(
@@ -195,6 +637,9 @@ class CognitiveCore:
 
         except Exception as e:
             self.logger.error(f"处理事件失败: {e}")
+        finally:
+            if self.event_log is not None:
+                self.event_log.mark_processed(event_data.sequence)
 
     def _understand_event(
         self, event_data: UnderstandEventData
@@ -217,37 +662,52 @@ class CognitiveCore:
             self.logger.error(f"事件理解插件错误: {e}")
             return None
 
+    def _new_event_id(self, sequence: Optional[int] = None) -> str:
+        """
+        事件ID由会话内单调递增的序号生成，同一毫秒内的事件也不会重复
+        接收的事件使用事件日志或接收时分配的序号，自身行为等没有序号的事件使用单独的前缀，
+        两个序号来源重叠时ID也不会冲突
+        """
+        if sequence is None:
+            return f"action_{next(self._event_sequence)}"
+        return f"event_{sequence}"
+
     def _update_working_memory(
-        self, event_data: UnderstandEventData, understood_data: UnderstoodData
+        self,
+        event_data: UnderstandEventData,
+        understood_data: UnderstoodData,
+        event_id: str = None,
     ):
         """更新工作记忆"""
         # 创建认知事件
         cognitive_event = CognitiveEvent(
-            event_id=f"event_{int(time.time() * 1000)}",
+            event_id=event_id or self._new_event_id(),
             timestamp=time.time(),
             source=event_data.source,
+            event_type=understood_data.event_type,
             modality_type=event_data.type,
             raw_data=event_data,
             understood_data=understood_data,
             importance_score=understood_data.importance_score or 0,
         )
 
-        # 添加到最近事件
-        self.working_memory.recent_events.append(cognitive_event)
+        with self._state_lock:
+            # 添加到最近事件
+            self.working_memory.recent_events.append(cognitive_event)
 
-        # 更新当前情境
-        situation = understood_data.current_situation or None
-        if situation is not None:
-            self.working_memory.current_situation = situation
+            # 更新当前情境
+            situation = understood_data.current_situation or None
+            if situation is not None:
+                self.working_memory.current_situation = situation
 
-        # 更新认知负荷
-        self._update_cognitive_load()
+            # 更新认知负荷
+            self._update_cognitive_load()
 
-        # 更新时间戳
-        self.working_memory.last_update_time = time.time()
-        self.working_memory.active_duration = time.time() - self.stats.get(
-            "session_start_time", time.time()
-        )
+            # 更新时间戳
+            self.working_memory.last_update_time = time.time()
+            self.working_memory.active_duration = time.time() - self.stats.get(
+                "session_start_time", time.time()
+            )
 
     def _generate_and_execute_behavior(self, understood_data: UnderstoodData):
         """生成和执行行为"""
@@ -261,41 +721,48 @@ class CognitiveCore:
             memory_manager: MemoryManagerPlugin = self.get_plugin("memory_manager")
 
             if memory_manager and understood_data.memory_query_plan:
-                if (
-                    understood_data.memory_query_plan.query_type
-                    == MemoryQueryType.LONG_TERM_FRESH
-                ):
+                # query_type 是字符串字面量，与枚举值比较
+                query_type = understood_data.memory_query_plan.query_type
+                if query_type == MemoryQueryType.LONG_TERM_FRESH.value:
                     # 从文件获取
                     episodic_memories: List[EpisodicMemoriesModels] = (
-                        memory_manager.query_episodic_memories(
-                            date_range=understood_data.memory_query_plan.time_range,
-                            keywords=understood_data.memory_query_plan.query_triggers,
+                        self._query_episodic_memories(
+                            memory_manager, understood_data.memory_query_plan
                         )
                     )
                     # 保存到缓存
-                    self.episodic_memory_manager.save_episodic_memories(
-                        episodic_memories
-                    )
-                elif (
-                    understood_data.memory_query_plan.query_type
-                    == MemoryQueryType.LONG_TERM_CACHED
-                ):
+                    self._cache_episodic_memories(episodic_memories)
+                elif query_type == MemoryQueryType.LONG_TERM_CACHED.value:
                     # 从缓存获取
                     episodic_memories: List[EpisodicMemoriesModels] = (
-                        self.episodic_memory_manager.query_episodic_memories(
-                            date_range=understood_data.memory_query_plan.time_range,
-                            keywords=understood_data.memory_query_plan.query_triggers,
+                        self._query_episodic_memories(
+                            self.episodic_memory_manager,
+                            understood_data.memory_query_plan,
                         )
                     )
 
+                # 排序并截断，控制进入提示词的记忆数量
+                episodic_memories = self._rank_episodic_memories(
+                    episodic_memories,
+                    understood_data.memory_query_plan.query_triggers,
+                )
+
             # 获取联想回忆结果
             episodic_memories_text: str | None = None
             if len(episodic_memories) > self.episodic_memories_direct_threshold:
-                result = self._associative_recall(episodic_memories)
+                if self.usage_tracker.is_over_budget(self.session_id):
+                    # 超出用量预算时不再调用联想回忆，直接使用排序后的记忆
+                    self.stats["budget_skipped_recalls"] += 1
+                    result = None
+                else:
+                    result = self._associative_recall(episodic_memories)
                 if result:
                     episodic_memories_text = result.recalled_episode
                     if result.current_situation:
-                        self.working_memory.current_situation = result.current_situation
+                        with self._state_lock:
+                            self.working_memory.current_situation = (
+                                result.current_situation
+                            )
 
             cognitive_state = GenerateBehaviorInput(
                 current_situation=self.working_memory.current_situation,
@@ -306,16 +773,74 @@ class CognitiveCore:
                 social_norms=[],
             )
 
-            behavior_plan: BehaviorPlan = plugin.generate_behavior(cognitive_state)
+            generation_start = time.time()
+            first_action_time = None
+
+            def dispatch_action(action):
+                nonlocal first_action_time
+                if first_action_time is None:
+                    first_action_time = time.time() - generation_start
+                self._execute_action(action)
+
+            if self.config.behavior_streaming and hasattr(
+                plugin, "generate_behavior_stream"
+            ):
+                # 流式生成，动作解析完成后立即执行
+                behavior_plan: BehaviorPlan = plugin.generate_behavior_stream(
+                    cognitive_state, dispatch_action
+                )
+            else:
+                behavior_plan: BehaviorPlan = plugin.generate_behavior(cognitive_state)
+                self._execute_behavior_plan(behavior_plan, dispatch_action)
 
-            # 更新情境
-            if behavior_plan.current_situation:
-                self.working_memory.current_situation = behavior_plan.current_situation
+            self._record_behavior_timing(
+                time.time() - generation_start, first_action_time
+            )
 
-            self._execute_behavior_plan(behavior_plan)
+            # 更新情境
+            if behavior_plan and behavior_plan.current_situation:
+                with self._state_lock:
+                    self.working_memory.current_situation = (
+                        behavior_plan.current_situation
+                    )
         except Exception as e:
             self.logger.error(f"行为生成插件错误: {e}")
 
+    def _query_episodic_memories(
+        self, memory_manager: MemoryManagerPlugin, memory_query_plan
+    ) -> List[EpisodicMemoriesModels]:
+        """按配置的查询方式查询记忆"""
+        if memory_manager is self.episodic_memory_manager:
+            self._ensure_cache_restored()
+
+        if self.memory_query_mode == "semantic":
+            return memory_manager.query_episodic_memories(
+                date_range=memory_query_plan.time_range,
+                keywords=memory_query_plan.query_triggers,
+                mode="semantic",
+                query_text=" ".join(memory_query_plan.query_triggers),
+                top_k=self.semantic_query_top_k,
+            )
+
+        return memory_manager.query_episodic_memories(
+            date_range=memory_query_plan.time_range,
+            keywords=memory_query_plan.query_triggers,
+        )
+
+    def _rank_episodic_memories(
+        self, episodic_memories: List[EpisodicMemoriesModels], query_triggers
+    ) -> List[EpisodicMemoriesModels]:
+        """记忆排序"""
+        if not episodic_memories:
+            return episodic_memories
+        # 没有配置截断时保持记忆管理器返回的顺序
+        if not self.memory_ranker.top_k and not self.memory_ranker.token_budget:
+            return episodic_memories
+
+        ranked = self.memory_ranker.rank(episodic_memories, query_triggers or [])
+        self.stats["memories_ranked_out"] += len(episodic_memories) - len(ranked)
+        return ranked
+
     def _associative_recall(
         self, episodic_memories: List["EpisodicMemoriesModels"]
     ) -> RecallResultsModels | None:
@@ -325,46 +850,106 @@ class CognitiveCore:
         if not plugin:
             return None
 
+        # 相同记忆集合和情境下直接复用上次的回想结果
+        memory_ids = [memory.id for memory in episodic_memories]
+        current_situation = self.working_memory.current_situation
+        cached = self.recall_cache.get(memory_ids, current_situation)
+        if cached is not None:
+            return cached
+
         recall_request = AssociativeRecallInput(
-            current_situation=self.working_memory.current_situation,
+            current_situation=current_situation,
             recent_events=self.working_memory.recent_events,
             episodic_memories=episodic_memories,
             active_goals=self.working_memory.active_goals,
         )
 
         try:
-            return plugin.associative_recall(recall_request)
+            result = plugin.associative_recall(recall_request)
+            if result:
+                self.recall_cache.put(memory_ids, current_situation, result)
+            return result
         except Exception as e:
             self.logger.error(f"联想回忆插件错误: {e}")
             return None
 
-    def _execute_behavior_plan(self, behavior_plan: BehaviorPlan):
+    def _cache_episodic_memories(self, episodic_memories: List[EpisodicMemoriesModels]):
+        """写入记忆缓存，内容有变化的记忆会使相关的回想结果失效"""
+        self._ensure_cache_restored()
+
+        cached_memories = self.episodic_memory_manager.episodic_memory.episodic_memories
+        changed_ids = [
+            memory.id
+            for memory in episodic_memories
+            if memory.id in cached_memories and cached_memories[memory.id] != memory
+        ]
+        if changed_ids:
+            self.recall_cache.invalidate_memories(changed_ids)
+
+        self.episodic_memory_manager.save_episodic_memories(episodic_memories)
+
+    def _execute_behavior_plan(
+        self, behavior_plan: BehaviorPlan, execute_action: Callable = None
+    ):
         """执行行为计划"""
-        if not behavior_plan or "plan" not in behavior_plan:
+        if not behavior_plan or not behavior_plan.plan:
             return
 
-        # 这里应该通过Orchestrator发送到对应的AI模块
+        execute_action = execute_action or self._execute_action
         for action in behavior_plan.plan:
-            self.logger.info(f"执行行为: {action}")
-            self._update_working_memory(
-                UnderstandEventData(
-                    type=action.type,
-                    data=action.data,
-                    source="me",
-                    timestamp=time.time(),
-                ),
-                UnderstoodData(
-                    event_type="my_action",
-                    confidence=1.0,
-                    response_priority="medium",
-                    expected_response="none",
-                    main_content=action.data,
-                    event_entity="me",
-                    key_entities=[],
-                    importance_score=50,
-                ),
+            execute_action(action)
+
+    def _execute_action(self, action):
+        """执行单个行为，并记录到工作记忆"""
+        # 异步发送到 Orchestrator，由对应的AI模块执行
+        self.logger.info(f"执行行为: {action}")
+        if self.action_dispatcher is not None:
+            if not self.action_dispatcher.dispatch(self.session_id, action):
+                self.logger.warning(f"行为发送队列已满，丢弃: {action}")
+
+        self._update_working_memory(
+            UnderstandEventData(
+                type=action.type,
+                data=action.data,
+                source="me",
+                timestamp=time.time(),
+            ),
+            UnderstoodData(
+                event_type="other",
+                response_priority="medium",
+                main_content=action.data,
+                current_situation=self.working_memory.current_situation,
+                event_entity="me",
+                key_entities=[],
+                importance_score=50,
+                memory_query_plan={"query_type": "none"},
+            ),
+        )
+
+    def _record_behavior_timing(
+        self, generation_time: float, first_action_time: Optional[float]
+    ):
+        """记录行为生成耗时和首个动作的延迟"""
+        self.stats["behavior_generations"] += 1
+        self.stats["last_behavior_generation_time"] = generation_time
+        if first_action_time is None:
+            return
+
+        self.stats["actions_dispatched_generations"] += 1
+        count = self.stats["actions_dispatched_generations"]
+        self.stats["time_to_first_action"] = first_action_time
+        self.stats["average_time_to_first_action"] = (
+            self.stats["average_time_to_first_action"] * (count - 1) + first_action_time
+        ) / count
+
+    def _report_model_router_signals(self):
+        """向模型路由上报当前负荷，路由据此为各阶段选择模型"""
+        if self.model_router is not None:
+            self.model_router.update_signals(
+                self.working_memory.cognitive_load,
+                self.event_queue.qsize(),
+                source=self.session_id,
             )
-            # TODO: 通过HTTP发送到Orchestrator
 
     def _update_cognitive_load(self):
         """更新认知负荷"""
@@ -379,95 +964,251 @@ class CognitiveCore:
             1.0, event_count * 0.02 + goal_complexity * 0.1 + memory_cache * 0.01
         )
 
-    def _consolidate_memories(self, consolidation_type: str):
-        """执行记忆整理"""
-        self.status = CoreStatus.DREAMING
+    def _consolidate_memories(
+        self, consolidation_type: str, working_memory: WorkingMemory = None
+    ) -> bool:
+        """执行记忆整理，working_memory 为冻结的工作记忆快照，整理失败时返回 False"""
+        working_memory = working_memory or self.working_memory
 
         # 获取记忆提取插件
         extraction_plugin = self.get_plugin("memory_extraction")
 
-        if extraction_plugin is None:
-            return
+        # 浅度整理已提取过的事件不再重复提取
+        new_events = working_memory.recent_events[working_memory.extracted_count :]
+        if extraction_plugin is None or not new_events:
+            return True
 
         try:
+            start_time = time.time()
+
             # 记忆提取阶段
             extraction_data = ExtractMemoriesInput(
-                current_situation=self.working_memory.current_situation,
-                recent_events=self.working_memory.recent_events,
-                active_goals=self.working_memory.active_goals,
+                current_situation=working_memory.current_situation,
+                recent_events=new_events,
+                active_goals=working_memory.active_goals,
             )
 
-            extraction_result: List[EpisodicMemoriesGenerateModels] = (
-                extraction_plugin.extract_memories(extraction_data)
-            )
+            result = self._extract_episodic_memories(extraction_data)
 
-            event_map: Dict[str, CognitiveEvent] = {}
-            for event in self.working_memory.recent_events:
-                event_map[event.event_id] = event
+            # 保存到文件
+            self._save_consolidated_memories(result)
 
-            result: List[EpisodicMemoriesModels] = []
+            # 记忆整理后情境和记忆都可能变化，回想结果全部失效
+            self.recall_cache.clear()
 
-            for generate_model in extraction_result:
-                generate_model: EpisodicMemoriesGenerateModels
-                # 根据 id 查找对应的 CognitiveEvent
-                cognitive_event = event_map.get(generate_model.id)
+            with self._state_lock:
+                self.stats["last_consolidation_wall_time"] = time.time() - start_time
 
-                # 如果找不到对应的 event_id，则舍弃该数据
-                if cognitive_event is None:
-                    continue
+                # 更新整理时间
+                if consolidation_type == "deep":
+                    self.stats["last_deep_consolidation"] = time.time()
+                else:
+                    self.stats["last_light_consolidation"] = time.time()
 
-                # 从 CognitiveEvent 中提取所需字段
-                # 将 timestamp 从 float 转换为 datetime
-                event_timestamp = datetime.fromtimestamp(cognitive_event.timestamp)
-
-                # 创建 EpisodicMemoriesModels 对象
-                episodic_model = EpisodicMemoriesModels(
-                    id=generate_model.id,
-                    content=generate_model.content,
-                    importance=generate_model.importance,
-                    keywords=generate_model.keywords,
-                    associations=generate_model.associations,
-                    timestamp=event_timestamp,
-                    entities=cognitive_event.understood_data.key_entities,
-                    source=cognitive_event.source,
-                )
+                self.stats["memory_consolidations"] += 1
+            self.logger.info(f"{consolidation_type}记忆整理完成")
+            return True
 
-                result.append(episodic_model)
+        except Exception as e:
+            self.logger.error(f"记忆整理错误: {e}")
+            return False
 
-            memory_manager: MemoryManagerPlugin = self.get_plugin("memory_manager")
+    def _save_consolidated_memories(self, result: List[EpisodicMemoriesModels]):
+        """保存整理结果，浅度和深度整理可能同时进行，需要串行写入"""
+        memory_manager: MemoryManagerPlugin = self.get_plugin("memory_manager")
 
-            if memory_manager:
-                # 保存到文件
+        if memory_manager and result:
+            with self._memory_save_lock:
                 memory_manager.save_episodic_memories(result)
 
-            self._apply_consolidation_result(consolidation_type)
+    def _extract_episodic_memories(
+        self, extraction_data: ExtractMemoriesInput
+    ) -> List[EpisodicMemoriesModels]:
+        """调用记忆提取插件，并与原始事件对应生成情景记忆"""
+        extraction_plugin = self.get_plugin("memory_extraction")
 
-            self.status = CoreStatus.AWAITING
+        if extraction_plugin is None:
+            return []
 
-            # 更新整理时间
-            if consolidation_type == "deep":
-                self.stats["last_deep_consolidation"] = time.time()
-            else:
-                self.stats["last_light_consolidation"] = time.time()
+        # 整理在后台线程执行，需要重新进入本会话的用量作用域
+        with usage_scope(self.usage_tracker, session_id=self.session_id):
+            extraction_result = self._extract_in_windows(
+                extraction_plugin, extraction_data
+            )
 
-            self.stats["memory_consolidations"] += 1
-            self.logger.info(f"{consolidation_type}记忆整理完成")
+        event_map: Dict[str, CognitiveEvent] = {}
+        for event in extraction_data.recent_events:
+            event_map[event.event_id] = event
+
+        result: List[EpisodicMemoriesModels] = []
+
+        for generate_model in extraction_result:
+            generate_model: EpisodicMemoriesGenerateModels
+            # 根据 id 查找对应的 CognitiveEvent
+            cognitive_event = event_map.get(generate_model.id)
+
+            # 如果找不到对应的 event_id，则舍弃该数据
+            if cognitive_event is None:
+                continue
+
+            # 从 CognitiveEvent 中提取所需字段
+            # 将 timestamp 从 float 转换为 datetime
+            event_timestamp = datetime.fromtimestamp(cognitive_event.timestamp)
+
+            # 创建 EpisodicMemoriesModels 对象
+            episodic_model = EpisodicMemoriesModels(
+                id=generate_model.id,
+                content=generate_model.content,
+                importance=generate_model.importance,
+                keywords=generate_model.keywords,
+                associations=generate_model.associations,
+                timestamp=event_timestamp,
+                entities=cognitive_event.get_understood("key_entities", []),
+                source=cognitive_event.source,
+            )
 
-        except Exception as e:
-            self.logger.error(f"记忆整理错误: {e}")
+            result.append(episodic_model)
 
-    def _apply_consolidation_result(self, mode: str):
-        """应用记忆整理结果"""
-        if mode == "deep":
-            self._deep_consolidation()
-        else:
-            self._light_consolidation()
+        return result
+
+    def _extract_in_windows(
+        self, extraction_plugin, extraction_data: ExtractMemoriesInput
+    ) -> List[EpisodicMemoriesGenerateModels]:
+        """把事件切分为重叠窗口并发提取，按ID合并去重"""
+        windows = split_event_windows(
+            extraction_data.recent_events,
+            max_tokens=self.config.extraction_window_tokens,
+            max_seconds=self.config.extraction_window_seconds,
+            overlap=self.config.extraction_window_overlap,
+        )
+        with self._state_lock:
+            self.stats["last_extraction_windows"] = len(windows)
+
+        if len(windows) <= 1:
+            return extraction_plugin.extract_memories(extraction_data) or []
+
+        def extract_window(window_events: List[CognitiveEvent]):
+            return (
+                extraction_plugin.extract_memories(
+                    ExtractMemoriesInput(
+                        current_situation=extraction_data.current_situation,
+                        recent_events=window_events,
+                        active_goals=extraction_data.active_goals,
+                    )
+                )
+                or []
+            )
+
+        executor = self._get_extraction_executor()
+        # 每个窗口复制一份上下文，线程池中的调用也记到当前会话
+        futures = [
+            executor.submit(contextvars.copy_context().run, extract_window, window)
+            for window in windows
+        ]
+
+        # 重叠窗口可能得到同一ID的记忆，保留重要程度更高的
+        merged: Dict[str, EpisodicMemoriesGenerateModels] = {}
+        for future in futures:
+            try:
+                window_result = future.result()
+            except Exception as e:
+                self.logger.error(f"窗口记忆提取错误: {e}")
+                continue
+
+            for generate_model in window_result:
+                existing = merged.get(generate_model.id)
+                if existing is None or generate_model.importance > existing.importance:
+                    merged[generate_model.id] = generate_model
+
+        return list(merged.values())
+
+    def _get_extraction_executor(self) -> ThreadPoolExecutor:
+        """记忆提取的有界线程池，首次使用时创建"""
+        if self._extraction_executor is None:
+            self._extraction_executor = ThreadPoolExecutor(
+                max_workers=max(1, self.config.extraction_max_workers),
+                thread_name_prefix="memory-extraction",
+            )
+        return self._extraction_executor
+
+    def _schedule_light_consolidation(self):
+        """满足触发条件时在后台执行浅度整理，不阻塞事件处理"""
+        if self.get_plugin("memory_extraction") is None:
+            return
+
+        reason = self.consolidation_scheduler.check_trigger(
+            self.working_memory.cognitive_load
+        )
+        if reason is None:
+            return
+
+        # 只提取上次整理之后的新事件，已提取的事件不再重复提取
+        working_memory = self.working_memory
+        new_events = working_memory.recent_events[working_memory.extracted_count :]
+        if not new_events:
+            self.consolidation_scheduler.skip()
+            return
+
+        # 快照当前工作记忆，后台线程只读取快照
+        snapshot = ExtractMemoriesInput(
+            current_situation=working_memory.current_situation,
+            recent_events=new_events,
+            active_goals=list(working_memory.active_goals),
+        )
+
+        if self.consolidation_scheduler.submit(
+            lambda: self._run_light_consolidation(working_memory, snapshot), reason
+        ):
+            with self._state_lock:
+                working_memory.extracted_count = len(working_memory.recent_events)
+            self.logger.info(f"开始后台浅度整理: {reason}")
+
+    def _run_light_consolidation(
+        self, working_memory: WorkingMemory, snapshot: ExtractMemoriesInput
+    ):
+        """后台线程: 提取并保存记忆，结果交回处理线程应用"""
+        start_time = time.time()
+        result = self._extract_episodic_memories(snapshot)
+
+        self._save_consolidated_memories(result)
+
+        self.recall_cache.clear()
+        with self._state_lock:
+            self.stats["last_consolidation_wall_time"] = time.time() - start_time
+
+        self._light_consolidation_results.put(working_memory)
+        # 共享线程池模式下没有新事件时也要运行一次迭代来应用结果
+        self._schedule_tick()
+
+    def _apply_light_consolidation_results(self):
+        """在处理线程中应用已完成的后台整理结果"""
+        while True:
+            try:
+                working_memory = self._light_consolidation_results.get_nowait()
+            except queue.Empty:
+                return
+
+            # 整理期间会话已经结束，工作记忆已被替换
+            if working_memory is not self.working_memory:
+                continue
+
+            with self._state_lock:
+                self._light_consolidation()
+                self.stats["last_light_consolidation"] = time.time()
+                self.stats["memory_consolidations"] += 1
+            self.logger.info("light记忆整理完成")
 
     def _light_consolidation(self):
         """浅度整理"""
 
-        # 轻度清理工作记忆
-        self.working_memory.recent_events = self.working_memory.recent_events[-25:]
+        # 轻度清理工作记忆，只移除已提取过的旧事件，整理期间新到的事件保留
+        working_memory = self.working_memory
+        removed = min(
+            working_memory.extracted_count,
+            max(0, len(working_memory.recent_events) - 25),
+        )
+        working_memory.recent_events = working_memory.recent_events[removed:]
+        working_memory.extracted_count -= removed
         self._update_cognitive_load()
 
     def _deep_consolidation(self):
@@ -478,6 +1219,16 @@ class CognitiveCore:
         self.episodic_memory_manager.clear()
         self._update_cognitive_load()
 
+    def _swap_working_memory(self) -> WorkingMemory:
+        """
+        冻结当前工作记忆并换上新的工作记忆
+        只在处理线程中调用，属性赋值是原子的，其他线程只会看到旧的或新的完整对象
+        """
+        frozen = self.working_memory
+        self.working_memory = WorkingMemory()
+        self._deep_consolidation()
+        return frozen
+
     def _cleanup_expired_memories(self):
         """清理过期记忆"""
         """current_time = time.time()
@@ -508,14 +1259,222 @@ class CognitiveCore:
             self._cleanup_expired_memories()
             self.stats["last_cleanup_time"] = current_time"""
 
+        # 应用后台整理结果，并检查是否需要新的浅度整理
+        self._apply_light_consolidation_results()
+        self._schedule_light_consolidation()
+
+        # 定期保存快照，深度整理完成后也保存一次
+        if self.snapshot_store is not None and (
+            self._snapshot_requested
+            or (
+                self.config.snapshot_interval
+                and time.time() - self._last_snapshot_time
+                >= self.config.snapshot_interval
+            )
+        ):
+            self._snapshot_requested = False
+            self.save_snapshot()
+
+    def save_snapshot(self) -> bool:
+        """保存工作记忆、情景记忆缓存和统计信息的快照"""
+        if self.snapshot_store is None:
+            return False
+
+        # 先获取状态锁，整理线程保存快照时不会读到处理线程正在修改的工作记忆
+        with self._state_lock, self._snapshot_lock:
+            return self._save_snapshot()
+
+    def _save_snapshot(self) -> bool:
+        start_time = time.time()
+        events_processed = self.stats["events_processed"]
+        try:
+            # 缓存快照尚未恢复时原样写回，避免覆盖丢失
+            if self._pending_cache_snapshot is not None:
+                cached_memories = self._pending_cache_snapshot
+            else:
+                cached_memories = dump_episodic_memories(
+                    list(
+                        self.episodic_memory_manager.episodic_memory.episodic_memories.values()
+                    )
+                )
+
+            with self._pending_consolidations_lock:
+                pending_consolidations = list(self._pending_consolidations)
+
+            size = self.snapshot_store.save(
+                {
+                    "saved_at": time.time(),
+                    "working_memory": dump_working_memory(self.working_memory),
+                    "pending_consolidations": [
+                        dump_working_memory(working_memory)
+                        for working_memory in pending_consolidations
+                    ],
+                    "episodic_cache": cached_memories,
+                    "stats": {
+                        key: self.stats[key]
+                        for key in SNAPSHOT_STATS_KEYS
+                        if key in self.stats
+                    },
+                }
+            )
+        except Exception as e:
+            self.logger.error(f"保存快照失败: {e}")
+            return False
+
+        with self._state_lock:
+            self._last_snapshot_time = time.time()
+            self._snapshot_events_processed = events_processed
+            self.stats["last_snapshot_time"] = self._last_snapshot_time
+            self.stats["last_snapshot_bytes"] = size
+            self.stats["last_snapshot_save_time"] = time.time() - start_time
+        return True
+
+    def shutdown(self):
+        """进程退出前调用，保存最终快照"""
+        self.save_snapshot()
+        if self._owns_action_dispatcher:
+            self.action_dispatcher.shutdown(timeout=self.config.orchestrator_timeout)
+        if self.event_log is not None:
+            self.event_log.close()
+
+    def _replay_event_log(self):
+        """把上次退出前没有处理完的事件重新放入队列"""
+        if self.event_log is None:
+            return
+
+        records = self.event_log.take_unprocessed()
+        for record in records:
+            try:
+                self.event_queue.put(
+                    UnderstandEventData(
+                        type=record["type"],
+                        data=record["data"],
+                        source=record.get("source", ""),
+                        timestamp=record["timestamp"],
+                        sequence=record["seq"],
+                    )
+                )
+            except Exception as e:
+                self.logger.error(f"重放事件失败: {e}")
+                self.event_log.mark_processed(record.get("seq"))
+
+        if records:
+            self.logger.info(f"从事件日志重放 {len(records)} 个未处理事件")
+
+    def _restore_snapshot(self):
+        """
+        恢复工作记忆和统计信息，情景记忆缓存在首次使用时再恢复
+        上次崩溃前没有整理完的工作记忆重新提交深度整理
+        """
+        if not self._snapshot_restore_pending:
+            return
+        self._snapshot_restore_pending = False
+
+        start_time = time.time()
+        try:
+            state = self.snapshot_store.load()
+            if state is None:
+                return
+
+            self.working_memory = load_working_memory(state["working_memory"])
+            pending_consolidations = [
+                load_working_memory(working_memory)
+                for working_memory in state.get("pending_consolidations", [])
+            ]
+            self.stats.update(state.get("stats", {}))
+            self._pending_cache_snapshot = state.get("episodic_cache") or None
+        except Exception as e:
+            self.logger.error(f"恢复快照失败: {e}")
+            return
+        finally:
+            self.stats["snapshot_restore_time"] = time.time() - start_time
+
+        self.logger.info(
+            f"已从快照恢复 {len(self.working_memory.recent_events)} 个最近事件"
+        )
+
+        if pending_consolidations:
+            with self._pending_consolidations_lock:
+                self._pending_consolidations.extend(pending_consolidations)
+            for working_memory in pending_consolidations:
+                self._submit_deep_consolidation(working_memory)
+            self.logger.info(
+                f"重新整理快照中 {len(pending_consolidations)} 份未完成整理的工作记忆"
+            )
+
+    def _ensure_cache_restored(self):
+        """首次访问情景记忆缓存时恢复快照中的缓存"""
+        if self._pending_cache_snapshot is None:
+            return
+
+        # 恢复完成前保存的快照仍然写回原来的缓存快照
+        with self._state_lock:
+            pending = self._pending_cache_snapshot
+            if pending is None:
+                return
+
+            start_time = time.time()
+            try:
+                self.episodic_memory_manager.save_episodic_memories(
+                    load_episodic_memories(pending)
+                )
+            except Exception as e:
+                self.logger.error(f"恢复记忆缓存快照失败: {e}")
+            self._pending_cache_snapshot = None
+            self.stats["cache_restore_time"] = time.time() - start_time
+
     def get_system_status(self) -> Dict[str, Any]:
-        """获取系统状态"""
+        """获取系统状态，返回处理线程最近发布的快照，调用方不要修改"""
+        return self.status_publisher.latest().status
+
+    def get_status_snapshot(
+        self, version: Optional[int] = None, timeout: float = 0.0
+    ) -> StatusSnapshot:
+        """状态快照，传入 version 时最多等待 timeout 秒直到发布了更新的版本"""
+        if version is None:
+            return self.status_publisher.latest()
+        return self.status_publisher.wait_for(version, timeout)
+
+    def _publish_status(self, force: bool = False):
+        """限速发布状态快照，核心状态变化时立即发布"""
+        status = self.status
+        if self.status_publisher.publish(force or status != self._published_status):
+            self._published_status = status
+
+    def _copy_system_status(self) -> Dict[str, Any]:
+        """只在复制状态时持有状态锁，序列化在锁外进行"""
+        with self._state_lock:
+            return self._build_system_status()
+
+    def _build_system_status(self) -> Dict[str, Any]:
+        """持有 _state_lock 时生成状态，所有可变数据都复制一份"""
         return {
-            "status": self.status,
+            "status": self.status.value,
             "cognitive_load": self.working_memory.cognitive_load,
             "working_memory_usage": len(self.working_memory.recent_events),
             "episodic_memory_usage": len(
                 self.episodic_memory_manager.episodic_memory.episodic_memories
             ),
-            "processing_stats": self.stats,
+            "episodic_cache": self.episodic_memory_manager.get_cache_stats(),
+            "recall_cache": self.recall_cache.get_stats(),
+            "light_consolidation": self.consolidation_scheduler.get_stats(),
+            "fast_path": self.fast_path.get_stats(),
+            "action_dispatcher": (
+                self.action_dispatcher.get_stats() if self.action_dispatcher else None
+            ),
+            "model_router": (
+                self.model_router.get_stats() if self.model_router else None
+            ),
+            "event_log": self.event_log.get_stats() if self.event_log else None,
+            "usage": (
+                self.usage_tracker.get_stats()
+                if self._owns_usage_tracker
+                else self.usage_tracker.get_stats(self.session_id)
+            ),
+            "plugins": {
+                plugin_type: plugin.get_stats()
+                for plugin_type, plugin in self.plugins.items()
+                if hasattr(plugin, "get_stats")
+            },
+            "processing_stats": dict(self.stats),
         }
@@ -0,0 +1,151 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+
+class ConsolidationScheduler:
+    """
+    后台记忆整理调度
+    根据事件数量、认知负荷或间隔时间触发，同一时间只运行一个整理任务
+    整理任务交给 run_job 执行，为空时使用调度器自己的单线程线程池
+    """
+
+    def __init__(
+        self,
+        event_count_threshold: int = 40,
+        cognitive_load_threshold: float = 0.8,
+        interval_seconds: float = 600.0,
+        load_min_events: int = 10,
+        run_job: Optional[Callable[[Callable[[], None]], Future]] = None,
+    ):
+        # 阈值为 0 表示不使用该条件触发
+        self.event_count_threshold = event_count_threshold
+        self.cognitive_load_threshold = cognitive_load_threshold
+        self.interval_seconds = interval_seconds
+        # 整理后认知负荷可能仍然很高，至少有这么多新事件才按认知负荷再次触发
+        self.load_min_events = load_min_events
+
+        self._run_job = run_job
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+        self._events_since_last_run = 0
+        self._last_run_time = time.time()
+
+        self.stats = {
+            "runs": 0,
+            "failures": 0,
+            "last_trigger": None,
+            "last_duration": 0.0,
+        }
+
+        self.logger = logging.getLogger("ConsolidationScheduler")
+
+    def record_events(self, count: int):
+        """记录新处理的事件数量"""
+        with self._lock:
+            self._events_since_last_run += count
+
+    def check_trigger(
+        self, cognitive_load: float, now: Optional[float] = None
+    ) -> Optional[str]:
+        """返回触发原因，不需要整理时返回 None"""
+        now = time.time() if now is None else now
+
+        with self._lock:
+            if self._events_since_last_run == 0 or self.is_running():
+                return None
+
+            if (
+                self.event_count_threshold
+                and self._events_since_last_run >= self.event_count_threshold
+            ):
+                return "event_count"
+            if (
+                self.cognitive_load_threshold
+                and cognitive_load >= self.cognitive_load_threshold
+                and self._events_since_last_run >= self.load_min_events
+            ):
+                return "cognitive_load"
+            if (
+                self.interval_seconds
+                and now - self._last_run_time >= self.interval_seconds
+            ):
+                return "interval"
+
+        return None
+
+    def next_due_time(self) -> Optional[float]:
+        """
+        间隔触发的到期时间，没有新事件或任务正在运行时返回 None
+        没有新事件进入时处理循环不会运行，由调用方在到期时安排一次检查
+        """
+        with self._lock:
+            if (
+                not self.interval_seconds
+                or self._events_since_last_run == 0
+                or self.is_running()
+            ):
+                return None
+            return self._last_run_time + self.interval_seconds
+
+    def skip(self):
+        """新处理的事件都不需要整理时清零计数，重新开始计算间隔"""
+        with self._lock:
+            self._events_since_last_run = 0
+            self._last_run_time = time.time()
+
+    def is_running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def submit(self, job: Callable[[], None], reason: str = "manual") -> bool:
+        """在后台执行整理任务，已有任务在运行时返回 False"""
+        with self._lock:
+            if self.is_running():
+                return False
+
+            self._events_since_last_run = 0
+            self._last_run_time = time.time()
+            self.stats["last_trigger"] = reason
+
+            run_job = self._run_job or self._submit_to_executor
+            self._future = run_job(lambda: self._run(job))
+            return True
+
+    def join(self, timeout: Optional[float] = None):
+        future = self._future
+        if future is not None:
+            wait([future], timeout)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "running": self.is_running(),
+                "events_since_last_run": self._events_since_last_run,
+            }
+
+    def _submit_to_executor(self, job: Callable[[], None]) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="light-consolidation"
+            )
+        return self._executor.submit(job)
+
+    def _run(self, job: Callable[[], None]):
+        start_time = time.time()
+        try:
+            job()
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.logger.error(f"后台记忆整理错误: {e}")
+        finally:
+            self.stats["runs"] += 1
+            self.stats["last_duration"] = time.time() - start_time
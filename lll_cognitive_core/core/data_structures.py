@@ -1,9 +1,13 @@
+import sys
 from pydantic import BaseModel
+from pydantic_core import core_schema
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from lll_simple_ai_shared import UnderstoodData, EpisodicMemoriesModels
+from lll_simple_ai_shared.utils.extract import safe_event_to_string
+from .posting_list import PostingList
 
 
 class UnderstandEventData(BaseModel):
@@ -11,6 +15,8 @@ class UnderstandEventData(BaseModel):
     data: str
     source: str
     timestamp: datetime
+    # 会话内单调递增的序号，用于生成事件ID和标记事件日志的处理进度
+    sequence: Optional[int] = None
 
 
 class UnderstandEventInput(BaseModel):
@@ -19,6 +25,16 @@ class UnderstandEventInput(BaseModel):
     active_goals: List["Goal"]
 
 
+class UnderstandEventsInput(BaseModel):
+    understand_events: List[UnderstandEventData]
+    recent_events: List["CognitiveEvent"]
+    active_goals: List["Goal"]
+
+
+class UnderstoodDataBatch(BaseModel):
+    results: List[UnderstoodData]
+
+
 class AssociativeRecallInput(BaseModel):
     current_situation: str
     recent_events: List["CognitiveEvent"]
@@ -44,21 +60,26 @@ class ExtractMemoriesInput(BaseModel):
 @dataclass
 class WorkingMemory:
     # 当前活跃信息
-    current_situation: str  # 当前情境理解
-    active_goals: List["Goal"]  # 活跃目标
-    attention_focus: Optional[str]  # 当前注意力焦点
+    current_situation: str = ""  # 当前情境理解
+    active_goals: List["Goal"] = field(default_factory=list)  # 活跃目标
+    attention_focus: Optional[str] = None  # 当前注意力焦点
 
     # 短期事件缓存
-    recent_events: List["CognitiveEvent"]  # 最近事件(循环队列，最大50个)
-    event_buffer: List["CognitiveEvent"]  # 待处理事件缓冲区
+    recent_events: List["CognitiveEvent"] = field(
+        default_factory=list
+    )  # 最近事件(循环队列，最大50个)
+    event_buffer: List["CognitiveEvent"] = field(
+        default_factory=list
+    )  # 待处理事件缓冲区
 
     # 上下文状态
-    social_context: "SocialContext"  # 社交上下文
+    social_context: Optional["SocialContext"] = None  # 社交上下文
 
     # 元信息
-    cognitive_load: float  # 当前认知负荷 0-1
-    last_update_time: float  # 最后更新时间戳
-    active_duration: float  # 当前会话持续时间
+    cognitive_load: float = 0.0  # 当前认知负荷 0-1
+    last_update_time: float = 0.0  # 最后更新时间戳
+    active_duration: float = 0.0  # 当前会话持续时间
+    extracted_count: int = 0  # recent_events 开头已提取为情景记忆的事件数
 
 
 @dataclass
@@ -69,16 +90,202 @@ class ExtractMemories:
     social_context: "SocialContext"
 
 
-@dataclass
+# 取值有限的字段，驻留后所有事件共享同一个字符串对象
+_INTERNED_FIELDS = frozenset(
+    ("type", "source", "event_type", "response_priority", "event_entity", "query_type")
+)
+# 相同的已设置字段集合共享同一个 frozenset
+_FIELDS_SET_CACHE: Dict[frozenset, frozenset] = {}
+# 模型类的字段名缓存
+_FIELD_NAMES_CACHE: Dict[type, tuple] = {}
+
+
+def _field_names(model_class: type) -> tuple:
+    names = _FIELD_NAMES_CACHE.get(model_class)
+    if names is None:
+        names = _FIELD_NAMES_CACHE[model_class] = tuple(model_class.model_fields)
+    return names
+
+
+class _PackedModel:
+    """pydantic 模型的紧凑形式，字段值按模型字段顺序保存在元组中"""
+
+    __slots__ = ("model_class", "values", "fields_set")
+
+    def __init__(self, model: BaseModel):
+        self.model_class = type(model)
+        self.values = tuple(
+            _pack_value(getattr(model, name), name in _INTERNED_FIELDS)
+            for name in _field_names(self.model_class)
+        )
+        fields_set = frozenset(model.model_fields_set)
+        self.fields_set = _FIELDS_SET_CACHE.setdefault(fields_set, fields_set)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        for field_name, value in zip(_field_names(self.model_class), self.values):
+            if field_name == name:
+                return _unpack_value(value)
+        return default
+
+    def unpack(self) -> BaseModel:
+        return self.model_class.model_construct(
+            self.fields_set,
+            **{
+                name: _unpack_value(value)
+                for name, value in zip(_field_names(self.model_class), self.values)
+            },
+        )
+
+
+class _PackedList(tuple):
+    """紧凑保存的列表，与字段中原本的元组区分开，还原时重新生成列表"""
+
+    __slots__ = ()
+
+
+def _pack_value(value: Any, intern: bool = False) -> Any:
+    if isinstance(value, BaseModel):
+        return _PackedModel(value)
+    if type(value) is list:
+        return _PackedList(_pack_value(item) for item in value)
+    if type(value) is tuple:
+        return tuple(_pack_value(item) for item in value)
+    if intern and type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def _unpack_value(value: Any) -> Any:
+    if type(value) is _PackedModel:
+        return value.unpack()
+    if type(value) is _PackedList:
+        return [_unpack_value(item) for item in value]
+    if type(value) is tuple:
+        return tuple(_unpack_value(item) for item in value)
+    return value
+
+
 class CognitiveEvent:
-    event_id: str  # 事件唯一ID
-    timestamp: float  # 发生时间戳
-    source: str  # 事件来源
-    event_type: str  # 事件类型
-    modality_type: str  # asr 语音识别输入 tts 语音输出 motor 动作执行 vision 图像识别 sensor 传感器数据 system 系统状态
-    raw_data: UnderstandEventData  # 原始数据
-    understood_data: UnderstoodData  # 理解后的数据
-    importance_score: float  # 重要性评分
+    """
+    认知事件
+    原始数据和理解数据紧凑保存，访问 raw_data / understood_data 时才生成 pydantic 模型
+    """
+
+    __slots__ = (
+        "event_id",  # 事件唯一ID
+        "timestamp",  # 发生时间戳
+        "source",  # 事件来源
+        "event_type",  # 事件类型
+        "modality_type",  # asr 语音识别输入 tts 语音输出 motor 动作执行 vision 图像识别 sensor 传感器数据 system 系统状态
+        "importance_score",  # 重要性评分
+        "_raw",  # 原始数据
+        "_understood",  # 理解后的数据
+        "_prompt_fragment",  # 渲染后的提示词片段缓存
+    )
+
+    def __init__(
+        self,
+        event_id: str,
+        timestamp: float,
+        source: str,
+        event_type: str,
+        modality_type: str,
+        raw_data: UnderstandEventData,
+        understood_data: UnderstoodData,
+        importance_score: float,
+    ):
+        self.event_id = event_id
+        self.timestamp = timestamp
+        self.source = sys.intern(source)
+        self.event_type = sys.intern(event_type)
+        self.modality_type = sys.intern(modality_type)
+        self.importance_score = importance_score
+        self.raw_data = raw_data
+        self.understood_data = understood_data
+
+    @property
+    def raw_data(self) -> Optional[UnderstandEventData]:
+        """原始数据"""
+        return self._raw.unpack() if self._raw is not None else None
+
+    @raw_data.setter
+    def raw_data(self, raw_data: Optional[UnderstandEventData]):
+        self._raw = _PackedModel(raw_data) if raw_data is not None else None
+
+    @property
+    def understood_data(self) -> Optional[UnderstoodData]:
+        """理解后的数据"""
+        return self._understood.unpack() if self._understood is not None else None
+
+    @understood_data.setter
+    def understood_data(self, understood_data: Optional[UnderstoodData]):
+        self._understood = (
+            _PackedModel(understood_data) if understood_data is not None else None
+        )
+        self._prompt_fragment = None
+
+    def get_understood(self, name: str, default: Any = None) -> Any:
+        """读取理解数据的单个字段，不生成模型"""
+        if self._understood is None:
+            return default
+        return self._understood.get(name, default)
+
+    def prompt_fragment(self, with_id: bool = False) -> Optional[str]:
+        """事件在提示词中的一行文本，首次渲染后缓存"""
+        if self._prompt_fragment is None:
+            self._prompt_fragment = safe_event_to_string(
+                {
+                    "modality_type": self.modality_type,
+                    "understood_data": (
+                        {
+                            "event_entity": self.get_understood("event_entity"),
+                            "main_content": self.get_understood("main_content"),
+                        }
+                        if self._understood is not None
+                        else None
+                    ),
+                }
+            )
+            if self._prompt_fragment is None:
+                return None
+
+        if with_id:
+            return f"ID: {self.event_id} | {self._prompt_fragment}"
+        return self._prompt_fragment
+
+    def to_dict(self) -> Dict[str, Any]:
+        """生成提示词或快照需要的字典"""
+        raw_data = self.raw_data
+        understood_data = self.understood_data
+        return {
+            "event_id": self.event_id,
+            "timestamp": self.timestamp,
+            "source": self.source,
+            "event_type": self.event_type,
+            "modality_type": self.modality_type,
+            "raw_data": raw_data.model_dump(mode="json") if raw_data else None,
+            "understood_data": (
+                understood_data.model_dump(mode="json") if understood_data else None
+            ),
+            "importance_score": self.importance_score,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"CognitiveEvent(event_id={self.event_id!r}, "
+            f"event_type={self.event_type!r}, modality_type={self.modality_type!r})"
+        )
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        # 作为输入模型字段时只做类型检查，序列化时才展开成字典
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda event: event.to_dict()
+            ),
+        )
+
     # tags: List[str]  # 标签
     # spatial_info: Optional["SpatialInfo"]  # 空间信息
 
@@ -112,9 +319,13 @@ class CoreStatus(Enum):
 
 @dataclass
 class EpisodicMemory:
-    episodic_memories: Dict[str, EpisodicMemoriesModels]  # 记忆片段列表
-    keyword_index: Dict[str, List[str]]  # 关键词索引
-    time_index: Dict[str, List[str]]  # 时间索引
+    episodic_memories: Dict[str, EpisodicMemoriesModels] = field(
+        default_factory=dict
+    )  # 记忆片段列表
+    keyword_index: Dict[int, PostingList] = field(
+        default_factory=dict
+    )  # 关键词索引，键为 KeywordDictionary 的词项ID
+    time_index: Dict[str, PostingList] = field(default_factory=dict)  # 时间索引
 
 
 @dataclass
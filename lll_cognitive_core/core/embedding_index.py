@@ -0,0 +1,241 @@
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from lll_simple_ai_shared import EpisodicMemoriesModels
+
+from ..utils.tokenize_text import tokenize_text
+
+
+def episodic_memory_text(memory: EpisodicMemoriesModels) -> str:
+    """拼接用于向量化的记忆文本"""
+    parts = [memory.content or ""]
+    parts.extend(memory.keywords or [])
+    parts.extend(memory.associations or [])
+    return " ".join(parts)
+
+
+class HashingEmbedder:
+    """
+    基于特征哈希的本地文本向量化
+    不需要训练和词表，使用crc32保证跨进程结果一致，可以直接持久化
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = tokenize_text(text)
+        if not tokens:
+            return vector
+
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) for token in tokens),
+            dtype=np.uint32,
+            count=len(tokens),
+        )
+        buckets = hashes % self.dim
+        # 用哈希的最高位决定符号，抵消碰撞带来的偏差
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, buckets, signs)
+
+        # 次线性词频
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class EmbeddingIndex:
+    """
+    情景记忆的向量索引
+    矩阵按容量倍增，支持增量写入、删除和带日期过滤的top-k余弦检索
+    """
+
+    def __init__(self, dim: int = 256, embedder: HashingEmbedder = None):
+        self.embedder = embedder or HashingEmbedder(dim)
+        self.dim = self.embedder.dim
+
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._dates: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # 每个维度的文档频率，用于查询侧的IDF加权
+        self._doc_freq = np.zeros(self.dim, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._rows
+
+    def add_memories(self, memories: Iterable[EpisodicMemoriesModels]):
+        for memory in memories:
+            self.add(
+                memory.id,
+                episodic_memory_text(memory),
+                memory.timestamp.strftime("%Y-%m-%d"),
+            )
+
+    def add(self, memory_id: str, text: str, date_str: str):
+        """写入或覆盖一条记忆的向量"""
+        self._set_vector(memory_id, self.embedder.embed(text), date_str)
+
+    def _set_vector(self, memory_id: str, vector: np.ndarray, date_str: str):
+        row = self._rows.get(memory_id)
+        if row is not None:
+            self._doc_freq -= self._matrix[row] != 0
+            self._matrix[row] = vector
+            self._dates[row] = date_str
+        else:
+            row = len(self._ids)
+            self._ensure_capacity(row + 1)
+            self._matrix[row] = vector
+            self._ids.append(memory_id)
+            self._dates.append(date_str)
+            self._rows[memory_id] = row
+
+        self._doc_freq += vector != 0
+
+    def remove(self, memory_id: str) -> bool:
+        """删除一条记忆，用最后一行填补空位"""
+        row = self._rows.pop(memory_id, None)
+        if row is None:
+            return False
+
+        self._doc_freq -= self._matrix[row] != 0
+
+        last = len(self._ids) - 1
+        if row != last:
+            last_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = last_id
+            self._dates[row] = self._dates[last]
+            self._rows[last_id] = row
+
+        self._matrix[last] = 0
+        self._ids.pop()
+        self._dates.pop()
+        return True
+
+    def clear(self):
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self._ids.clear()
+        self._dates.clear()
+        self._rows.clear()
+        self._doc_freq[:] = 0
+
+    def search(
+        self,
+        query_text: str,
+        top_k: int = 20,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        min_score: float = 0.0,
+    ) -> List[Tuple[str, float]]:
+        """
+        余弦相似度检索
+        日期为YYYY-MM-DD字符串，返回按分数降序的(记忆id, 分数)
+        """
+        count = len(self._ids)
+        if count == 0 or top_k <= 0:
+            return []
+
+        query = self.embedder.embed(query_text)
+        if not query.any():
+            return []
+
+        idf = np.log((1.0 + count) / (1.0 + self._doc_freq)) + 1.0
+        query = query * idf
+        query /= np.linalg.norm(query)
+
+        scores = self._matrix[:count] @ query
+
+        if start_date is not None or end_date is not None:
+            dates = np.asarray(self._dates)
+            mask = np.ones(count, dtype=bool)
+            if start_date is not None:
+                mask &= dates >= start_date
+            if end_date is not None:
+                mask &= dates <= end_date
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(top_k, count)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        return [
+            (self._ids[row], float(scores[row]))
+            for row in candidates
+            if scores[row] > min_score
+        ]
+
+    def get_date(self, memory_id: str) -> Optional[str]:
+        row = self._rows.get(memory_id)
+        return self._dates[row] if row is not None else None
+
+    def save(self, filepath: str, memory_ids: Optional[Iterable[str]] = None):
+        """原子地保存到.npz文件，传入 memory_ids 时只保存这些记忆(增量文件)"""
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        if memory_ids is None:
+            count = len(self._ids)
+            matrix = self._matrix[:count]
+            ids, dates = self._ids, self._dates
+        else:
+            rows = [
+                self._rows[memory_id]
+                for memory_id in dict.fromkeys(memory_ids)
+                if memory_id in self._rows
+            ]
+            matrix = self._matrix[rows]
+            ids = [self._ids[row] for row in rows]
+            dates = [self._dates[row] for row in rows]
+
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                matrix=matrix,
+                ids=np.asarray(ids, dtype=str),
+                dates=np.asarray(dates, dtype=str),
+            )
+        os.replace(tmp_path, filepath)
+
+    def load(self, filepath: str, merge: bool = False) -> bool:
+        """从.npz文件加载，merge 为 True 时把文件中的记忆写入或覆盖到当前索引"""
+        if not os.path.exists(filepath):
+            return False
+
+        with np.load(filepath) as data:
+            matrix = data["matrix"].astype(np.float32)
+            ids = data["ids"].tolist()
+            dates = data["dates"].tolist()
+
+        if matrix.shape[1:] != (self.dim,):
+            print(f"向量索引维度不匹配 {filepath}: {matrix.shape}")
+            return False
+
+        if merge:
+            for memory_id, date_str, vector in zip(ids, dates, matrix):
+                self._set_vector(memory_id, vector, date_str)
+            return True
+
+        self._matrix = matrix
+        self._ids = ids
+        self._dates = dates
+        self._rows = {memory_id: row for row, memory_id in enumerate(ids)}
+        self._doc_freq = (matrix != 0).sum(axis=0).astype(np.float32)
+        return True
+
+    def _ensure_capacity(self, size: int):
+        capacity = self._matrix.shape[0]
+        if size <= capacity:
+            return
+
+        new_capacity = max(size, capacity * 2, 64)
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = matrix
@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+
+class EventLog:
+    """
+    事件预写日志
+    receive_event 时追加写入，每条记录带会话内单调递增的序号，
+    一个写线程把同时到达的记录合并写入后只 fsync 一次(组提交)。
+    事件处理完成后追加处理水位，重新打开时重放水位之后的记录；
+    所有记录都已处理且文件超过 compact_bytes 时重写为只包含水位的新文件
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        sync: bool = True,
+        max_batch: int = 1024,
+        compact_bytes: int = 16 * 1024 * 1024,
+    ):
+        """
+        sync: append 是否等待写入磁盘后再返回
+        max_batch: 一次提交最多合并多少条记录
+        """
+        self.filepath = filepath
+        self.sync = sync
+        self.max_batch = max(1, max_batch)
+        self.compact_bytes = compact_bytes
+
+        self.logger = logging.getLogger("EventLog")
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._pending: List[str] = []
+        # 写线程已经处理到的最大序号，包括写入失败的记录
+        self._written_seq = 0
+        # 写入失败、还没有通知 append 调用方的序号
+        self._failed_seqs: Set[int] = set()
+        self._write_error: Optional[OSError] = None
+        # 处理水位: 小于等于该序号的记录都已处理
+        self._processed_seq = 0
+        # 乱序完成、还不能推进水位的序号
+        self._processed_out_of_order: Set[int] = set()
+        self._marker_dirty = False
+        self._closed = False
+        # 写入失败且没能截断时，文件末尾可能留有半行，下一次提交先换行
+        self._partial_line = False
+
+        self.stats = {
+            "appended": 0,
+            "commits": 0,
+            "committed_records": 0,
+            "replayed": 0,
+            "compactions": 0,
+            "write_errors": 0,
+        }
+
+        self._unprocessed = self._recover()
+        self.stats["replayed"] = len(self._unprocessed)
+
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        self._file = open(self.filepath, "ab")
+        self._bytes = self._file.tell()
+
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="event-log-writer", daemon=True
+        )
+        self._writer.start()
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """追加一条事件记录，返回分配的序号；同步模式下写入失败时抛出 OSError"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("事件日志已关闭")
+
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending.append(
+                json.dumps(
+                    {"seq": seq, **record}, ensure_ascii=False, separators=(",", ":")
+                )
+            )
+            self.stats["appended"] += 1
+            self._cond.notify_all()
+
+            if self.sync:
+                while self._written_seq < seq and not self._closed:
+                    self._cond.wait()
+                if seq in self._failed_seqs:
+                    self._failed_seqs.discard(seq)
+                    raise OSError(f"事件日志写入失败: {self._write_error}")
+        return seq
+
+    def mark_processed(self, seq: Optional[int]):
+        """标记记录已处理，水位只在之前的记录都处理完后推进"""
+        if seq is None:
+            return
+
+        with self._cond:
+            self._mark_processed_locked(seq)
+
+    def _mark_processed_locked(self, seq: int):
+        if seq <= self._processed_seq:
+            return
+        self._processed_out_of_order.add(seq)
+        advanced = False
+        while self._processed_seq + 1 in self._processed_out_of_order:
+            self._processed_seq += 1
+            self._processed_out_of_order.discard(self._processed_seq)
+            advanced = True
+        if advanced:
+            self._marker_dirty = True
+            self._cond.notify_all()
+
+    def take_unprocessed(self) -> List[Dict[str, Any]]:
+        """上次关闭前没有处理完的记录，按序号排列，只返回一次"""
+        with self._lock:
+            records, self._unprocessed = self._unprocessed, []
+        return records
+
+    def close(self):
+        """写完剩余记录后关闭"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update(
+                last_seq=self._next_seq - 1,
+                processed_seq=self._processed_seq,
+                bytes=self._bytes,
+                average_commit_size=(
+                    stats["committed_records"] / stats["commits"]
+                    if stats["commits"]
+                    else 0.0
+                ),
+            )
+        return stats
+
+    def _recover(self) -> List[Dict[str, Any]]:
+        """读取已有日志，恢复序号和处理水位，返回未处理的记录"""
+        records: Dict[int, Dict[str, Any]] = {}
+        processed_seq: Optional[int] = None
+
+        if os.path.exists(self.filepath):
+            with open(self.filepath, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 崩溃时最后一行可能只写了一半
+                        continue
+                    if "seq" in entry:
+                        records[entry["seq"]] = entry
+                    elif "processed" in entry:
+                        processed_seq = max(processed_seq or 0, entry["processed"])
+
+        last_seq = max(records) if records else processed_seq
+        if last_seq is None:
+            # 新日志从当前微秒时间开始编号，删除日志后序号也不会回退
+            last_seq = time.time_ns() // 1000
+        if processed_seq is None:
+            processed_seq = min(records) - 1 if records else last_seq
+
+        self._next_seq = last_seq + 1
+        self._written_seq = last_seq
+        self._processed_seq = processed_seq
+        return [records[seq] for seq in sorted(records) if seq > processed_seq]
+
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._marker_dirty and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending and not self._marker_dirty:
+                    return
+
+                lines = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+                num_records = len(lines)
+                upto = self._next_seq - 1 - len(self._pending)
+                if self._marker_dirty and not self._pending:
+                    lines.append(f'{{"processed":{self._processed_seq}}}')
+                    self._marker_dirty = False
+                processed_seq = self._processed_seq
+
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            if self._partial_line:
+                data = b"\n" + data
+            error = None
+            try:
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._partial_line = False
+            except OSError as e:
+                error = e
+                self.logger.error(f"写入事件日志失败: {e}")
+                self._discard_partial_write()
+
+            with self._cond:
+                self._written_seq = upto
+                if error is None:
+                    self._bytes += len(data)
+                    self.stats["commits"] += 1
+                    self.stats["committed_records"] += num_records
+                else:
+                    # 写入失败的记录不算提交，同步 append 的调用方会收到错误；
+                    # 这些记录不会重放，直接计入处理水位，避免水位停在这里
+                    self.stats["write_errors"] += 1
+                    self._write_error = error
+                    failed = range(upto - num_records + 1, upto + 1)
+                    if self.sync:
+                        self._failed_seqs.update(failed)
+                    for seq in failed:
+                        self._mark_processed_locked(seq)
+                self._cond.notify_all()
+                compact = (
+                    self._bytes >= self.compact_bytes
+                    and processed_seq >= upto
+                    and not self._pending
+                )
+
+            if compact:
+                self._compact(processed_seq)
+
+    def _discard_partial_write(self):
+        """写入失败后截断到写入前的长度，部分写入的字节不会和下一次提交拼成一行"""
+        try:
+            self._file.close()
+        except OSError:
+            # 关闭时会再次尝试写出缓冲区，截断时一并丢弃
+            pass
+        try:
+            os.truncate(self.filepath, self._bytes)
+        except OSError as e:
+            self.logger.error(f"截断事件日志失败: {e}")
+            self._partial_line = True
+        self._file = open(self.filepath, "ab")
+
+    def _compact(self, processed_seq: int):
+        """所有记录都已处理，重写为只包含处理水位的新文件"""
+        tmp_path = f"{self.filepath}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(f'{{"processed":{processed_seq}}}\n'.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.filepath)
+        except OSError as e:
+            self.logger.error(f"压缩事件日志失败: {e}")
+        finally:
+            if self._file.closed:
+                self._file = open(self.filepath, "ab")
+
+        with self._lock:
+            self._bytes = self._file.tell()
+            self.stats["compactions"] += 1
@@ -0,0 +1,68 @@
+from typing import List
+
+from .data_structures import CognitiveEvent
+
+
+def estimate_event_tokens(event: CognitiveEvent) -> int:
+    """粗略估算单个事件进入提取提示词后的token数，中文约一字一token"""
+    main_content = event.get_understood("main_content", "")
+    event_entity = event.get_understood("event_entity", "")
+    # ID、类型等固定格式的开销
+    return len(main_content or "") + len(event_entity or "") + 24
+
+
+def split_event_windows(
+    events: List[CognitiveEvent],
+    max_tokens: int = 3000,
+    max_seconds: float = 0.0,
+    overlap: int = 3,
+) -> List[List[CognitiveEvent]]:
+    """
+    按token预算和时间跨度把事件切分成窗口
+    相邻窗口重叠 overlap 个事件，保证跨窗口的上下文不丢失
+    max_tokens 和 max_seconds 为 0 表示不按该条件切分
+    """
+    if not events:
+        return []
+
+    windows: List[List[CognitiveEvent]] = []
+    current: List[CognitiveEvent] = []
+    current_tokens = 0
+    # 当前窗口中不属于重叠部分的事件数
+    fresh_count = 0
+
+    for event in events:
+        tokens = estimate_event_tokens(event)
+
+        exceeds_tokens = max_tokens and current_tokens + tokens > max_tokens
+        exceeds_time = (
+            max_seconds
+            and current
+            and event.timestamp - current[0].timestamp > max_seconds
+        )
+
+        if fresh_count and (exceeds_tokens or exceeds_time):
+            windows.append(current)
+
+            current = current[-overlap:] if overlap > 0 else []
+            # 重叠部分本身不能占满预算
+            while (
+                current
+                and max_tokens
+                and (
+                    sum(estimate_event_tokens(item) for item in current) + tokens
+                    > max_tokens
+                )
+            ):
+                current = current[1:]
+            current_tokens = sum(estimate_event_tokens(item) for item in current)
+            fresh_count = 0
+
+        current.append(event)
+        current_tokens += tokens
+        fresh_count += 1
+
+    if fresh_count:
+        windows.append(current)
+
+    return windows
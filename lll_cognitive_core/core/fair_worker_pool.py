@@ -0,0 +1,169 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Set, Tuple
+
+
+class FairWorkerPool:
+    """
+    按键公平调度的共享线程池
+    每个键(会话)有独立的任务队列，键之间轮转调度，同一个键的任务按提交顺序串行执行
+    定时任务由一个计时线程在到期时提交到对应键的队列
+    """
+
+    def __init__(self, num_workers: int = 8, name: str = "cognitive-worker"):
+        self.num_workers = num_workers
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._queues: Dict[str, Deque[Tuple[Future, Callable, tuple, dict]]] = {}
+        # 有待执行任务且当前没有任务在运行的键，按轮转顺序排列
+        self._ready: Deque[str] = deque()
+        self._running_keys: Set[str] = set()
+        self._shutdown = False
+
+        # 定时任务堆: (到期时间, 序号, 键, 任务, 参数, 关键字参数)，计时线程单独等待，
+        # 与工作线程共用一把锁
+        self._timer_cond = threading.Condition(self._lock)
+        self._timers: List[Tuple[float, int, str, Callable, tuple, dict]] = []
+        self._timer_sequence = itertools.count()
+
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timers": 0,
+        }
+
+        self.logger = logging.getLogger("FairWorkerPool")
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        self._timer_thread = threading.Thread(
+            target=self._run_timers, name=f"{name}-timer", daemon=True
+        )
+        self._timer_thread.start()
+
+    def submit(self, key: str, fn: Callable, *args, **kwargs) -> Future:
+        """提交任务到指定键的队列"""
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("FairWorkerPool 已关闭")
+            return self._enqueue(key, fn, args, kwargs)
+
+    def _enqueue(self, key: str, fn: Callable, args: tuple, kwargs: dict) -> Future:
+        """持有 _cond 时调用"""
+        future: Future = Future()
+
+        task_queue = self._queues.get(key)
+        if task_queue is None:
+            task_queue = self._queues[key] = deque()
+        task_queue.append((future, fn, args, kwargs))
+        self.stats["submitted"] += 1
+
+        if len(task_queue) == 1 and key not in self._running_keys:
+            self._ready.append(key)
+            self._cond.notify()
+
+        return future
+
+    def submit_after(self, delay: float, key: str, fn: Callable, *args, **kwargs):
+        """delay 秒后把任务提交到指定键的队列，用于没有新事件时也需要执行的定时工作"""
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("FairWorkerPool 已关闭")
+
+            heapq.heappush(
+                self._timers,
+                (
+                    time.monotonic() + max(0.0, delay),
+                    next(self._timer_sequence),
+                    key,
+                    fn,
+                    args,
+                    kwargs,
+                ),
+            )
+            self.stats["timers"] += 1
+            # 新任务可能比计时线程正在等待的更早到期
+            self._timer_cond.notify()
+
+    def shutdown(self, wait: bool = True):
+        with self._cond:
+            self._shutdown = True
+            self._timers.clear()
+            self._cond.notify_all()
+            self._timer_cond.notify()
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            self._timer_thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self.stats,
+                "num_workers": self.num_workers,
+                "pending": sum(len(task_queue) for task_queue in self._queues.values()),
+                "active_keys": len(self._running_keys),
+                "waiting_keys": len(self._ready),
+                "pending_timers": len(self._timers),
+            }
+
+    def _run_timers(self):
+        with self._timer_cond:
+            while not self._shutdown:
+                if not self._timers:
+                    self._timer_cond.wait()
+                    continue
+
+                delay = self._timers[0][0] - time.monotonic()
+                if delay > 0:
+                    self._timer_cond.wait(delay)
+                    continue
+
+                _, _, key, fn, args, kwargs = heapq.heappop(self._timers)
+                self._enqueue(key, fn, args, kwargs)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._ready and not self._shutdown:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+
+                key = self._ready.popleft()
+                task_queue = self._queues[key]
+                future, fn, args, kwargs = task_queue.popleft()
+                self._running_keys.add(key)
+
+            failed = False
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    failed = True
+                    self.logger.error(f"任务执行错误 [{key}]: {e}")
+                    future.set_exception(e)
+
+            with self._cond:
+                self._running_keys.discard(key)
+                self.stats["failed" if failed else "completed"] += 1
+
+                # 还有任务则排到轮转队尾，保证其他键有机会执行
+                if task_queue:
+                    self._ready.append(key)
+                    self._cond.notify()
+                else:
+                    del self._queues[key]
@@ -0,0 +1,146 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from lll_simple_ai_shared import BehaviorPlan, UnderstoodData
+
+from .data_structures import UnderstandEventData
+
+# 规则命中后的处理方式
+FAST_PATH_SKIP = "skip"  # 不生成行为
+FAST_PATH_CANNED = "canned"  # 直接执行预设的行为计划
+FAST_PATH_DEFER = "defer"  # 暂存，攒够一批后只生成一次行为
+
+FAST_PATH_ACTIONS = (FAST_PATH_SKIP, FAST_PATH_CANNED, FAST_PATH_DEFER)
+
+# match 中可以使用的原始事件字段，其他字段都取自理解数据
+EVENT_MATCH_FIELDS = ("type", "source", "data")
+
+# 可选的默认规则，通过 CognitiveCoreConfig.fast_path_rules 启用
+DEFAULT_FAST_PATH_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "low_priority_background",
+        "action": FAST_PATH_SKIP,
+        "match": {"event_type": "other", "response_priority": "low"},
+        "max_importance_score": 10,
+    },
+    {
+        "name": "ambient_sensor",
+        "action": FAST_PATH_DEFER,
+        "match": {"type": ["sensor", "vision"], "response_priority": "low"},
+        "max_importance_score": 30,
+    },
+]
+
+
+@dataclass
+class FastPathRule:
+    """
+    快速路径规则
+    match 中的 type/source/data 匹配原始事件，其他字段匹配理解数据(UnderstoodData)，
+    值为列表时表示匹配其中任意一个，字段值为空时不匹配
+    """
+
+    name: str
+    action: str
+    match: Dict[str, Any] = field(default_factory=dict)
+    # 重要性不高于该值时才匹配
+    max_importance_score: Optional[int] = None
+    # 对原始事件内容的正则匹配
+    data_pattern: Optional[str] = None
+    # action 为 canned 时执行的行为计划
+    plan: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.action not in FAST_PATH_ACTIONS:
+            raise ValueError(f"未知的快速路径处理方式: {self.action}")
+
+        unknown = [
+            name
+            for name in self.match
+            if name not in EVENT_MATCH_FIELDS
+            and name not in UnderstoodData.model_fields
+        ]
+        if unknown:
+            raise ValueError(f"快速路径规则 {self.name} 使用了未知字段: {unknown}")
+
+        self._pattern = re.compile(self.data_pattern) if self.data_pattern else None
+        self.behavior_plan: Optional[BehaviorPlan] = None
+        if self.action == FAST_PATH_CANNED:
+            # 预先校验，执行时不再解析
+            self.behavior_plan = BehaviorPlan.model_validate(
+                {"plan": self.plan, "current_situation": ""}
+            )
+
+    def matches(
+        self, event_data: UnderstandEventData, understood_data: UnderstoodData
+    ) -> bool:
+        for name, expected in self.match.items():
+            source = event_data if name in EVENT_MATCH_FIELDS else understood_data
+            value = getattr(source, name, None)
+
+            if isinstance(expected, (list, tuple, set)):
+                if value not in expected:
+                    return False
+            elif value != expected:
+                return False
+
+        if self.max_importance_score is not None and (
+            (understood_data.importance_score or 0) > self.max_importance_score
+        ):
+            return False
+
+        if self._pattern is not None and not self._pattern.search(
+            event_data.data or ""
+        ):
+            return False
+
+        return True
+
+
+class FastPathEngine:
+    """
+    快速路径规则引擎
+    在行为生成和记忆查询之前按顺序匹配规则，第一条命中的规则决定处理方式
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]] = None):
+        self.rules = [
+            rule if isinstance(rule, FastPathRule) else FastPathRule(**rule)
+            for rule in rules or []
+        ]
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "evaluated": 0,
+            "matched": 0,
+            **{action: 0 for action in FAST_PATH_ACTIONS},
+        }
+        self.rule_hits: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+
+    def evaluate(
+        self, event_data: UnderstandEventData, understood_data: UnderstoodData
+    ) -> Optional[FastPathRule]:
+        """返回第一条命中的规则，没有命中时返回 None"""
+        if not self.rules:
+            return None
+
+        matched = None
+        for rule in self.rules:
+            if rule.matches(event_data, understood_data):
+                matched = rule
+                break
+
+        with self._lock:
+            self.stats["evaluated"] += 1
+            if matched is not None:
+                self.stats["matched"] += 1
+                self.stats[matched.action] += 1
+                self.rule_hits[matched.name] += 1
+
+        return matched
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "rule_hits": dict(self.rule_hits)}
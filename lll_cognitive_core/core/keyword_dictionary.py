@@ -0,0 +1,300 @@
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+# 词与词之间的分隔: 空白、标点和下划线
+_SEPARATOR_PATTERN = re.compile(r"[\W_]+")
+_LATIN_WORD_PATTERN = re.compile(r"[a-z]+")
+
+# 以 s 结尾但不是复数的词，或单复数同形的词
+_UNSTEMMED_WORDS = frozenset(
+    (
+        "news",
+        "series",
+        "species",
+        "means",
+        "always",
+        "perhaps",
+        "whereas",
+        "physics",
+        "mathematics",
+        "economics",
+        "politics",
+        "athletics",
+        "lens",
+        "bias",
+        "alias",
+        "atlas",
+        "canvas",
+        "chaos",
+        "cosmos",
+        "christmas",
+    )
+)
+# 单数以 ie 结尾的词，复数 ies 只去掉 s
+_IE_SINGULARS = frozenset(
+    (
+        "movie",
+        "cookie",
+        "zombie",
+        "calorie",
+        "rookie",
+        "selfie",
+        "hoodie",
+        "brownie",
+        "smoothie",
+        "genie",
+        "pixie",
+        "prairie",
+        "auntie",
+        "goalie",
+        "newbie",
+        "foodie",
+        "veggie",
+    )
+)
+
+
+def _stem(word: str) -> str:
+    """英文复数的简单还原，只处理纯字母且足够长的词"""
+    if (
+        len(word) <= 3
+        or word in _UNSTEMMED_WORDS
+        or not _LATIN_WORD_PATTERN.fullmatch(word)
+    ):
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        if word[:-1] in _IE_SINGULARS:
+            return word[:-1]
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    关键词规范化
+    全角半角统一(NFKC)、大小写折叠、去掉标点并合并空白、英文复数还原
+    """
+    if not keyword:
+        return ""
+    text = unicodedata.normalize("NFKC", keyword).casefold()
+    return " ".join(_stem(word) for word in _SEPARATOR_PATTERN.split(text) if word)
+
+
+def _grams(term: str) -> Set[str]:
+    """首尾补位后的二元组"""
+    padded = f"\x02{term}\x03"
+    return {padded[i : i + 2] for i in range(len(padded) - 1)}
+
+
+def _within_edit_distance(a: str, b: str, max_edits: int) -> bool:
+    """
+    编辑距离是否不超过 max_edits，相邻字符交换算一次编辑
+    某一行全部超出时提前结束
+    """
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    before_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        if min(current) > max_edits:
+            return False
+        before_previous, previous = previous, current
+    return previous[-1] <= max_edits
+
+
+class _TrieNode:
+    __slots__ = ("children", "term_id")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.term_id: Optional[int] = None
+
+
+class KeywordDictionary:
+    """
+    关键词词典
+    关键词规范化后驻留为整数词项ID，倒排索引的键使用词项ID，同一个词只保存一份字符串。
+    前缀查找使用字典树；规范化后没有精确命中时再做模糊查找，
+    先按长度和二元组索引筛选候选词，再计算编辑距离
+    """
+
+    def __init__(
+        self,
+        prefix_min_length: int = 0,
+        fuzzy_max_edits: int = 0,
+        fuzzy_min_length: int = 4,
+        max_expansions: int = 16,
+    ):
+        """
+        prefix_min_length: 查询词至少多长才做前缀匹配，0 表示不使用
+        fuzzy_max_edits: 模糊匹配允许的最大编辑距离，0 表示不使用
+        fuzzy_min_length: 查询词至少多长才做模糊匹配，避免短词匹配过宽
+        max_expansions: 每个查询词最多扩展出多少个词项
+        """
+        self.prefix_min_length = prefix_min_length
+        self.fuzzy_max_edits = fuzzy_max_edits
+        self.fuzzy_min_length = fuzzy_min_length
+        self.max_expansions = max_expansions
+
+        self._lock = threading.Lock()
+        self._terms: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        self._trie = _TrieNode()
+        # 词项长度 -> 二元组 -> 词项ID
+        self._gram_index: Dict[int, Dict[str, Set[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @property
+    def terms(self) -> List[str]:
+        """按词项ID排列的规范化词项"""
+        return self._terms
+
+    def intern(self, keyword: str) -> Optional[int]:
+        """返回关键词的词项ID，不存在时新建，规范化后为空时返回 None"""
+        term = normalize_keyword(keyword)
+        if not term:
+            return None
+
+        term_id = self._term_ids.get(term)
+        if term_id is not None:
+            return term_id
+
+        with self._lock:
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._add_term(term)
+        return term_id
+
+    def get_id(self, keyword: str) -> Optional[int]:
+        """精确查找，不新建词项"""
+        return self._term_ids.get(normalize_keyword(keyword))
+
+    def term(self, term_id: int) -> str:
+        return self._terms[term_id]
+
+    def lookup(self, keyword: str) -> List[int]:
+        """规范化后精确匹配，加上前缀匹配和模糊匹配的词项ID，精确匹配排在最前"""
+        term = normalize_keyword(keyword)
+        if not term:
+            return []
+
+        matched: Dict[int, None] = {}
+        term_id = self._term_ids.get(term)
+        if term_id is not None:
+            matched[term_id] = None
+
+        if not self.prefix_min_length and not self.fuzzy_max_edits:
+            return list(matched)
+
+        # 遍历字典树和二元组索引时其他线程可能正在新增词项
+        with self._lock:
+            if self.prefix_min_length and len(term) >= self.prefix_min_length:
+                for term_id in self._prefix_ids(term):
+                    matched[term_id] = None
+
+            # 拼写错误的容错，已经精确命中时不再扩展
+            if (
+                not matched
+                and self.fuzzy_max_edits
+                and len(term) >= self.fuzzy_min_length
+            ):
+                for term_id in self._fuzzy_ids(term):
+                    if len(matched) >= self.max_expansions:
+                        break
+                    matched[term_id] = None
+
+        return list(matched)
+
+    def lookup_all(self, keywords: Iterable[str]) -> List[int]:
+        """多个查询词的词项ID，去重后保持顺序"""
+        matched: Dict[int, None] = {}
+        for keyword in keywords:
+            for term_id in self.lookup(keyword):
+                matched[term_id] = None
+        return list(matched)
+
+    def clear(self):
+        with self._lock:
+            self._terms = []
+            self._term_ids = {}
+            self._trie = _TrieNode()
+            self._gram_index = {}
+
+    def _add_term(self, term: str) -> int:
+        term_id = len(self._terms)
+        self._terms.append(term)
+        self._term_ids[term] = term_id
+
+        node = self._trie
+        for char in term:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.term_id = term_id
+
+        grams_by_length = self._gram_index.setdefault(len(term), {})
+        for gram in _grams(term):
+            grams_by_length.setdefault(gram, set()).add(term_id)
+        return term_id
+
+    def _prefix_ids(self, prefix: str) -> List[int]:
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        # 按字典树深度优先收集，最多 max_expansions 个
+        result: List[int] = []
+        stack = [node]
+        while stack and len(result) < self.max_expansions:
+            node = stack.pop()
+            if node.term_id is not None:
+                result.append(node.term_id)
+            stack.extend(node.children.values())
+        return result
+
+    def _fuzzy_ids(self, term: str) -> List[int]:
+        # 每次编辑最多破坏三个二元组(相邻字符交换)
+        grams = _grams(term)
+        min_shared = len(grams) - 3 * self.fuzzy_max_edits
+        if min_shared <= 0:
+            return []
+
+        shared: Counter = Counter()
+        for length in range(
+            len(term) - self.fuzzy_max_edits, len(term) + self.fuzzy_max_edits + 1
+        ):
+            grams_by_length = self._gram_index.get(length)
+            if grams_by_length is None:
+                continue
+            for gram in grams:
+                shared.update(grams_by_length.get(gram, ()))
+
+        result: List[int] = []
+        for term_id, count in shared.items():
+            if count < min_shared:
+                continue
+            if _within_edit_distance(term, self._terms[term_id], self.fuzzy_max_edits):
+                result.append(term_id)
+        return result
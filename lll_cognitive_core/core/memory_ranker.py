@@ -0,0 +1,157 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from lll_simple_ai_shared import EpisodicMemoriesModels
+
+from ..utils.tokenize_text import tokenize_text
+
+
+def estimate_memory_tokens(memory: EpisodicMemoriesModels) -> int:
+    """粗略估算记忆进入提示词后的token数，中文约一字一token"""
+    return len(memory.content or "") + 4
+
+
+class MemoryRanker:
+    """
+    回想前的记忆排序
+    综合BM25相关度、重要性和时间衰减打分，按top-k和token预算截断
+    """
+
+    def __init__(
+        self,
+        top_k: int = 20,
+        token_budget: int = 0,
+        bm25_weight: float = 0.6,
+        importance_weight: float = 0.25,
+        recency_weight: float = 0.15,
+        half_life_days: float = 7.0,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        # 0 表示不限制
+        self.top_k = top_k
+        self.token_budget = token_budget
+
+        self.bm25_weight = bm25_weight
+        self.importance_weight = importance_weight
+        self.recency_weight = recency_weight
+        self.half_life_seconds = half_life_days * 86400
+        self.k1 = k1
+        self.b = b
+
+    def score(
+        self,
+        memories: List[EpisodicMemoriesModels],
+        query_terms: List[str],
+        now: Optional[float] = None,
+    ) -> np.ndarray:
+        """计算每条记忆的综合分数"""
+        count = len(memories)
+        if count == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        now = time.time() if now is None else now
+
+        importance = np.fromiter(
+            (memory.importance or 0 for memory in memories),
+            dtype=np.float64,
+            count=count,
+        )
+        timestamps = np.fromiter(
+            (memory.timestamp.timestamp() for memory in memories),
+            dtype=np.float64,
+            count=count,
+        )
+
+        relevance = self._bm25(memories, query_terms)
+        max_relevance = relevance.max()
+        if max_relevance > 0:
+            relevance = relevance / max_relevance
+
+        age = np.maximum(now - timestamps, 0.0)
+        recency = np.exp(-np.log(2) * age / self.half_life_seconds)
+
+        return (
+            self.bm25_weight * relevance
+            + self.importance_weight * np.clip(importance, 0, 100) / 100
+            + self.recency_weight * recency
+        )
+
+    def rank(
+        self,
+        memories: List[EpisodicMemoriesModels],
+        query_terms: List[str],
+        now: Optional[float] = None,
+    ) -> List[EpisodicMemoriesModels]:
+        """按分数降序返回截断后的记忆"""
+        if not memories:
+            return []
+
+        scores = self.score(memories, query_terms, now)
+        # 分数相同时保持原有顺序
+        order = np.argsort(-scores, kind="stable")
+
+        if self.top_k:
+            order = order[: self.top_k]
+
+        if self.token_budget:
+            tokens = np.fromiter(
+                (estimate_memory_tokens(memories[i]) for i in order),
+                dtype=np.int64,
+                count=len(order),
+            )
+            within = np.cumsum(tokens) <= self.token_budget
+            # 至少保留分数最高的一条
+            within[0] = True
+            order = order[within]
+
+        return [memories[i] for i in order]
+
+    def _bm25(
+        self, memories: List[EpisodicMemoriesModels], query_terms: List[str]
+    ) -> np.ndarray:
+        count = len(memories)
+
+        term_ids: Dict[str, int] = {}
+        for term in query_terms or []:
+            for token in [term.lower()] + tokenize_text(term):
+                term_ids.setdefault(token, len(term_ids))
+
+        if not term_ids:
+            return np.zeros(count, dtype=np.float64)
+
+        doc_lengths = np.zeros(count, dtype=np.float64)
+        doc_indices: List[int] = []
+        term_indices: List[int] = []
+
+        for doc, memory in enumerate(memories):
+            keywords = memory.keywords or []
+            tokens = tokenize_text(memory.content or "")
+            for keyword in keywords:
+                # 关键词整体作为一个词项，同时参与分词
+                tokens.append(keyword.lower())
+                tokens.extend(tokenize_text(keyword))
+            doc_lengths[doc] = len(tokens)
+
+            for token in tokens:
+                term = term_ids.get(token)
+                if term is not None:
+                    doc_indices.append(doc)
+                    term_indices.append(term)
+
+        n_terms = len(term_ids)
+        tf = np.bincount(
+            np.asarray(doc_indices, dtype=np.int64) * n_terms
+            + np.asarray(term_indices, dtype=np.int64),
+            minlength=count * n_terms,
+        ).reshape(count, n_terms)
+
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((count - df + 0.5) / (df + 0.5))
+
+        avg_length = doc_lengths.mean() or 1.0
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths / avg_length)
+        weights = tf * (self.k1 + 1) / (tf + norm[:, None])
+
+        return weights @ idf
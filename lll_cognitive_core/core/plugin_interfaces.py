@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Callable, Optional, List
 from lll_simple_ai_shared import (
     UnderstoodData,
     RecallResultsModels,
@@ -15,6 +15,21 @@ class EventUnderstandingPlugin:
         # 事件理解
         return UnderstoodData
 
+    def understand_events(
+        self, raw_events: UnderstandEventsInput
+    ) -> List[UnderstoodData]:
+        """批量事件理解(可选)，共享同一份上下文，结果按输入顺序返回"""
+        return [
+            self.understand_event(
+                UnderstandEventInput(
+                    understand_event=event,
+                    recent_events=raw_events.recent_events,
+                    active_goals=raw_events.active_goals,
+                )
+            )
+            for event in raw_events.understand_events
+        ]
+
 
 class AssociativeRecallPlugin:
     def associative_recall(self, recall_request: AssociativeRecallInput) -> str:
@@ -25,6 +40,15 @@ class BehaviorGenerationPlugin:
     def generate_behavior(self, cognitive_state: GenerateBehaviorInput) -> Dict:
         return BehaviorPlan
 
+    def generate_behavior_stream(
+        self, cognitive_state: GenerateBehaviorInput, on_action: Callable[[Any], None]
+    ) -> Dict:
+        """流式生成行为(可选)，每生成一个完整动作就调用 on_action，返回完整的行为计划"""
+        behavior_plan = self.generate_behavior(cognitive_state)
+        for action in behavior_plan.plan if behavior_plan else []:
+            on_action(action)
+        return behavior_plan
+
 
 class MemoryExtractionPlugin:
     """记忆提取插件基类 - 只定义与CognitiveCore交互的接口"""
@@ -56,6 +80,9 @@ class MemoryManagerPlugin:
         importance_min: Optional[int],
         keywords: Optional[List[str]],
         associations: Optional[List[str]],
+        mode: str = "keyword",
+        query_text: Optional[str] = None,
+        top_k: int = 20,
     ) -> List[EpisodicMemoriesModels]:
         """
         从存储加载情景记忆
@@ -65,5 +92,8 @@ class MemoryManagerPlugin:
             importance_min: 重要程度过滤
             keywords: 关键词
             associations: 联想词
+            mode: keyword 关键词匹配 semantic 向量语义检索
+            query_text: 语义检索的查询文本，为空时使用关键词和联想词
+            top_k: 语义检索最多返回多少条
         """
         raise NotImplementedError("子类必须实现query_episodic_memories方法")
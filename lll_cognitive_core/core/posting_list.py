@@ -0,0 +1,63 @@
+from typing import Dict, Iterable, Iterator, List
+
+
+class PostingList:
+    """
+    倒排索引的记录表
+    保持插入顺序的集合，增删查均为O(1)
+    """
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self._ids: Dict[str, None] = dict.fromkeys(ids)
+
+    def add(self, memory_id: str):
+        self._ids[memory_id] = None
+
+    def update(self, ids: Iterable[str]):
+        for memory_id in ids:
+            self._ids[memory_id] = None
+
+    def discard(self, memory_id: str):
+        self._ids.pop(memory_id, None)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __bool__(self) -> bool:
+        return bool(self._ids)
+
+    def __repr__(self) -> str:
+        return f"PostingList({list(self._ids)!r})"
+
+    def to_list(self) -> List[str]:
+        return list(self._ids)
+
+    @staticmethod
+    def union(*posting_lists: Iterable[str]) -> "PostingList":
+        """并集，按参数顺序保留首次出现的位置"""
+        result = PostingList()
+        for posting_list in posting_lists:
+            result.update(posting_list)
+        return result
+
+    @staticmethod
+    def intersection(*posting_lists: "PostingList") -> "PostingList":
+        """交集，从最短的记录表开始过滤，保持其插入顺序"""
+        if not posting_lists:
+            return PostingList()
+
+        ordered = sorted(posting_lists, key=len)
+        shortest, others = ordered[0], ordered[1:]
+        return PostingList(
+            memory_id
+            for memory_id in shortest
+            if all(memory_id in other for other in others)
+        )
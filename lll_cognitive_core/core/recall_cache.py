@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from lll_simple_ai_shared import RecallResultsModels
+
+RecallCacheKey = Tuple[Tuple[str, ...], str]
+
+
+class RecallCache:
+    """
+    联想回忆结果缓存
+    以排序后的记忆ID集合加规范化后的情境指纹为键，LRU淘汰
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+
+        self._entries: "OrderedDict[RecallCacheKey, RecallResultsModels]" = (
+            OrderedDict()
+        )
+        # 记忆ID到缓存键的反向索引，用于按记忆失效
+        self._keys_by_memory: Dict[str, Set[RecallCacheKey]] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def situation_fingerprint(current_situation: Optional[str]) -> str:
+        """情境指纹，忽略大小写、全半角、空白和标点的差异"""
+        text = unicodedata.normalize("NFKC", current_situation or "").casefold()
+        normalized = "".join(
+            char for char in text if unicodedata.category(char)[0] in ("L", "N")
+        )
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+    def make_key(
+        self, memory_ids: Iterable[str], current_situation: Optional[str]
+    ) -> RecallCacheKey:
+        return (
+            tuple(sorted(set(memory_ids))),
+            self.situation_fingerprint(current_situation),
+        )
+
+    def get(
+        self, memory_ids: Iterable[str], current_situation: Optional[str]
+    ) -> Optional[RecallResultsModels]:
+        key = self.make_key(memory_ids, current_situation)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return result
+
+    def put(
+        self,
+        memory_ids: Iterable[str],
+        current_situation: Optional[str],
+        result: RecallResultsModels,
+    ):
+        if self.max_size <= 0:
+            return
+
+        key = self.make_key(memory_ids, current_situation)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            for memory_id in key[0]:
+                self._keys_by_memory.setdefault(memory_id, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest, _ = self._entries.popitem(last=False)
+                self._unlink(oldest)
+
+    def invalidate_memories(self, memory_ids: Iterable[str]):
+        """记忆被更新时，移除所有包含这些记忆的缓存结果"""
+        with self._lock:
+            for memory_id in memory_ids:
+                for key in self._keys_by_memory.pop(memory_id, ()):
+                    if self._entries.pop(key, None) is not None:
+                        self.stats["invalidations"] += 1
+                        self._unlink(key)
+
+    def clear(self):
+        with self._lock:
+            self.stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._keys_by_memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                **self.stats,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            }
+
+    def _unlink(self, key: RecallCacheKey):
+        for memory_id in key[0]:
+            keys = self._keys_by_memory.get(memory_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_memory[memory_id]
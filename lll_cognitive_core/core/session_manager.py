@@ -0,0 +1,258 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..config.cognitive_core_config import CognitiveCoreConfig
+from .cognitive_core import CognitiveCore
+from .data_structures import CoreStatus
+from .fair_worker_pool import FairWorkerPool
+from .status_publisher import StatusPublisher, StatusSnapshot
+from .action_dispatcher import create_action_dispatcher
+from ..utils.model_router import ModelRouter
+from ..utils.usage_tracker import UsageTracker
+
+# 根据会话ID创建该会话的插件，返回 {插件类型: 插件实例}
+PluginFactory = Callable[[str], Dict[str, Any]]
+
+
+class SessionManager:
+    """
+    多会话托管
+    按会话ID管理多个 CognitiveCore，所有会话共享一个公平调度的线程池
+    空闲的会话先进入睡眠整理记忆，整理完成后从内存中移除(停放)，有新事件时重新创建
+
+    每个会话的记忆缓存相互独立，插件由 plugin_factory 按会话创建，
+    记忆管理插件应使用独立的根目录，例如:
+        CognitiveCorePluginDefaultMemoryManager(root_dir=f"memory/{session_id}")
+    """
+
+    def __init__(
+        self,
+        config: CognitiveCoreConfig = None,
+        plugin_factory: Optional[PluginFactory] = None,
+        num_workers: int = 8,
+        extraction_workers: int = 4,
+        idle_timeout: float = 600.0,
+        reaper_interval: float = 30.0,
+        model_router: Optional[ModelRouter] = None,
+    ):
+        self.config = config or CognitiveCoreConfig()
+        self.plugin_factory = plugin_factory
+        self.idle_timeout = idle_timeout
+        self.reaper_interval = reaper_interval
+
+        self.worker_pool = FairWorkerPool(num_workers)
+        # 记忆提取窗口只执行插件调用，不会等待其他任务，可以安全地跨会话共享
+        self.extraction_executor = ThreadPoolExecutor(
+            max_workers=extraction_workers, thread_name_prefix="memory-extraction"
+        )
+
+        # 所有会话共享发送线程和连接
+        self.action_dispatcher = (
+            create_action_dispatcher(self.config)
+            if self.config.orchestrator_url
+            else None
+        )
+        # 所有会话共享模型路由，按会话分别上报负荷
+        self.model_router = model_router
+        # 所有会话共享用量统计，预算按会话分别计算
+        self.usage_tracker = UsageTracker(
+            model_prices=self.config.model_prices,
+            session_token_budget=self.config.session_token_budget,
+            session_cost_budget=self.config.session_cost_budget,
+        )
+
+        self._sessions: Dict[str, CognitiveCore] = {}
+        self._last_active: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "sessions_created": 0,
+            "sessions_parked": 0,
+        }
+
+        # 汇总状态在读取时按 status_publish_interval 限速生成
+        self.status_publisher = StatusPublisher(
+            self._build_aggregated_status, self.config.status_publish_interval
+        )
+
+        self.logger = logging.getLogger("SessionManager")
+
+        self._reaper_stop = threading.Event()
+        self._reaper_thread: Optional[threading.Thread] = None
+        if reaper_interval > 0:
+            self._reaper_thread = threading.Thread(
+                target=self._reaper_loop, name="session-reaper", daemon=True
+            )
+            self._reaper_thread.start()
+
+    def get_session(self, session_id: str) -> CognitiveCore:
+        """获取会话，不存在时创建"""
+        with self._lock:
+            core = self._sessions.get(session_id)
+            if core is None:
+                core = self._create_session(session_id)
+                self._sessions[session_id] = core
+            self._last_active[session_id] = time.time()
+            return core
+
+    def wake_up(self, session_id: str):
+        self.get_session(session_id).wake_up()
+
+    def sleep(self, session_id: str):
+        with self._lock:
+            core = self._sessions.get(session_id)
+        if core is not None:
+            core.sleep()
+
+    def receive_event(self, session_id: str, raw_event: Dict[str, str]):
+        """接收会话事件，停放或新建的会话会自动唤醒"""
+        core = self.get_session(session_id)
+        if core.status == CoreStatus.AWAITING:
+            core.wake_up()
+        core.receive_event(raw_event)
+
+    def park_idle_sessions(self, now: Optional[float] = None):
+        """空闲会话先睡眠整理，整理完成后停放"""
+        now = time.time() if now is None else now
+
+        with self._lock:
+            idle = [
+                (session_id, core)
+                for session_id, core in self._sessions.items()
+                if now - self._last_active.get(session_id, now) >= self.idle_timeout
+            ]
+
+        for session_id, core in idle:
+            if core.status == CoreStatus.AWARE:
+                core.sleep()
+            elif (
+                core.status == CoreStatus.AWAITING
+                and core.stats["deep_consolidations_pending"] == 0
+            ):
+                with self._lock:
+                    # 检查期间可能又收到了新事件
+                    if self._sessions.get(session_id) is core and (
+                        now - self._last_active.get(session_id, now)
+                        >= self.idle_timeout
+                    ):
+                        del self._sessions[session_id]
+                        self._last_active.pop(session_id, None)
+                        self.stats["sessions_parked"] += 1
+                    else:
+                        continue
+                # 停放前保存快照并关闭事件日志，重新创建时可以热恢复
+                core.shutdown()
+
+    def get_system_status(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """单个会话的状态，或所有会话的汇总状态"""
+        if session_id is not None:
+            with self._lock:
+                core = self._sessions.get(session_id)
+            if core is None:
+                return {"status": "parked"}
+            return core.get_system_status()
+
+        self.status_publisher.publish()
+        return self.status_publisher.latest().status
+
+    def get_status_snapshot(
+        self,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+        timeout: float = 0.0,
+    ) -> Optional[StatusSnapshot]:
+        """
+        单个会话或汇总状态的快照，会话已停放时返回 None
+        传入 version 时最多等待 timeout 秒直到发布了更新的版本
+        """
+        if session_id is not None:
+            with self._lock:
+                core = self._sessions.get(session_id)
+            if core is None:
+                return None
+            return core.get_status_snapshot(version, timeout)
+
+        # 汇总状态没有处理线程推送，等待期间按发布间隔重新生成
+        deadline = time.time() + timeout
+        while True:
+            self.status_publisher.publish()
+            snapshot = self.status_publisher.latest()
+            remaining = deadline - time.time()
+            if version is None or snapshot.version > version or remaining <= 0:
+                return snapshot
+            time.sleep(min(remaining, max(self.status_publisher.min_interval, 0.05)))
+
+    def _build_aggregated_status(self) -> Dict[str, Any]:
+        with self._lock:
+            cores = list(self._sessions.values())
+            stats = dict(self.stats)
+
+        status_counts: Dict[str, int] = {}
+        events_processed = 0
+        for core in cores:
+            status_counts[core.status.value] = (
+                status_counts.get(core.status.value, 0) + 1
+            )
+            # 读取各会话已发布的快照，不直接读取处理线程正在修改的统计
+            events_processed += core.get_system_status()["processing_stats"][
+                "events_processed"
+            ]
+
+        return {
+            "sessions": len(cores),
+            "session_status": status_counts,
+            "events_processed": events_processed,
+            "queued_events": sum(core.event_queue.qsize() for core in cores),
+            "worker_pool": self.worker_pool.get_stats(),
+            "action_dispatcher": (
+                self.action_dispatcher.get_stats() if self.action_dispatcher else None
+            ),
+            "model_router": (
+                self.model_router.get_stats() if self.model_router else None
+            ),
+            "usage": self.usage_tracker.get_stats(),
+            **stats,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._reaper_stop.set()
+
+        with self._lock:
+            cores = list(self._sessions.values())
+        for core in cores:
+            core.shutdown()
+
+        self.worker_pool.shutdown(wait)
+        self.extraction_executor.shutdown(wait)
+        if self.action_dispatcher is not None:
+            self.action_dispatcher.shutdown(
+                wait, timeout=self.config.orchestrator_timeout
+            )
+
+    def _create_session(self, session_id: str) -> CognitiveCore:
+        core = CognitiveCore(
+            self.config,
+            session_id=session_id,
+            worker_pool=self.worker_pool,
+            extraction_executor=self.extraction_executor,
+            action_dispatcher=self.action_dispatcher,
+            model_router=self.model_router,
+            usage_tracker=self.usage_tracker,
+        )
+
+        if self.plugin_factory is not None:
+            for plugin_type, plugin_instance in self.plugin_factory(session_id).items():
+                core.register_plugin(plugin_type, plugin_instance)
+
+        self.stats["sessions_created"] += 1
+        return core
+
+    def _reaper_loop(self):
+        while not self._reaper_stop.wait(self.reaper_interval):
+            try:
+                self.park_idle_sessions()
+            except Exception as e:
+                self.logger.error(f"停放空闲会话错误: {e}")
@@ -0,0 +1,126 @@
+import os
+import json
+import zlib
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from lll_simple_ai_shared import UnderstoodData, EpisodicMemoriesModels
+
+from .data_structures import (
+    CognitiveEvent,
+    Goal,
+    UnderstandEventData,
+    WorkingMemory,
+)
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotStore:
+    """
+    工作记忆快照存储
+    zlib压缩的紧凑JSON，先写临时文件再原子替换，进程崩溃时不会留下损坏的快照
+    """
+
+    def __init__(self, filepath: str, compress_level: int = 6):
+        self.filepath = filepath
+        self.compress_level = compress_level
+
+    def exists(self) -> bool:
+        return os.path.exists(self.filepath)
+
+    def save(self, state: Dict[str, Any]) -> int:
+        """保存快照，返回写入的字节数"""
+        payload = json.dumps(
+            {"version": SNAPSHOT_VERSION, **state},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        data = zlib.compress(payload, self.compress_level)
+
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.filepath)
+        return len(data)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.exists():
+            return None
+
+        with open(self.filepath, "rb") as f:
+            state = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+
+        if state.get("version") != SNAPSHOT_VERSION:
+            print(f"快照版本不匹配 {self.filepath}: {state.get('version')}")
+            return None
+        return state
+
+
+def dump_cognitive_event(event: CognitiveEvent) -> Dict[str, Any]:
+    return event.to_dict()
+
+
+def load_cognitive_event(data: Dict[str, Any]) -> CognitiveEvent:
+    return CognitiveEvent(
+        event_id=data["event_id"],
+        timestamp=data["timestamp"],
+        source=data["source"],
+        event_type=data["event_type"],
+        modality_type=data["modality_type"],
+        raw_data=UnderstandEventData.model_validate(data["raw_data"]),
+        understood_data=UnderstoodData.model_validate(data["understood_data"]),
+        importance_score=data["importance_score"],
+    )
+
+
+def load_goal(data: Dict[str, Any]) -> Goal:
+    return Goal(
+        **{
+            **data,
+            "subgoals": [load_goal(subgoal) for subgoal in data.get("subgoals", [])],
+        }
+    )
+
+
+def dump_working_memory(working_memory: WorkingMemory) -> Dict[str, Any]:
+    return {
+        "current_situation": working_memory.current_situation,
+        "active_goals": [asdict(goal) for goal in working_memory.active_goals],
+        "attention_focus": working_memory.attention_focus,
+        "recent_events": [
+            dump_cognitive_event(event) for event in working_memory.recent_events
+        ],
+        "cognitive_load": working_memory.cognitive_load,
+        "last_update_time": working_memory.last_update_time,
+        "active_duration": working_memory.active_duration,
+        "extracted_count": working_memory.extracted_count,
+    }
+
+
+def load_working_memory(data: Dict[str, Any]) -> WorkingMemory:
+    return WorkingMemory(
+        current_situation=data.get("current_situation", ""),
+        active_goals=[load_goal(goal) for goal in data.get("active_goals", [])],
+        attention_focus=data.get("attention_focus"),
+        recent_events=[
+            load_cognitive_event(event) for event in data.get("recent_events", [])
+        ],
+        cognitive_load=data.get("cognitive_load", 0.0),
+        last_update_time=data.get("last_update_time", 0.0),
+        active_duration=data.get("active_duration", 0.0),
+        extracted_count=data.get("extracted_count", 0),
+    )
+
+
+def dump_episodic_memories(
+    episodic_memories: List[EpisodicMemoriesModels],
+) -> List[Dict[str, Any]]:
+    return [memory.model_dump(mode="json") for memory in episodic_memories]
+
+
+def load_episodic_memories(data: List[Dict[str, Any]]) -> List[EpisodicMemoriesModels]:
+    return [EpisodicMemoriesModels.model_validate(memory) for memory in data]
@@ -0,0 +1,103 @@
+import json
+import time
+import threading
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class StatusSnapshot(NamedTuple):
+    """发布后不再修改的状态快照"""
+
+    version: int
+    published_at: float
+    status: Dict[str, Any]
+    # 预先序列化的 JSON
+    payload: bytes
+
+
+def _json_default(value: Any):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class StatusPublisher:
+    """
+    版本化的状态发布
+    处理线程按 min_interval 限速调用 publish，每次生成新的状态字典并预先序列化，整体替换旧快照(写时复制)，
+    读取方直接拿到最新快照，不会读到处理线程正在修改的数据，也不需要每次序列化；
+    wait_for 可以长轮询等待下一个版本
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Any]], min_interval: float = 0.5):
+        self._build = build
+        self.min_interval = min_interval
+
+        self._cond = threading.Condition()
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._publish_lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
+
+    def publish(self, force: bool = False) -> bool:
+        """距离上次发布超过 min_interval 或 force 时生成新快照，返回是否发布了新版本"""
+        snapshot = self._snapshot
+        if (
+            not force
+            and snapshot is not None
+            and time.time() - snapshot.published_at < self.min_interval
+        ):
+            return False
+
+        with self._publish_lock:
+            status = self._build()
+            payload = json.dumps(
+                status,
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=_json_default,
+            ).encode("utf-8")
+
+            with self._cond:
+                current = self._snapshot
+                if current is not None and current.payload == payload:
+                    # 内容没有变化时不增加版本，长轮询的客户端不会被空唤醒
+                    self._snapshot = current._replace(published_at=time.time())
+                    return False
+                self._snapshot = StatusSnapshot(
+                    version=self.version + 1,
+                    published_at=time.time(),
+                    status=status,
+                    payload=payload,
+                )
+                self._cond.notify_all()
+        return True
+
+    def latest(self) -> StatusSnapshot:
+        """最新快照，还没有发布过时立即生成一次"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.publish(force=True)
+            snapshot = self._snapshot
+        return snapshot
+
+    def wait_for(self, version: int, timeout: float) -> StatusSnapshot:
+        """等待比 version 更新的快照，超时后返回当前最新快照"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while self.version <= version:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.latest()
@@ -0,0 +1,117 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from lll_simple_ai_shared import UnderstoodData
+
+from .data_structures import UnderstandEventData
+from .embedding_index import HashingEmbedder
+
+# 分类标签由理解结果中的这些字段组成
+LABEL_FIELDS = ("event_type", "response_priority", "event_entity")
+
+
+class UnderstandingClassifier:
+    """
+    本地事件理解分类器
+    用记录下来的 (原始事件, 理解结果) 训练多分类逻辑回归，
+    输入为事件类型和内容的哈希特征，输出理解结果中的类别字段和置信度
+    """
+
+    def __init__(
+        self,
+        dim: int = 256,
+        epochs: int = 200,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        max_samples: int = 5000,
+    ):
+        self.embedder = HashingEmbedder(dim)
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+
+        self._samples: Deque[Tuple[np.ndarray, Tuple[str, ...], int]] = deque(
+            maxlen=max_samples
+        )
+        self._lock = threading.Lock()
+
+        self._weights: Optional[np.ndarray] = None
+        self._bias: Optional[np.ndarray] = None
+        self._labels: List[Tuple[str, ...]] = []
+        self._label_importance: Optional[np.ndarray] = None
+
+    @property
+    def num_samples(self) -> int:
+        return len(self._samples)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._weights is not None
+
+    def features(self, event_data: UnderstandEventData) -> np.ndarray:
+        return self.embedder.embed(f"modality_{event_data.type} {event_data.data}")
+
+    def add_sample(self, event_data: UnderstandEventData, understood: UnderstoodData):
+        label = tuple(str(getattr(understood, name, "")) for name in LABEL_FIELDS)
+        with self._lock:
+            self._samples.append(
+                (self.features(event_data), label, understood.importance_score or 0)
+            )
+
+    def fit(self) -> bool:
+        """用当前样本重新训练，少于两个类别时不训练"""
+        with self._lock:
+            samples = list(self._samples)
+
+        labels = sorted({label for _, label, _ in samples})
+        if len(labels) < 2:
+            return False
+
+        label_ids = {label: i for i, label in enumerate(labels)}
+        x = np.stack([features for features, _, _ in samples])
+        y = np.array([label_ids[label] for _, label, _ in samples])
+        one_hot = np.eye(len(labels), dtype=np.float32)[y]
+
+        weights = np.zeros((x.shape[1], len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        for _ in range(self.epochs):
+            probabilities = self._softmax(x @ weights + bias)
+            gradient = (probabilities - one_hot) / len(samples)
+            weights -= self.learning_rate * (x.T @ gradient + self.l2 * weights)
+            bias -= self.learning_rate * gradient.sum(axis=0)
+
+        importance = np.array([importance for _, _, importance in samples], float)
+        label_importance = np.bincount(
+            y, weights=importance, minlength=len(labels)
+        ) / np.maximum(np.bincount(y, minlength=len(labels)), 1)
+
+        with self._lock:
+            self._weights = weights
+            self._bias = bias
+            self._labels = labels
+            self._label_importance = label_importance
+        return True
+
+    def predict(
+        self, event_data: UnderstandEventData
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """返回 (理解结果的类别字段, 置信度)，未训练时返回 None"""
+        with self._lock:
+            weights, bias = self._weights, self._bias
+            labels, label_importance = self._labels, self._label_importance
+        if weights is None:
+            return None
+
+        probabilities = self._softmax(self.features(event_data) @ weights + bias)
+        best = int(np.argmax(probabilities))
+        fields = dict(zip(LABEL_FIELDS, labels[best]))
+        fields["importance_score"] = int(round(label_importance[best]))
+        return fields, float(probabilities[best])
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
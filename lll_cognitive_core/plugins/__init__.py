@@ -1,23 +1,44 @@
-from .cognitive_core_plugin_default_event_understanding import (
-    CognitiveCorePluginDefaultEventUnderstanding,
-)
-from .cognitive_core_plugin_default_associative_recall import (
-    CognitiveCorePluginDefaultAssociativeRecall,
-)
-from .cognitive_core_plugin_default_behavior_generation import (
-    CognitiveCorePluginDefaultBehaviorGeneration,
-)
-from .cognitive_core_plugin_default_memory_extraction import (
-    CognitiveCorePluginDefaultMemoryExtraction,
-)
-from .cognitive_core_plugin_default_memory_manager import (
-    CognitiveCorePluginDefaultMemoryManager,
-)
+from typing import TYPE_CHECKING
+from ..utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from .cognitive_core_plugin_default_event_understanding import (
+        CognitiveCorePluginDefaultEventUnderstanding,
+    )
+    from .cognitive_core_plugin_cascading_event_understanding import (
+        CognitiveCorePluginCascadingEventUnderstanding,
+    )
+    from .cognitive_core_plugin_default_associative_recall import (
+        CognitiveCorePluginDefaultAssociativeRecall,
+    )
+    from .cognitive_core_plugin_default_behavior_generation import (
+        CognitiveCorePluginDefaultBehaviorGeneration,
+    )
+    from .cognitive_core_plugin_default_memory_extraction import (
+        CognitiveCorePluginDefaultMemoryExtraction,
+    )
+    from .cognitive_core_plugin_default_memory_manager import (
+        CognitiveCorePluginDefaultMemoryManager,
+    )
 
 __all__ = [
     "CognitiveCorePluginDefaultEventUnderstanding",
+    "CognitiveCorePluginCascadingEventUnderstanding",
     "CognitiveCorePluginDefaultAssociativeRecall",
     "CognitiveCorePluginDefaultBehaviorGeneration",
     "CognitiveCorePluginDefaultMemoryExtraction",
     "CognitiveCorePluginDefaultMemoryManager",
 ]
+
+# 按需导入，只在第一次访问时加载对应模块
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "CognitiveCorePluginDefaultEventUnderstanding": ".cognitive_core_plugin_default_event_understanding",
+        "CognitiveCorePluginCascadingEventUnderstanding": ".cognitive_core_plugin_cascading_event_understanding",
+        "CognitiveCorePluginDefaultAssociativeRecall": ".cognitive_core_plugin_default_associative_recall",
+        "CognitiveCorePluginDefaultBehaviorGeneration": ".cognitive_core_plugin_default_behavior_generation",
+        "CognitiveCorePluginDefaultMemoryExtraction": ".cognitive_core_plugin_default_memory_extraction",
+        "CognitiveCorePluginDefaultMemoryManager": ".cognitive_core_plugin_default_memory_manager",
+    },
+)
@@ -0,0 +1,300 @@
+import re
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from lll_simple_ai_shared import UnderstoodData
+from ..core.data_structures import (
+    UnderstandEventData,
+    UnderstandEventInput,
+    UnderstandEventsInput,
+)
+from ..core.understanding_classifier import UnderstandingClassifier
+
+# 命中本地阶段的名称
+STAGE_RULE = "rule"
+STAGE_CLASSIFIER = "classifier"
+STAGE_LLM = "llm"
+_STAGES = (STAGE_RULE, STAGE_CLASSIFIER, STAGE_LLM)
+
+# 心跳一类的系统事件默认由规则直接处理
+DEFAULT_UNDERSTANDING_RULES: List[Dict[str, Any]] = [
+    {
+        "type": "system",
+        "data_pattern": r"(?i)heartbeat|ping|心跳",
+        "understood": {
+            "event_type": "other",
+            "response_priority": "low",
+            "event_entity": "system",
+            "importance_score": 0,
+        },
+    },
+]
+
+
+class CognitiveCorePluginCascadingEventUnderstanding:
+    """
+    级联事件理解
+    依次尝试 模式规则 -> 本地分类器 -> 大模型，本地阶段置信度不足时才调用大模型，
+    大模型的理解结果会记录下来持续训练本地分类器
+    """
+
+    def __init__(
+        self,
+        fallback,
+        rules: List[Dict[str, Any]] = None,
+        classifier: UnderstandingClassifier = None,
+        confidence_threshold: float = 0.8,
+        local_modalities: Optional[List[str]] = ("system", "sensor"),
+        min_training_samples: int = 50,
+        retrain_interval: int = 50,
+    ):
+        """
+        fallback: 置信度不足时使用的事件理解插件，例如 CognitiveCorePluginDefaultEventUnderstanding
+        local_modalities: 允许由分类器处理的事件类型，为 None 时不限制
+        """
+        self.fallback = fallback
+        self.rules = [
+            {
+                **rule,
+                "_pattern": (
+                    re.compile(rule["data_pattern"])
+                    if rule.get("data_pattern")
+                    else None
+                ),
+            }
+            for rule in (DEFAULT_UNDERSTANDING_RULES if rules is None else rules)
+        ]
+        self.classifier = classifier or UnderstandingClassifier()
+        self.confidence_threshold = confidence_threshold
+        self.local_modalities = (
+            set(local_modalities) if local_modalities is not None else None
+        )
+        self.min_training_samples = min_training_samples
+        self.retrain_interval = retrain_interval
+
+        self._lock = threading.Lock()
+        self._samples_since_fit = 0
+        self._training = False
+        self._modality_stats: Dict[str, Dict[str, Any]] = {}
+
+    def understand_event(
+        self, raw_event: UnderstandEventInput
+    ) -> UnderstoodData | None:
+        event_data = raw_event.understand_event
+        start_time = time.perf_counter()
+
+        stage = STAGE_RULE
+        result = self._apply_rules(raw_event)
+
+        if result is None and self._allow_classifier(event_data):
+            stage = STAGE_CLASSIFIER
+            result = self._apply_classifier(raw_event)
+
+        if result is None:
+            stage = STAGE_LLM
+            result = self.fallback.understand_event(raw_event)
+            if result is not None:
+                self._record_sample(event_data, result)
+
+        self._record_stats(event_data.type, stage, time.perf_counter() - start_time)
+        return result
+
+    def understand_events(
+        self, raw_events: UnderstandEventsInput
+    ) -> List[UnderstoodData | None]:
+        """本地阶段逐个处理，剩下的事件合并成一次批量调用"""
+        start_time = time.perf_counter()
+        results: List[UnderstoodData | None] = []
+        stages: List[str] = []
+        remaining: List[int] = []
+
+        for i, event_data in enumerate(raw_events.understand_events):
+            raw_event = UnderstandEventInput(
+                understand_event=event_data,
+                recent_events=raw_events.recent_events,
+                active_goals=raw_events.active_goals,
+            )
+            stage = STAGE_RULE
+            result = self._apply_rules(raw_event)
+            if result is None and self._allow_classifier(event_data):
+                stage = STAGE_CLASSIFIER
+                result = self._apply_classifier(raw_event)
+            if result is None:
+                stage = STAGE_LLM
+                remaining.append(i)
+            results.append(result)
+            stages.append(stage)
+
+        local_time = time.perf_counter() - start_time
+        for i, stage in enumerate(stages):
+            if stage != STAGE_LLM:
+                self._record_stats(
+                    raw_events.understand_events[i].type,
+                    stage,
+                    local_time / len(stages),
+                )
+
+        if not remaining:
+            return results
+
+        llm_start = time.perf_counter()
+        fallback_events = [raw_events.understand_events[i] for i in remaining]
+        if hasattr(self.fallback, "understand_events"):
+            fallback_results = self.fallback.understand_events(
+                UnderstandEventsInput(
+                    understand_events=fallback_events,
+                    recent_events=raw_events.recent_events,
+                    active_goals=raw_events.active_goals,
+                )
+            )
+        else:
+            fallback_results = [
+                self.fallback.understand_event(
+                    UnderstandEventInput(
+                        understand_event=event_data,
+                        recent_events=raw_events.recent_events,
+                        active_goals=raw_events.active_goals,
+                    )
+                )
+                for event_data in fallback_events
+            ]
+        fallback_results = list(fallback_results or [])
+        llm_time = (time.perf_counter() - llm_start) / len(remaining)
+
+        for i, result in zip(remaining, fallback_results):
+            results[i] = result
+            if result is not None:
+                self._record_sample(raw_events.understand_events[i], result)
+        for i in remaining:
+            self._record_stats(
+                raw_events.understand_events[i].type, STAGE_LLM, llm_time
+            )
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            modalities = {}
+            for modality, stats in self._modality_stats.items():
+                events = stats["events"]
+                modalities[modality] = {
+                    "events": events,
+                    "local_hit_rate": (
+                        (stats[STAGE_RULE] + stats[STAGE_CLASSIFIER]) / events
+                        if events
+                        else 0.0
+                    ),
+                    **{stage: stats[stage] for stage in _STAGES},
+                    **{
+                        f"{stage}_average_latency": (
+                            stats[f"{stage}_time"] / stats[stage]
+                            if stats[stage]
+                            else 0.0
+                        )
+                        for stage in _STAGES
+                    },
+                }
+
+        stats = {
+            "cascade": modalities,
+            "classifier_samples": self.classifier.num_samples,
+            "classifier_trained": self.classifier.is_trained,
+        }
+        if hasattr(self.fallback, "get_stats"):
+            stats["fallback"] = self.fallback.get_stats()
+        return stats
+
+    def _allow_classifier(self, event_data: UnderstandEventData) -> bool:
+        return self.classifier.is_trained and (
+            self.local_modalities is None or event_data.type in self.local_modalities
+        )
+
+    def _apply_rules(self, raw_event: UnderstandEventInput) -> UnderstoodData | None:
+        event_data = raw_event.understand_event
+        for rule in self.rules:
+            types = rule.get("type")
+            if types is not None:
+                if isinstance(types, str):
+                    types = [types]
+                if event_data.type not in types:
+                    continue
+            if rule["_pattern"] is not None and not rule["_pattern"].search(
+                event_data.data or ""
+            ):
+                continue
+            return self._build_understood(raw_event, rule.get("understood", {}))
+        return None
+
+    def _apply_classifier(
+        self, raw_event: UnderstandEventInput
+    ) -> UnderstoodData | None:
+        prediction = self.classifier.predict(raw_event.understand_event)
+        if prediction is None:
+            return None
+
+        fields, confidence = prediction
+        if confidence < self.confidence_threshold:
+            return None
+        return self._build_understood(raw_event, fields)
+
+    def _build_understood(
+        self, raw_event: UnderstandEventInput, fields: Dict[str, Any]
+    ) -> UnderstoodData:
+        """本地阶段沿用上一个事件的情境，内容直接使用原始数据"""
+        recent_events = raw_event.recent_events
+        current_situation = (
+            recent_events[-1].get_understood("current_situation", "")
+            if recent_events
+            else ""
+        )
+        return UnderstoodData(
+            **{
+                "response_priority": "low",
+                "main_content": raw_event.understand_event.data,
+                "current_situation": current_situation or "",
+                "event_entity": raw_event.understand_event.source or "unknown",
+                "memory_query_plan": {"query_type": "none"},
+                **fields,
+            }
+        )
+
+    def _record_sample(self, event_data: UnderstandEventData, result: UnderstoodData):
+        self.classifier.add_sample(event_data, result)
+
+        with self._lock:
+            self._samples_since_fit += 1
+            if (
+                self._training
+                or self.classifier.num_samples < self.min_training_samples
+                or self._samples_since_fit < self.retrain_interval
+            ):
+                return
+            self._samples_since_fit = 0
+            self._training = True
+
+        # 训练放到后台，不阻塞事件处理
+        threading.Thread(
+            target=self._retrain, name="understanding-classifier", daemon=True
+        ).start()
+
+    def _retrain(self):
+        try:
+            self.classifier.fit()
+        except Exception as e:
+            print(f"训练事件分类器错误: {e}")
+        finally:
+            with self._lock:
+                self._training = False
+
+    def _record_stats(self, modality: str, stage: str, elapsed: float):
+        with self._lock:
+            stats = self._modality_stats.get(modality)
+            if stats is None:
+                stats = self._modality_stats[modality] = {
+                    "events": 0,
+                    **{stage_name: 0 for stage_name in _STAGES},
+                    **{f"{stage_name}_time": 0.0 for stage_name in _STAGES},
+                }
+            stats["events"] += 1
+            stats[stage] += 1
+            stats[f"{stage}_time"] += elapsed
@@ -1,18 +1,26 @@
 from openai import OpenAI
 
-from lll_simple_ai_shared import (
-    RecallResultsModels,
-    associative_recall_task_format_inputs,
-)
+from lll_simple_ai_shared import RecallResultsModels
 from ..config.create_openai_config import CreateOpenaiConfig
 from ..core.data_structures import AssociativeRecallInput
 from ..utils.get_chat_response import GetChatResponseInput, get_chat_response
+from ..utils.prompt_layouts import (
+    ASSOCIATIVE_RECALL_PROMPT_TEMPLATE,
+    format_associative_recall_inputs,
+)
+from ..utils.prompt_stats import PromptStats
+from ..utils.resilient_llm_client import ResilientLLMClient
 
 
 class CognitiveCorePluginDefaultAssociativeRecall:
-    def __init__(self, client: OpenAI = None, config: CreateOpenaiConfig = None):
+    def __init__(
+        self,
+        client: OpenAI | ResilientLLMClient = None,
+        config: CreateOpenaiConfig = None,
+    ):
         self._client = client
         self._config = config
+        self.prompt_stats = PromptStats()
 
     def associative_recall(
         self, raw_event: AssociativeRecallInput
@@ -22,9 +30,17 @@ class CognitiveCorePluginDefaultAssociativeRecall:
             GetChatResponseInput(
                 client=self._client,
                 config=self._config,
-                input_template="",
-                format_inputs_func=associative_recall_task_format_inputs,
+                input_template=ASSOCIATIVE_RECALL_PROMPT_TEMPLATE,
+                format_inputs_func=format_associative_recall_inputs,
                 inputs=raw_event,
+                prompt_stats=self.prompt_stats,
+                stage="associative_recall",
                 data_model=RecallResultsModels,
             )
         )
+
+    def get_stats(self):
+        stats = {"prompt": self.prompt_stats.get_stats()}
+        if isinstance(self._client, ResilientLLMClient):
+            stats["llm"] = self._client.get_stats()
+        return stats
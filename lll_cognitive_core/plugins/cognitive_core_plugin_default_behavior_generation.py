@@ -1,18 +1,29 @@
+from typing import Any, Callable
+
 from openai import OpenAI
 
-from lll_simple_ai_shared import (
-    BehaviorPlan,
-    behavior_task_format_inputs,
-)
+from lll_simple_ai_shared import BehaviorPlan
 from ..config.create_openai_config import CreateOpenaiConfig
 from ..core.data_structures import GenerateBehaviorInput
-from ..utils.get_chat_response import GetChatResponseInput, get_chat_response
+from ..utils.get_chat_response import (
+    GetChatResponseInput,
+    get_chat_response,
+    get_chat_response_stream,
+)
+from ..utils.prompt_layouts import BEHAVIOR_PROMPT_TEMPLATE, format_behavior_inputs
+from ..utils.prompt_stats import PromptStats
+from ..utils.resilient_llm_client import ResilientLLMClient
 
 
 class CognitiveCorePluginDefaultBehaviorGeneration:
-    def __init__(self, client: OpenAI = None, config: CreateOpenaiConfig = None):
+    def __init__(
+        self,
+        client: OpenAI | ResilientLLMClient = None,
+        config: CreateOpenaiConfig = None,
+    ):
         self._client = client
         self._config = config
+        self.prompt_stats = PromptStats()
 
     def generate_behavior(
         self, raw_event: GenerateBehaviorInput
@@ -22,9 +33,46 @@ class CognitiveCorePluginDefaultBehaviorGeneration:
             GetChatResponseInput(
                 client=self._client,
                 config=self._config,
-                input_template="",
-                format_inputs_func=behavior_task_format_inputs,
+                input_template=BEHAVIOR_PROMPT_TEMPLATE,
+                format_inputs_func=format_behavior_inputs,
                 inputs=raw_event,
+                prompt_stats=self.prompt_stats,
+                stage="behavior_generation",
                 data_model=BehaviorPlan,
             )
         )
+
+    def generate_behavior_stream(
+        self, raw_event: GenerateBehaviorInput, on_action: Callable[[Any], None]
+    ) -> BehaviorPlan | None:
+        # 流式行为生成，plan 中的动作一完整就交给 on_action 执行
+        def on_item(item):
+            try:
+                action = BehaviorPlan.model_validate(
+                    {"plan": [item], "current_situation": ""}
+                ).plan[0]
+            except Exception as e:
+                print(f"解析行为错误: {e}")
+                return
+            on_action(action)
+
+        return get_chat_response_stream(
+            GetChatResponseInput(
+                client=self._client,
+                config=self._config,
+                input_template=BEHAVIOR_PROMPT_TEMPLATE,
+                format_inputs_func=format_behavior_inputs,
+                inputs=raw_event,
+                prompt_stats=self.prompt_stats,
+                stage="behavior_generation",
+                data_model=BehaviorPlan,
+            ),
+            item_key="plan",
+            on_item=on_item,
+        )
+
+    def get_stats(self):
+        stats = {"prompt": self.prompt_stats.get_stats()}
+        if isinstance(self._client, ResilientLLMClient):
+            stats["llm"] = self._client.get_stats()
+        return stats
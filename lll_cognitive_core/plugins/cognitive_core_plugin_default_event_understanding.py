@@ -1,15 +1,34 @@
+from typing import List
+
 from openai import OpenAI
 
-from lll_simple_ai_shared import UnderstoodData, understand_task_format_inputs
+from lll_simple_ai_shared import UnderstoodData
 from ..config.create_openai_config import CreateOpenaiConfig
-from ..core.data_structures import UnderstandEventInput
+from ..core.data_structures import (
+    UnderstandEventInput,
+    UnderstandEventsInput,
+    UnderstoodDataBatch,
+)
 from ..utils.get_chat_response import GetChatResponseInput, get_chat_response
+from ..utils.prompt_layouts import (
+    UNDERSTAND_BATCH_PROMPT_TEMPLATE,
+    UNDERSTAND_PROMPT_TEMPLATE,
+    format_understand_batch_inputs,
+    format_understand_inputs,
+)
+from ..utils.prompt_stats import PromptStats
+from ..utils.resilient_llm_client import ResilientLLMClient
 
 
 class CognitiveCorePluginDefaultEventUnderstanding:
-    def __init__(self, client: OpenAI = None, config: CreateOpenaiConfig = None):
+    def __init__(
+        self,
+        client: OpenAI | ResilientLLMClient = None,
+        config: CreateOpenaiConfig = None,
+    ):
         self._client = client
         self._config = config
+        self.prompt_stats = PromptStats()
 
     def understand_event(
         self, raw_event: UnderstandEventInput
@@ -19,9 +38,35 @@ class CognitiveCorePluginDefaultEventUnderstanding:
             GetChatResponseInput(
                 client=self._client,
                 config=self._config,
-                input_template="",
-                format_inputs_func=understand_task_format_inputs,
+                input_template=UNDERSTAND_PROMPT_TEMPLATE,
+                format_inputs_func=format_understand_inputs,
                 inputs=raw_event,
+                prompt_stats=self.prompt_stats,
+                stage="event_understanding",
                 data_model=UnderstoodData,
             )
         )
+
+    def understand_events(
+        self, raw_events: UnderstandEventsInput
+    ) -> List[UnderstoodData] | None:
+        # 批量事件理解，多个事件共享同一份上下文
+        result = get_chat_response(
+            GetChatResponseInput(
+                client=self._client,
+                config=self._config,
+                input_template=UNDERSTAND_BATCH_PROMPT_TEMPLATE,
+                format_inputs_func=format_understand_batch_inputs,
+                inputs=raw_events,
+                prompt_stats=self.prompt_stats,
+                stage="event_understanding",
+                data_model=UnderstoodDataBatch,
+            )
+        )
+        return result.results if result else None
+
+    def get_stats(self):
+        stats = {"prompt": self.prompt_stats.get_stats()}
+        if isinstance(self._client, ResilientLLMClient):
+            stats["llm"] = self._client.get_stats()
+        return stats
@@ -1,18 +1,26 @@
 from openai import OpenAI
 
-from lll_simple_ai_shared import (
-    EpisodicMemoriesGenerateModels,
-    extract_memories_task_format_inputs,
-)
+from lll_simple_ai_shared import EpisodicMemoriesGenerateModels
 from ..config.create_openai_config import CreateOpenaiConfig
 from ..core.data_structures import ExtractMemoriesInput
 from ..utils.get_chat_response import GetChatResponseInput, get_chat_response
+from ..utils.prompt_layouts import (
+    EXTRACT_MEMORIES_PROMPT_TEMPLATE,
+    format_extract_memories_inputs,
+)
+from ..utils.prompt_stats import PromptStats
+from ..utils.resilient_llm_client import ResilientLLMClient
 
 
 class CognitiveCorePluginDefaultMemoryExtraction:
-    def __init__(self, client: OpenAI = None, config: CreateOpenaiConfig = None):
+    def __init__(
+        self,
+        client: OpenAI | ResilientLLMClient = None,
+        config: CreateOpenaiConfig = None,
+    ):
         self._client = client
         self._config = config
+        self.prompt_stats = PromptStats()
 
     def extract_memories(
         self, raw_event: ExtractMemoriesInput
@@ -22,9 +30,17 @@ class CognitiveCorePluginDefaultMemoryExtraction:
             GetChatResponseInput(
                 client=self._client,
                 config=self._config,
-                input_template="",
-                format_inputs_func=extract_memories_task_format_inputs,
+                input_template=EXTRACT_MEMORIES_PROMPT_TEMPLATE,
+                format_inputs_func=format_extract_memories_inputs,
                 inputs=raw_event,
+                prompt_stats=self.prompt_stats,
+                stage="memory_extraction",
                 data_model=EpisodicMemoriesGenerateModels,
             )
         )
+
+    def get_stats(self):
+        stats = {"prompt": self.prompt_stats.get_stats()}
+        if isinstance(self._client, ResilientLLMClient):
+            stats["llm"] = self._client.get_stats()
+        return stats
@@ -1,23 +1,83 @@
 import os
 import json
-from typing import List, Dict
-from datetime import datetime
+import threading
+from typing import List, Dict, Optional, Set
+from datetime import datetime, timedelta
 from lll_simple_ai_shared import EpisodicMemoriesModels
+from ..core.embedding_index import EmbeddingIndex
+from ..core.keyword_dictionary import KeywordDictionary, normalize_keyword
 from ..core.plugin_interfaces import MemoryManagerPlugin
 
+# 向量索引的增量文件达到多少个时合并回完整的索引文件
+EMBEDDING_DELTA_COMPACT_COUNT = 32
+
 
 class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
+    def __init__(
+        self,
+        root_dir: str = "memory",
+        embedding_dim: int = 256,
+        keyword_dictionary: KeywordDictionary = None,
+    ):
+        # 记忆文件根目录，多会话托管时每个会话使用独立的目录
+        self.root_dir = root_dir
+        self.embedding_dim = embedding_dim
+        # 向量索引在首次使用时从文件加载
+        self._embedding_index: Optional[EmbeddingIndex] = None
+        # 关键词词典，关键词索引的键为其中的词项ID，首次使用时从文件加载
+        self.keyword_dictionary = (
+            KeywordDictionary() if keyword_dictionary is None else keyword_dictionary
+        )
+        self._keyword_index: Optional[Dict[int, Set[str]]] = None
+        # 下一个向量索引增量文件的编号
+        self._embedding_delta_count = 0
+
+        # 整理线程保存记忆时处理线程可能正在查询，内存中的索引统一由这把锁保护
+        self._index_lock = threading.RLock()
+        # 保存记忆需要先读再写文件，多个整理线程之间串行执行
+        self._save_lock = threading.Lock()
+
     def query_episodic_memories(
-        self, date_range, importance_min=0, keywords=None, associations=None
+        self,
+        date_range,
+        importance_min=0,
+        keywords=None,
+        associations=None,
+        mode: str = "keyword",
+        query_text: Optional[str] = None,
+        top_k: int = 20,
     ) -> List[EpisodicMemoriesModels]:
         """
         多维度记忆查询
         支持时间范围、重要性过滤、关键词和联想词查询
+        mode 为 semantic 时按向量相似度返回前 top_k 条
         """
         try:
             # 解析时间范围
             start_date, end_date = self.parse_date_range(date_range)
 
+            if mode == "semantic":
+                return self.query_semantic_memories(
+                    query_text or " ".join((keywords or []) + (associations or [])),
+                    start_date.strftime("%Y-%m-%d"),
+                    end_date.strftime("%Y-%m-%d"),
+                    importance_min or 0,
+                    top_k,
+                )
+
+            # 关键词规范化后查词典，包括前缀和模糊匹配到的词项
+            keyword_terms: Set[str] = set()
+            keyword_memory_ids: Optional[Set[str]] = None
+            if keywords:
+                keyword_memory_ids = set()
+                with self._index_lock:
+                    keyword_index = self.load_keyword_index()
+                    for term_id in self.keyword_dictionary.lookup_all(keywords):
+                        keyword_terms.add(self.keyword_dictionary.term(term_id))
+                        keyword_memory_ids.update(keyword_index.get(term_id, ()))
+                if not keyword_memory_ids:
+                    return []
+
             # 通过time_index.json快速筛选相关日期
             time_index = self.load_time_index()
             relevant_dates = []
@@ -34,7 +94,8 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
 
                 # 关键词预过滤（如果有的话）
                 if keywords and not any(
-                    kw in meta.get("keywords", []) for kw in keywords
+                    normalize_keyword(kw) in keyword_terms
+                    for kw in meta.get("keywords", [])
                 ):
                     continue
 
@@ -56,12 +117,12 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
                     if memory.importance < importance_min:
                         continue
 
-                    # 关键词精确匹配
-                    keyword_match = True
-                    if keywords:
-                        keyword_match = any(kw in memory.keywords for kw in keywords)
-                        if not keyword_match:
-                            continue
+                    # 关键词匹配
+                    if (
+                        keyword_memory_ids is not None
+                        and memory.id not in keyword_memory_ids
+                    ):
+                        continue
 
                     # 联想词匹配
                     association_match = True
@@ -90,12 +151,55 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
         # 按日期分组记忆
         memories_by_date = self.group_memories_by_date(episodic_memories)
 
-        # 处理每个日期的记忆文件
-        for date_str, memories in memories_by_date.items():
-            self.process_single_date_memories(date_str, memories)
+        with self._save_lock:
+            # 处理每个日期的记忆文件
+            for date_str, memories in memories_by_date.items():
+                self.process_single_date_memories(date_str, memories)
+
+            # 更新全局索引
+            self.update_global_indexes(memories_by_date)
+
+            # 增量更新向量索引，只写入本次保存的记忆
+            with self._index_lock:
+                embedding_index = self.load_embedding_index()
+                embedding_index.add_memories(episodic_memories)
+                self.save_embedding_index(
+                    embedding_index, [memory.id for memory in episodic_memories]
+                )
 
-        # 更新全局索引
-        self.update_global_indexes(memories_by_date)
+    def query_semantic_memories(
+        self,
+        query_text: str,
+        start_str: str,
+        end_str: str,
+        importance_min: int,
+        top_k: int,
+    ) -> List[EpisodicMemoriesModels]:
+        """向量检索，只加载命中记忆所在日期的文件"""
+        with self._index_lock:
+            embedding_index = self.load_embedding_index()
+            hits = embedding_index.search(query_text, top_k, start_str, end_str)
+
+            ids_by_date: Dict[str, List[str]] = {}
+            for memory_id, _ in hits:
+                date_str = embedding_index.get_date(memory_id)
+                ids_by_date.setdefault(date_str, []).append(memory_id)
+
+        memories_by_id: Dict[str, EpisodicMemoriesModels] = {}
+        for date_str, memory_ids in ids_by_date.items():
+            wanted = set(memory_ids)
+            for memory in self.load_daily_memories(date_str):
+                if memory.id in wanted:
+                    memories_by_id[memory.id] = memory
+
+        # 保持相似度顺序
+        results: List[EpisodicMemoriesModels] = []
+        for memory_id, _ in hits:
+            memory = memories_by_id.get(memory_id)
+            if memory is not None and memory.importance >= importance_min:
+                results.append(memory)
+
+        return results
 
     def group_memories_by_date(
         self, memories: List[EpisodicMemoriesModels]
@@ -120,7 +224,7 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
         """处理单个日期的记忆文件"""
         # 构造文件名
         filename = f"memory_{date_str}.jsonl"
-        filepath = os.path.join("memory/daily", filename)
+        filepath = os.path.join(self.root_dir, "daily", filename)
 
         # 读取现有记忆（如果文件存在）
         existing_memories = []
@@ -137,28 +241,29 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
         self, memories_by_date: Dict[str, List[EpisodicMemoriesModels]]
     ):
         """更新所有全局索引"""
-        # 读取现有索引
-        time_index = self.load_time_index()
-        keyword_index = self.load_keyword_index()
-        association_index = self.load_association_index()
-
-        # 更新每个日期的索引
-        for date_str, memories in memories_by_date.items():
-            self.update_date_in_indexes(
-                date_str, memories, time_index, keyword_index, association_index
-            )
+        with self._index_lock:
+            # 读取现有索引
+            time_index = self.load_time_index()
+            keyword_index = self.load_keyword_index()
+            association_index = self.load_association_index()
+
+            # 更新每个日期的索引
+            for date_str, memories in memories_by_date.items():
+                self.update_date_in_indexes(
+                    date_str, memories, time_index, keyword_index, association_index
+                )
 
-        # 保存更新后的索引
-        self.save_time_index(time_index)
-        self.save_keyword_index(keyword_index)
-        self.save_association_index(association_index)
+            # 保存更新后的索引
+            self.save_time_index(time_index)
+            self.save_keyword_index(keyword_index)
+            self.save_association_index(association_index)
 
     def update_date_in_indexes(
         self,
         date_str: str,
         memories: List[EpisodicMemoriesModels],
         time_index: Dict,
-        keyword_index: Dict,
+        keyword_index: Dict[int, Set[str]],
         association_index: Dict,
     ):
         """更新单个日期在所有索引中的信息"""
@@ -167,22 +272,34 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
         if date_str not in time_index["indexed_dates"]:
             time_index["indexed_dates"][date_str] = {
                 "memory_count": 0,
-                "keywords": set(),
-                "associations": set(),
+                "importance_range": [100, 0],
+                "keywords": [],
+                "associations": [],
             }
 
         date_meta = time_index["indexed_dates"][date_str]
         date_meta["memory_count"] = len(memories)
+        # 从文件加载的是列表
+        date_meta["keywords"] = set(date_meta.get("keywords", []))
+        date_meta["associations"] = set(date_meta.get("associations", []))
+        low, high = date_meta.get("importance_range", [100, 0])
+        for memory in memories:
+            low = min(low, memory.importance)
+            high = max(high, memory.importance)
+        date_meta["importance_range"] = [low, high]
 
         # 2. 更新关键词和联想词索引
         for memory in memories:
             if memory.keywords is not None:
-                # 更新关键词索引
+                # 更新关键词索引，按规范化后的词项记录
                 for keyword in memory.keywords:
-                    if keyword not in keyword_index:
-                        keyword_index[keyword] = set()
-                    keyword_index[keyword].add(memory.id)
-                    date_meta["keywords"].add(keyword)
+                    term_id = self.keyword_dictionary.intern(keyword)
+                    if term_id is None:
+                        continue
+                    if term_id not in keyword_index:
+                        keyword_index[term_id] = set()
+                    keyword_index[term_id].add(memory.id)
+                    date_meta["keywords"].add(self.keyword_dictionary.term(term_id))
 
             if memory.associations is not None:
                 # 更新联想词索引
@@ -216,17 +333,29 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
         self, filepath: str, memories: List[EpisodicMemoriesModels]
     ):
         """保存记忆到JSONL文件"""
-        with open(filepath, "w", encoding="utf-8") as f:
-            for memory in memories:
-                # 转换为字典并确保timestamp是字符串
-                memory_dict = memory.dict()
-                memory_dict["timestamp"] = memory.timestamp.isoformat()
-                f.write(json.dumps(memory_dict, ensure_ascii=False) + "\n")
+        lines = []
+        for memory in memories:
+            # 转换为字典并确保timestamp是字符串
+            memory_dict = memory.dict()
+            memory_dict["timestamp"] = memory.timestamp.isoformat()
+            lines.append(json.dumps(memory_dict, ensure_ascii=False) + "\n")
+
+        self.write_file_atomically(filepath, "".join(lines))
+
+    def write_file_atomically(self, filepath: str, content: str):
+        """先写临时文件再替换，查询线程不会读到写了一半的文件"""
+        # 确保目录存在
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, filepath)
 
     def load_daily_memories(self, date_str: str) -> List[EpisodicMemoriesModels]:
         """加载单个日期的记忆文件"""
         filename = f"memory_{date_str}.jsonl"
-        filepath = os.path.join("memory/daily", filename)
+        filepath = os.path.join(self.root_dir, "daily", filename)
 
         if not os.path.exists(filepath):
             return []
@@ -242,32 +371,169 @@ class CognitiveCorePluginDefaultMemoryManager(MemoryManagerPlugin):
         return memories
 
     def load_time_index(self) -> Dict:
-        return self.load_generic_index("memory/index/time_index.json")
+        """加载时间索引文件，值是每个日期的元数据，不能按通用索引转换为set"""
+        filepath = os.path.join(self.root_dir, "index", "time_index.json")
+        time_index = {}
+        if os.path.exists(filepath):
+            try:
+                with open(filepath, "r", encoding="utf-8") as f:
+                    time_index = json.load(f)
+            except json.JSONDecodeError as e:
+                print(f"加载索引文件 {filepath} 失败: {e}")
+        time_index.setdefault("indexed_dates", {})
+        return time_index
 
     def save_time_index(self, time_index: Dict):
-        self.save_generic_index("memory/index/time_index.json", time_index)
+        filepath = os.path.join(self.root_dir, "index", "time_index.json")
+        try:
+            self.write_file_atomically(
+                filepath, json.dumps(time_index, ensure_ascii=False, indent=2)
+            )
+        except Exception as e:
+            print(f"保存索引文件 {filepath} 失败: {e}")
+
+    def load_keyword_index(self) -> Dict[int, Set[str]]:
+        """
+        加载关键词索引文件，键为词项ID
+        文件中的词项按保存时的ID排列，加载时重新驻留到词典；兼容以关键词为键的旧格式
+        """
+        if self._keyword_index is not None:
+            return self._keyword_index
+
+        filepath = os.path.join(self.root_dir, "index", "keyword_index.json")
+        keyword_index: Dict[int, Set[str]] = {}
+        try:
+            if os.path.exists(filepath):
+                with open(filepath, "r", encoding="utf-8") as f:
+                    index_data = json.load(f)
+
+                if "terms" in index_data and "postings" in index_data:
+                    postings = index_data["postings"]
+                    entries = [
+                        (term, postings.get(str(saved_id), []))
+                        for saved_id, term in enumerate(index_data["terms"])
+                    ]
+                else:
+                    entries = list(index_data.items())
+
+                for keyword, id_list in entries:
+                    term_id = self.keyword_dictionary.intern(keyword)
+                    if term_id is not None and id_list:
+                        keyword_index.setdefault(term_id, set()).update(id_list)
+        except (json.JSONDecodeError, KeyError, AttributeError) as e:
+            print(f"加载索引文件 {filepath} 失败: {e}")
 
-    def load_keyword_index(self) -> Dict:
-        """加载关键词索引文件"""
-        return self.load_generic_index("memory/index/keyword_index.json")
+        self._keyword_index = keyword_index
+        return keyword_index
 
-    def save_keyword_index(self, keyword_index: Dict):
-        """保存关键词索引文件"""
-        self.save_generic_index("memory/index/keyword_index.json", keyword_index)
+    def save_keyword_index(self, keyword_index: Dict[int, Set[str]]):
+        """保存关键词索引文件: 词项列表加上按词项ID记录的记忆ID"""
+        filepath = os.path.join(self.root_dir, "index", "keyword_index.json")
+        try:
+            self.write_file_atomically(
+                filepath,
+                json.dumps(
+                    {
+                        "terms": self.keyword_dictionary.terms,
+                        "postings": {
+                            str(term_id): list(id_set)
+                            for term_id, id_set in keyword_index.items()
+                        },
+                    },
+                    ensure_ascii=False,
+                    indent=2,
+                ),
+            )
+        except Exception as e:
+            print(f"保存索引文件 {filepath} 失败: {e}")
 
     def load_association_index(self) -> Dict:
         """加载联想词索引文件"""
-        return self.load_generic_index("memory/index/association_index.json")
+        return self.load_generic_index(
+            os.path.join(self.root_dir, "index", "association_index.json")
+        )
 
     def save_association_index(self, association_index: Dict):
         """保存联想词索引文件"""
         self.save_generic_index(
-            "memory/index/association_index.json", association_index
+            os.path.join(self.root_dir, "index", "association_index.json"),
+            association_index,
         )
 
+    def load_embedding_index(self) -> EmbeddingIndex:
+        """加载向量索引文件，再按顺序应用之后写入的增量文件"""
+        if self._embedding_index is None:
+            embedding_index = EmbeddingIndex(self.embedding_dim)
+            try:
+                embedding_index.load(
+                    os.path.join(self.root_dir, "index", "embedding_index.npz")
+                )
+                delta_paths = self.list_embedding_deltas()
+                for delta_path in delta_paths:
+                    embedding_index.load(delta_path, merge=True)
+                self._embedding_delta_count = len(delta_paths)
+            except Exception as e:
+                print(f"加载向量索引失败: {e}")
+            self._embedding_index = embedding_index
+        return self._embedding_index
+
+    def save_embedding_index(
+        self, embedding_index: EmbeddingIndex, memory_ids: List[str] = None
+    ):
+        """
+        保存向量索引文件
+        传入 memory_ids 时只把这些记忆写入一个增量文件，增量文件过多时再重写完整的索引文件
+        """
+        try:
+            if (
+                memory_ids is not None
+                and self._embedding_delta_count < EMBEDDING_DELTA_COMPACT_COUNT
+            ):
+                embedding_index.save(
+                    os.path.join(
+                        self.root_dir,
+                        "index",
+                        f"embedding_index.delta-{self._embedding_delta_count:06d}.npz",
+                    ),
+                    memory_ids,
+                )
+                self._embedding_delta_count += 1
+                return
+
+            embedding_index.save(
+                os.path.join(self.root_dir, "index", "embedding_index.npz")
+            )
+            # 完整文件已经包含增量文件的内容
+            for delta_path in self.list_embedding_deltas():
+                os.remove(delta_path)
+            self._embedding_delta_count = 0
+        except Exception as e:
+            print(f"保存向量索引失败: {e}")
+
+    def list_embedding_deltas(self) -> List[str]:
+        """按写入顺序排列的向量索引增量文件"""
+        index_dir = os.path.join(self.root_dir, "index")
+        if not os.path.isdir(index_dir):
+            return []
+        return [
+            os.path.join(index_dir, filename)
+            for filename in sorted(os.listdir(index_dir))
+            if filename.startswith("embedding_index.delta-")
+            and filename.endswith(".npz")
+        ]
+
     def parse_date_range(self, date_range):
         """解析时间范围，支持多种格式"""
-        if isinstance(date_range, list) and len(date_range) == 2:
+        if (
+            isinstance(date_range, list)
+            and len(date_range) == 2
+            and all(isinstance(days, int) for days in date_range)
+        ):
+            # [起始天数, 结束天数] 格式，按距今天数计算，如[0, 7]表示最近7天
+            today = datetime.now().date()
+            start_date = today - timedelta(days=max(date_range))
+            end_date = today - timedelta(days=min(date_range))
+        elif isinstance(date_range, list) and len(date_range) == 2:
             # [起始日期, 结束日期] 格式
             start_date = datetime.strptime(date_range[0], "%Y-%m-%d").date()
             end_date = datetime.strptime(date_range[1], "%Y-%m-%d").date()
@@ -1,4 +1,64 @@
-from .generate_template_prompt import generate_template_prompt
-from .get_chat_response import GetChatResponseInput, get_chat_response
+from typing import TYPE_CHECKING
+from .lazy_import import lazy_import
 
-__all__ = ["GetChatResponseInput", "generate_template_prompt", "get_chat_response"]
+if TYPE_CHECKING:
+    from .consistent_hash_ring import ConsistentHashRing
+    from .generate_template_prompt import generate_template_prompt
+    from .get_chat_response import (
+        GetChatResponseInput,
+        get_chat_response,
+    )
+    from .prompt_stats import PromptStats
+    from .model_router import (
+        ModelRoute,
+        ModelRouter,
+    )
+    from .render_events_prompt import render_events_prompt
+    from .resilient_llm_client import (
+        CircuitBreaker,
+        LLMEndpoint,
+        ResilientLLMClient,
+    )
+    from .tokenize_text import tokenize_text
+    from .usage_tracker import (
+        UsageTracker,
+        usage_scope,
+    )
+
+__all__ = [
+    "CircuitBreaker",
+    "ConsistentHashRing",
+    "GetChatResponseInput",
+    "generate_template_prompt",
+    "get_chat_response",
+    "LLMEndpoint",
+    "ModelRoute",
+    "ModelRouter",
+    "PromptStats",
+    "render_events_prompt",
+    "ResilientLLMClient",
+    "tokenize_text",
+    "UsageTracker",
+    "usage_scope",
+]
+
+# 按需导入，只在第一次访问时加载对应模块
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "ConsistentHashRing": ".consistent_hash_ring",
+        "generate_template_prompt": ".generate_template_prompt",
+        "GetChatResponseInput": ".get_chat_response",
+        "get_chat_response": ".get_chat_response",
+        "PromptStats": ".prompt_stats",
+        "ModelRoute": ".model_router",
+        "ModelRouter": ".model_router",
+        "render_events_prompt": ".render_events_prompt",
+        "CircuitBreaker": ".resilient_llm_client",
+        "LLMEndpoint": ".resilient_llm_client",
+        "ResilientLLMClient": ".resilient_llm_client",
+        "tokenize_text": ".tokenize_text",
+        "UsageTracker": ".usage_tracker",
+        "usage_scope": ".usage_tracker",
+    },
+)
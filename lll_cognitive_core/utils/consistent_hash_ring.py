@@ -0,0 +1,59 @@
+import bisect
+import hashlib
+from typing import Dict, Iterable, List
+
+
+class ConsistentHashRing:
+    """
+    一致性哈希环
+    每个节点映射为多个虚拟节点，增删节点时只有少量键需要迁移
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: int = 128):
+        self.virtual_nodes = virtual_nodes
+        self._ring: Dict[int, str] = {}
+        self._sorted_hashes: List[int] = []
+        self._nodes: List[str] = []
+
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def add_node(self, node: str):
+        if node in self._nodes:
+            return
+
+        self._nodes.append(node)
+        for i in range(self.virtual_nodes):
+            node_hash = self._hash(f"{node}#{i}")
+            self._ring[node_hash] = node
+            bisect.insort(self._sorted_hashes, node_hash)
+
+    def remove_node(self, node: str):
+        if node not in self._nodes:
+            return
+
+        self._nodes.remove(node)
+        for i in range(self.virtual_nodes):
+            node_hash = self._hash(f"{node}#{i}")
+            if self._ring.get(node_hash) == node:
+                del self._ring[node_hash]
+                index = bisect.bisect_left(self._sorted_hashes, node_hash)
+                del self._sorted_hashes[index]
+
+    def get_node(self, key: str) -> str:
+        """顺时针找到第一个虚拟节点"""
+        if not self._sorted_hashes:
+            raise ValueError("一致性哈希环中没有节点")
+
+        index = bisect.bisect(self._sorted_hashes, self._hash(key))
+        if index == len(self._sorted_hashes):
+            index = 0
+        return self._ring[self._sorted_hashes[index]]
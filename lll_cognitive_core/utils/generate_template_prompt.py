@@ -1,9 +1,16 @@
+from functools import lru_cache
 from jinja2 import Template
 from typing import Dict, Any
 
 
+@lru_cache(maxsize=64)
+def _compile_template(input_template: str) -> Template:
+    # 模板只编译一次
+    return Template(input_template)
+
+
 def generate_template_prompt(
     input_template: str, format_inputs_func, inputs: Dict[str, Any]
 ):
     formatted_inputs = format_inputs_func(inputs)
-    return Template(input_template).render(**formatted_inputs)
+    return _compile_template(input_template).render(**formatted_inputs)
@@ -1,45 +1,102 @@
+import time
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from dataclasses import dataclass
 from openai import OpenAI
 from ..config.create_openai_config import CreateOpenaiConfig
 from .generate_template_prompt import generate_template_prompt
+from .incremental_json_array_parser import IncrementalJsonArrayParser
+from .prompt_stats import PromptStats
+from .model_router import ModelRouter
+from .resilient_llm_client import ResilientLLMClient
+from .usage_tracker import record_usage
 
 
 @dataclass
 class GetChatResponseInput:
-    client: OpenAI
+    # OpenAI 客户端，或 ResilientLLMClient / ModelRouter (此时 config 可以为 None)
+    client: OpenAI | ResilientLLMClient | ModelRouter
     config: CreateOpenaiConfig
     input_template: str
     format_inputs_func: Any
     inputs: Dict[str, Any]
     data_model: BaseModel
+    # 记录渲染耗时和前缀稳定性
+    prompt_stats: Optional[PromptStats] = None
+    # 调用阶段，ResilientLLMClient 按阶段选择截止时间，ModelRouter 按阶段选择模型
+    stage: str = ""
+
+
+def _render_prompt(data: GetChatResponseInput) -> str:
+    render_start = time.perf_counter()
+    prompt = generate_template_prompt(
+        data.input_template,
+        data.format_inputs_func,
+        data.inputs,
+    )
+    if data.prompt_stats is not None:
+        data.prompt_stats.record(prompt, time.perf_counter() - render_start)
+    return prompt
+
+
+def _build_messages(config: CreateOpenaiConfig, prompt: str):
+    return (config.pre_messages or []) + [{"role": "system", "content": prompt}]
+
+
+def _is_managed_client(client) -> bool:
+    # 自行选择端点和模型的客户端
+    return isinstance(client, (ResilientLLMClient, ModelRouter))
+
+
+def _create_completion(data: GetChatResponseInput, prompt: str, **kwargs):
+    if _is_managed_client(data.client):
+        create = (
+            data.client.create_chat_completion_stream
+            if kwargs.pop("stream", False)
+            else data.client.create_chat_completion
+        )
+        return create(
+            lambda config: _build_messages(config, prompt),
+            stage=data.stage,
+            **kwargs,
+        )
+
+    return data.client.chat.completions.create(
+        model=data.config.model,
+        messages=_build_messages(data.config, prompt),
+        **kwargs,
+    )
+
+
+def _is_ready(data: GetChatResponseInput) -> bool:
+    return data.client is not None and (
+        data.config is not None or _is_managed_client(data.client)
+    )
+
+
+def _record_usage(data: GetChatResponseInput, response):
+    """按当前用量作用域记录本次调用的 token 数"""
+    model = getattr(response, "model", None) or (
+        data.config.model if data.config is not None else ""
+    )
+    record_usage(data.stage, model, getattr(response, "usage", None))
+
+
+def _is_stream_options_rejected(error: Exception) -> bool:
+    """兼容服务不支持 stream_options 时通常返回 400/422"""
+    return getattr(error, "status_code", None) in (400, 422) or (
+        "stream_options" in str(error)
+    )
 
 
 def get_chat_response(data: GetChatResponseInput):
     try:
-        pre_messages = data.config.pre_messages or []
-
-        if data.client is not None and data.config is not None:
-            response = data.client.chat.completions.create(
-                model=data.config.model,
-                messages=list(
-                    dict.fromkeys(
-                        pre_messages
-                        + [
-                            {
-                                "role": "system",
-                                "content": generate_template_prompt(
-                                    data.input_template,
-                                    data.format_inputs_func,
-                                    data.inputs,
-                                ),
-                            }
-                        ]
-                    )
-                ),
-                response_format={"type": "json_object"},
+        if _is_ready(data):
+            prompt = _render_prompt(data)
+            response = _create_completion(
+                data, prompt, response_format={"type": "json_object"}
             )
+            _record_usage(data, response)
 
             return data.data_model.model_validate_json(
                 response.choices[0].message.content
@@ -47,3 +104,54 @@ def get_chat_response(data: GetChatResponseInput):
     except Exception as e:
         print(f"调用模型错误: {e}")
         return None
+
+
+def get_chat_response_stream(
+    data: GetChatResponseInput,
+    item_key: str,
+    on_item: Callable[[Dict[str, Any]], None],
+):
+    """
+    流式调用模型
+    item_key 对应数组中的元素一完整就回调 on_item，结束后返回完整的解析结果
+    """
+    try:
+        if not _is_ready(data):
+            return None
+
+        prompt = _render_prompt(data)
+        try:
+            # 最后一个分块返回用量
+            stream = _create_completion(
+                data,
+                prompt,
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+        except Exception as e:
+            if not _is_stream_options_rejected(e):
+                raise
+            # 部分兼容服务不支持 stream_options，去掉后重试一次，本次调用不统计用量
+            stream = _create_completion(
+                data,
+                prompt,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+
+        parser = IncrementalJsonArrayParser(item_key)
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                _record_usage(data, chunk)
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                for item in parser.feed(content):
+                    on_item(item)
+
+        return data.data_model.model_validate_json(parser.text)
+    except Exception as e:
+        print(f"调用模型错误: {e}")
+        return None
@@ -0,0 +1,85 @@
+import json
+from typing import Any, Dict, List
+
+
+class IncrementalJsonArrayParser:
+    """
+    增量JSON数组解析器
+    逐块输入流式返回的JSON文本，顶层对象中 key 对应数组的每个元素对象一完整就立即解析出来
+    """
+
+    def __init__(self, key: str = "plan"):
+        self.key = key
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string = None
+        self._current_key = None
+        self._array_depth = 0  # 目标数组内部的深度，0 表示不在目标数组内
+        self._item_start = -1
+
+    @property
+    def text(self) -> str:
+        """目前收到的全部文本"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """输入一段文本，返回本次新解析出的完整元素"""
+        self._text += chunk
+        items: List[Dict[str, Any]] = []
+
+        text = self._text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1 : i]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":":
+                if self._depth == 1:
+                    self._current_key = self._last_string
+            elif char in "{[":
+                self._depth += 1
+                if (
+                    char == "["
+                    and self._depth == 2
+                    and self._current_key == self.key
+                    and not self._array_depth
+                ):
+                    self._array_depth = self._depth
+                elif char == "{" and self._array_depth == self._depth - 1:
+                    self._item_start = i
+            elif char in "}]":
+                if (
+                    char == "}"
+                    and self._array_depth
+                    and self._depth == self._array_depth + 1
+                    and self._item_start >= 0
+                ):
+                    try:
+                        items.append(json.loads(text[self._item_start : i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = -1
+                elif char == "]" and self._depth == self._array_depth:
+                    self._array_depth = 0
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                self._current_key = None
+
+        self._pos = len(text)
+        return items
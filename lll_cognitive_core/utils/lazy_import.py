@@ -0,0 +1,48 @@
+import sys
+import importlib
+from types import ModuleType
+from typing import Callable, Dict, List, Tuple
+
+
+class _LazyPackage(ModuleType):
+    """
+    子模块导入完成后，import 系统会把子模块对象绑定到包上，
+    与子模块同名的属性(例如 utils.get_chat_response)会因此被覆盖成模块，这里改为绑定子模块中的同名对象
+    """
+
+    def __setattr__(self, name, value):
+        target = self.__dict__.get("_lazy_attrs", {}).get(name)
+        if (
+            target is not None
+            and isinstance(value, ModuleType)
+            and value.__name__ == f"{self.__name__}{target}"
+            and hasattr(value, name)
+        ):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+def lazy_import(
+    module_name: str, attrs: Dict[str, str]
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    包属性在第一次访问时才导入对应模块 (PEP 562)
+    attrs: {属性名: 相对模块路径}，返回包 __init__ 中使用的 __getattr__ 和 __dir__
+    """
+    module = sys.modules[module_name]
+    module._lazy_attrs = attrs
+    module.__class__ = _LazyPackage
+
+    def __getattr__(name: str):
+        target = attrs.get(name)
+        if target is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+        value = getattr(importlib.import_module(target, module_name), name)
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(module.__dict__) | set(attrs))
+
+    return __getattr__, __dir__
@@ -0,0 +1,283 @@
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..config.create_openai_config import CreateOpenaiConfig
+from .resilient_llm_client import MessagesBuilder
+from .usage_tracker import current_usage_context, is_over_budget
+
+# 默认的阶段优先级，0-1，越高越晚降级
+DEFAULT_STAGE_PRIORITIES: Dict[str, float] = {
+    "behavior_generation": 0.8,
+    "event_understanding": 0.5,
+    "associative_recall": 0.3,
+    "memory_extraction": 0.0,
+}
+
+
+@dataclass
+class ModelRoute:
+    """一条路由: 使用的客户端和模型，以及允许使用它的条件"""
+
+    name: str
+    # OpenAI 客户端，或 ResilientLLMClient (此时 config 可以为 None)
+    client: Any
+    config: Optional[CreateOpenaiConfig] = None
+    # 阶段感受到的压力不超过该值时才使用
+    max_pressure: float = 1.0
+    # 该路由近期 p95 延迟超过预算时跳过
+    latency_budget: Optional[float] = None
+    latency_window: int = 200
+
+    def __post_init__(self):
+        self._latencies: Deque[float] = deque(maxlen=self.latency_window)
+
+    def latency_p95(self) -> Optional[float]:
+        latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+
+class _TimedStream:
+    """
+    包装流式响应，流读完、关闭或出错时才回调 on_finish(是否失败)
+    创建流只等到首个字节，按完整的流耗时统计延迟才能和非流式调用比较
+    """
+
+    def __init__(self, stream, on_finish: Callable[[bool], None]):
+        self._stream = stream
+        self._on_finish = on_finish
+        self._finished = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                yield chunk
+        except Exception:
+            self._finish(True)
+            raise
+        finally:
+            self._finish(False)
+
+    def close(self):
+        close = getattr(self._stream, "close", None)
+        try:
+            if close is not None:
+                close()
+        finally:
+            self._finish(False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def _finish(self, failed: bool):
+        if not self._finished:
+            self._finished = True
+            self._on_finish(failed)
+
+
+@dataclass
+class _RouteStats:
+    decisions: int = 0
+    failures: int = 0
+    total_latency: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+
+class ModelRouter:
+    """
+    按阶段选择模型
+    每个阶段配置一组按优先顺序排列的路由，依次选择第一条满足条件的路由，都不满足时使用最后一条。
+    条件基于压力和观测到的延迟:
+        压力 = max(认知负荷, 排队事件数 / queue_capacity)
+        阶段感受到的压力 = 压力 * (1 - 阶段优先级)
+    多会话共享路由时，压力只取当前用量作用域所属会话上报的负荷，一个会话繁忙不会让其他会话降级
+    当前会话超出用量预算(见 UsageTracker)时，所有阶段都使用最后一条路由
+    负荷和队列由 CognitiveCore 在每轮处理时上报，可以直接作为 GetChatResponseInput.client 使用
+    """
+
+    def __init__(
+        self,
+        stage_routes: Dict[str, List[ModelRoute]],
+        default_routes: List[ModelRoute] = None,
+        stage_priorities: Dict[str, float] = None,
+        queue_capacity: int = 50,
+        signal_ttl: float = 30.0,
+    ):
+        self.stage_routes = stage_routes
+        self.default_routes = default_routes or []
+        self.stage_priorities = {
+            **DEFAULT_STAGE_PRIORITIES,
+            **(stage_priorities or {}),
+        }
+        self.queue_capacity = max(1, queue_capacity)
+        self.signal_ttl = signal_ttl
+
+        self._lock = threading.Lock()
+        # 上报来源 -> (认知负荷, 排队事件数, 上报时间)，多会话共享时按会话上报
+        self._signals: Dict[str, Tuple[float, int, float]] = {}
+        self._stage_stats: Dict[str, Dict[str, _RouteStats]] = {}
+        self._degraded: Dict[str, int] = {}
+        self._over_budget: Dict[str, int] = {}
+
+    def update_signals(
+        self, cognitive_load: float, queue_depth: int, source: str = "default"
+    ):
+        with self._lock:
+            self._signals[source] = (cognitive_load, queue_depth, time.time())
+
+    def pressure(self, source: str = None) -> float:
+        """上报来源的压力，默认为当前用量作用域的会话"""
+        source = source or current_usage_context().session_id or "default"
+        with self._lock:
+            signal = self._signals.get(source)
+        if signal is None:
+            return 0.0
+
+        cognitive_load, queue_depth, updated = signal
+        if time.time() - updated > self.signal_ttl:
+            return 0.0
+        return min(1.0, max(cognitive_load, queue_depth / self.queue_capacity))
+
+    def select_route(self, stage: str) -> ModelRoute:
+        routes = self.stage_routes.get(stage) or self.default_routes
+        if not routes:
+            raise ValueError(f"没有为阶段配置模型路由: {stage}")
+
+        stage_pressure = self.pressure() * (1 - self.stage_priorities.get(stage, 0.5))
+        selected = routes[-1]
+        # 当前会话超出用量预算时直接使用最后一条路由
+        over_budget = is_over_budget()
+        if not over_budget:
+            for route in routes:
+                if stage_pressure > route.max_pressure:
+                    continue
+                if route.latency_budget is not None:
+                    p95 = route.latency_p95()
+                    if p95 is not None and p95 > route.latency_budget:
+                        continue
+                selected = route
+                break
+
+        with self._lock:
+            stats = self._stage_stats.setdefault(stage, {})
+            stats.setdefault(selected.name, _RouteStats()).decisions += 1
+            if selected is not routes[0]:
+                self._degraded[stage] = self._degraded.get(stage, 0) + 1
+            if over_budget:
+                self._over_budget[stage] = self._over_budget.get(stage, 0) + 1
+        return selected
+
+    def create_chat_completion(
+        self, build_messages: MessagesBuilder, stage: str = "", **kwargs
+    ):
+        return self._call(build_messages, stage, False, kwargs)
+
+    def create_chat_completion_stream(
+        self, build_messages: MessagesBuilder, stage: str = "", **kwargs
+    ):
+        return self._call(build_messages, stage, True, kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                stage: {
+                    "degraded": self._degraded.get(stage, 0),
+                    "over_budget": self._over_budget.get(stage, 0),
+                    "routes": {
+                        name: {
+                            "decisions": stats.decisions,
+                            "failures": stats.failures,
+                            "latency_avg": (
+                                stats.total_latency / len(stats.latencies)
+                                if stats.latencies
+                                else 0.0
+                            ),
+                            "latency_p95": (
+                                sorted(stats.latencies)[
+                                    int(len(stats.latencies) * 0.95)
+                                ]
+                                if stats.latencies
+                                else 0.0
+                            ),
+                        }
+                        for name, stats in route_stats.items()
+                    },
+                }
+                for stage, route_stats in self._stage_stats.items()
+            }
+
+        endpoints = {}
+        for routes in [self.default_routes, *self.stage_routes.values()]:
+            for route in routes:
+                if hasattr(route.client, "get_stats"):
+                    endpoints[route.name] = route.client.get_stats()
+
+        with self._lock:
+            sources = list(self._signals)
+        pressure = {source: self.pressure(source) for source in sources}
+
+        return {"pressure": pressure, "stages": stages, "endpoints": endpoints}
+
+    def _call(
+        self,
+        build_messages: MessagesBuilder,
+        stage: str,
+        stream: bool,
+        kwargs: Dict[str, Any],
+    ):
+        route = self.select_route(stage)
+        start_time = time.time()
+        try:
+            if hasattr(route.client, "create_chat_completion"):
+                create = (
+                    route.client.create_chat_completion_stream
+                    if stream
+                    else route.client.create_chat_completion
+                )
+                response = create(build_messages, stage=stage, **kwargs)
+            else:
+                if stream:
+                    kwargs["stream"] = True
+                response = route.client.chat.completions.create(
+                    model=route.config.model,
+                    messages=build_messages(route.config),
+                    **kwargs,
+                )
+        except Exception:
+            self._record_failure(stage, route)
+            raise
+
+        if not stream:
+            self._record_latency(stage, route, time.time() - start_time)
+            return response
+
+        def on_finish(failed: bool):
+            if failed:
+                self._record_failure(stage, route)
+            else:
+                self._record_latency(stage, route, time.time() - start_time)
+
+        return _TimedStream(response, on_finish)
+
+    def _record_failure(self, stage: str, route: ModelRoute):
+        with self._lock:
+            self._stage_stats[stage][route.name].failures += 1
+
+    def _record_latency(self, stage: str, route: ModelRoute, elapsed: float):
+        with self._lock:
+            route._latencies.append(elapsed)
+            stats = self._stage_stats[stage][route.name]
+            if len(stats.latencies) == stats.latencies.maxlen:
+                stats.total_latency -= stats.latencies[0]
+            stats.latencies.append(elapsed)
+            stats.total_latency += elapsed
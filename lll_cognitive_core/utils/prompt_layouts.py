@@ -0,0 +1,180 @@
+"""
+各插件的提示词布局
+按 固定说明 -> 很少变化的内容 -> 只追加的事件 -> 每次都变的内容 的顺序排列，
+相邻两次调用的提示词有尽可能长的相同前缀，便于模型服务端复用前缀缓存
+"""
+
+from lll_simple_ai_shared import (
+    associative_recall_output_json_template,
+    associative_recall_system_template,
+    behavior_output_json_template,
+    behavior_system_template,
+    default_extract_strings,
+    extract_memories_output_json_template,
+    extract_memories_system_template,
+    understand_output_json_template,
+    understand_system_template,
+)
+
+from .render_events_prompt import render_events_prompt
+
+
+def _instructions(
+    system_template: str, output_json_template, first_section: str
+) -> str:
+    """
+    系统模板中第一个段落标题 first_section 之前的固定说明，加上输出格式要求
+    共享模板改动后找不到该标题时直接报错，不会把段落内容误当作固定说明
+    """
+    intro, found, _ = system_template.partition(first_section)
+    if not found:
+        raise ValueError(f"系统模板中没有段落标题: {first_section}")
+    intro = intro.strip()
+    output_format = output_json_template.render()
+    # 输出示例中的JSON不参与模板渲染
+    return f"{{% raw %}}{intro}\n\n{output_format}{{% endraw %}}"
+
+
+_UNDERSTAND_INSTRUCTIONS = _instructions(
+    understand_system_template, understand_output_json_template, "【需要你理解的信息】"
+)
+_ASSOCIATIVE_RECALL_INSTRUCTIONS = _instructions(
+    associative_recall_system_template,
+    associative_recall_output_json_template,
+    "【当前情境】",
+)
+_BEHAVIOR_INSTRUCTIONS = _instructions(
+    behavior_system_template, behavior_output_json_template, "【当前情境】"
+)
+_EXTRACT_MEMORIES_INSTRUCTIONS = _instructions(
+    extract_memories_system_template,
+    extract_memories_output_json_template,
+    "【当前情境】",
+)
+
+
+UNDERSTAND_PROMPT_TEMPLATE = f"""{_UNDERSTAND_INSTRUCTIONS}
+
+【你正在做的事】
+{{{{active_goals}}}}
+
+【刚才的对话和事件】
+{{{{recent_events}}}}
+
+【需要你理解的信息】
+[{{{{understand_event_type}}}}]{{{{understand_event}}}}
+
+请简单总结需要你理解的多模态信息。"""
+
+
+UNDERSTAND_BATCH_PROMPT_TEMPLATE = f"""{_UNDERSTAND_INSTRUCTIONS}
+
+这一次需要你按顺序理解多条信息，输出一个JSON对象，`results` 字段是数组，
+按信息编号顺序为每条信息给出一个上述格式的对象，数量必须与信息条数相同。
+
+【你正在做的事】
+{{{{active_goals}}}}
+
+【刚才的对话和事件】
+{{{{recent_events}}}}
+
+【需要你理解的信息】(共{{{{understand_event_count}}}}条)
+{{{{understand_events}}}}
+
+请简单总结需要你理解的每一条多模态信息。"""
+
+
+ASSOCIATIVE_RECALL_PROMPT_TEMPLATE = f"""{_ASSOCIATIVE_RECALL_INSTRUCTIONS}
+
+【你正在做的事】
+{{{{active_goals}}}}
+
+【刚才的对话和事件】
+{{{{recent_events}}}}
+
+【当前情境】
+{{{{current_situation}}}}
+
+【相关的历史记忆】
+{{{{episodic_memories}}}}"""
+
+
+BEHAVIOR_PROMPT_TEMPLATE = f"""{_BEHAVIOR_INSTRUCTIONS}
+
+【你正在做的事】
+{{{{active_goals}}}}
+
+【社交规范】
+{{{{social_norms}}}}
+
+【刚才的对话和事件】
+{{{{recent_events}}}}
+
+【当前情境】
+{{{{current_situation}}}}
+
+【相关的历史记忆】
+{{{{episodic_memories}}}}"""
+
+
+EXTRACT_MEMORIES_PROMPT_TEMPLATE = f"""{_EXTRACT_MEMORIES_INSTRUCTIONS}
+
+【你正在做的事情】
+{{{{active_goals}}}}
+
+【需要你整理的原始记忆】(每个记忆已包含ID)
+{{{{recent_events}}}}
+
+【当前情境】
+{{{{current_situation}}}}"""
+
+
+def format_understand_inputs(inputs):
+    return {
+        "understand_event_type": inputs.understand_event.type or "未知",
+        "understand_event": inputs.understand_event.data or "无",
+        "recent_events": render_events_prompt(inputs.recent_events),
+        "active_goals": default_extract_strings(inputs.active_goals, "description"),
+    }
+
+
+def format_understand_batch_inputs(inputs):
+    return {
+        "understand_event_count": len(inputs.understand_events),
+        "understand_events": "\n".join(
+            f"{i}. [{event.type or '未知'}]{event.data or '无'}"
+            for i, event in enumerate(inputs.understand_events, 1)
+        ),
+        "recent_events": render_events_prompt(inputs.recent_events),
+        "active_goals": default_extract_strings(inputs.active_goals, "description"),
+    }
+
+
+def format_associative_recall_inputs(inputs):
+    return {
+        "current_situation": inputs.current_situation or "未知",
+        "recent_events": render_events_prompt(inputs.recent_events),
+        "episodic_memories": default_extract_strings(
+            inputs.episodic_memories, "content"
+        ),
+        "active_goals": default_extract_strings(inputs.active_goals, "description"),
+    }
+
+
+def format_behavior_inputs(inputs):
+    return {
+        "current_situation": inputs.current_situation or "未知",
+        "recent_events": render_events_prompt(inputs.recent_events),
+        "episodic_memories": inputs.episodic_memories_text
+        or default_extract_strings(inputs.episodic_memories, "content"),
+        "active_goals": default_extract_strings(inputs.active_goals, "description"),
+        "social_norms": default_extract_strings(inputs.social_norms),
+    }
+
+
+def format_extract_memories_inputs(inputs):
+    return {
+        "current_situation": inputs.current_situation or "未知",
+        "recent_events": render_events_prompt(inputs.recent_events, with_id=True),
+        "active_goals": default_extract_strings(inputs.active_goals, "description"),
+    }
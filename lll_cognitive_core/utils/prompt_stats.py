@@ -0,0 +1,59 @@
+import threading
+from typing import Any, Dict
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """两个字符串的公共前缀长度，按切片二分比较"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+class PromptStats:
+    """
+    提示词渲染统计
+    记录渲染耗时，以及与上一次提示词的公共前缀占比(前缀越稳定，模型服务端的前缀缓存命中越多)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_prompt = ""
+        self.renders = 0
+        self.total_render_time = 0.0
+        self.total_chars = 0
+        self.reused_prefix_chars = 0
+        self.last_prefix_stability = 0.0
+
+    def record(self, prompt: str, render_time: float):
+        with self._lock:
+            reused = common_prefix_length(self._last_prompt, prompt)
+            self._last_prompt = prompt
+
+            self.renders += 1
+            self.total_render_time += render_time
+            self.total_chars += len(prompt)
+            self.reused_prefix_chars += reused
+            self.last_prefix_stability = reused / len(prompt) if prompt else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "renders": self.renders,
+                "average_render_time": (
+                    self.total_render_time / self.renders if self.renders else 0.0
+                ),
+                "average_prompt_chars": (
+                    self.total_chars / self.renders if self.renders else 0.0
+                ),
+                "prefix_stability": (
+                    self.reused_prefix_chars / self.total_chars
+                    if self.total_chars
+                    else 0.0
+                ),
+                "last_prefix_stability": self.last_prefix_stability,
+            }
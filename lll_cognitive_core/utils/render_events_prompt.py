@@ -0,0 +1,17 @@
+from typing import Iterable
+
+
+def render_events_prompt(events: Iterable, with_id: bool = False) -> str:
+    """
+    把事件列表渲染为提示词中的事件段落
+    每个事件的片段只渲染一次并缓存在事件上，事件只追加时输出也只在末尾追加
+    """
+    fragments = []
+    for event in events:
+        if event is None:
+            continue
+        fragment = event.prompt_fragment(with_id)
+        if fragment:
+            fragments.append(fragment)
+
+    return "- " + "\n- ".join(fragments) if fragments else "无"
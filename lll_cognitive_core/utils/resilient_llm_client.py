@@ -0,0 +1,383 @@
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from openai import OpenAI
+
+from ..config.create_openai_config import CreateOpenaiConfig
+
+# 根据端点配置生成该端点的消息列表
+MessagesBuilder = Callable[[CreateOpenaiConfig], List[Dict[str, str]]]
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    连续失败达到阈值后打开，冷却时间过后进入半开状态只放行一次试探请求，成功后关闭
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.time() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.time() - self._opened_at < self.reset_timeout:
+                return False
+            # 半开状态只放行一个试探请求
+            if self._probe_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.time()
+
+
+class LLMEndpoint:
+    """一个模型服务端点，带熔断器和延迟统计"""
+
+    def __init__(
+        self,
+        client: OpenAI,
+        config: CreateOpenaiConfig,
+        name: str = None,
+        breaker: CircuitBreaker = None,
+        latency_window: int = 200,
+    ):
+        self.client = client
+        self.config = config
+        self.name = name or f"{config.base_url}#{config.model}"
+        self.breaker = breaker or CircuitBreaker()
+
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self.stats = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "hedges": 0,
+            "rejected": 0,
+        }
+
+    def record(self, outcome: str, latency: float = None):
+        with self._lock:
+            self.stats[outcome] += 1
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def latency_percentile(self, p: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            return self._latency_percentile_locked(p, min_samples)
+
+    def get_stats(self) -> Dict[str, Any]:
+        # 计数和延迟在同一次加锁中读取，不会与请求线程的更新交错
+        with self._lock:
+            stats = {
+                **self.stats,
+                "latency_p50": self._latency_percentile_locked(0.5),
+                "latency_p95": self._latency_percentile_locked(0.95),
+            }
+        stats["circuit"] = self.breaker.state
+        return stats
+
+    def _latency_percentile_locked(
+        self, p: float, min_samples: int = 1
+    ) -> Optional[float]:
+        if len(self._latencies) < min_samples:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+
+class ResilientLLMClient:
+    """
+    高可用模型客户端
+    - 每个阶段有独立的截止时间，超时后放弃并返回错误，不会无限阻塞处理线程
+    - 失败后按带抖动的指数退避重试，次数有上限
+    - 请求超过该端点 p95 延迟仍未返回时，向下一个可用端点发出对冲请求，取先成功的结果
+    - 每个端点有熔断器，连续失败的端点暂时跳过
+    可以直接作为 GetChatResponseInput.client 使用
+    """
+
+    def __init__(
+        self,
+        endpoints: List[Tuple[OpenAI, CreateOpenaiConfig]],
+        stage_deadlines: Dict[str, float] = None,
+        default_deadline: float = 30.0,
+        max_retries: int = 2,
+        retry_backoff: float = 0.2,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_min_delay: float = 0.05,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_workers: int = 16,
+    ):
+        if not endpoints:
+            raise ValueError("至少需要一个模型服务端点")
+
+        self.endpoints = [
+            (
+                endpoint
+                if isinstance(endpoint, LLMEndpoint)
+                else LLMEndpoint(
+                    *endpoint,
+                    breaker=CircuitBreaker(failure_threshold, reset_timeout),
+                )
+            )
+            for endpoint in endpoints
+        ]
+        self.stage_deadlines = stage_deadlines or {}
+        self.default_deadline = default_deadline
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="llm-request"
+        )
+
+    def create_chat_completion(
+        self,
+        build_messages: MessagesBuilder,
+        stage: str = "",
+        deadline: float = None,
+        **kwargs,
+    ):
+        """在截止时间内返回第一个成功的响应，全部失败或超时时抛出最后的错误"""
+        timeout = deadline or self.stage_deadlines.get(stage, self.default_deadline)
+        deadline_at = time.time() + timeout
+        last_error: Exception = TimeoutError(f"模型调用超时({stage}): {timeout}s")
+
+        # 重试时优先换到还没有尝试过的端点
+        tried: List[LLMEndpoint] = []
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = (
+                    self.retry_backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                )
+                if time.time() + delay >= deadline_at:
+                    break
+                time.sleep(delay)
+
+            try:
+                return self._attempt(build_messages, deadline_at, kwargs, tried)
+            except Exception as e:
+                last_error = e
+                if time.time() >= deadline_at:
+                    break
+
+        raise last_error
+
+    def create_chat_completion_stream(
+        self,
+        build_messages: MessagesBuilder,
+        stage: str = "",
+        deadline: float = None,
+        **kwargs,
+    ):
+        """
+        流式调用，只在建立连接阶段重试和切换端点
+        截止时间作为整个流的超时传给客户端
+        """
+        timeout = deadline or self.stage_deadlines.get(stage, self.default_deadline)
+        deadline_at = time.time() + timeout
+        last_error: Exception = TimeoutError(f"模型调用超时({stage}): {timeout}s")
+
+        tried: List[LLMEndpoint] = []
+        for _ in range(self.max_retries + 1):
+            endpoint = self._select_endpoint(exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+
+            start_time = time.time()
+            endpoint.record("requests")
+            try:
+                stream = endpoint.client.chat.completions.create(
+                    model=endpoint.config.model,
+                    messages=build_messages(endpoint.config),
+                    timeout=max(0.001, deadline_at - time.time()),
+                    stream=True,
+                    **kwargs,
+                )
+            except Exception as e:
+                last_error = e
+                endpoint.breaker.record_failure()
+                endpoint.record("failures")
+                continue
+
+            endpoint.breaker.record_success()
+            endpoint.record("successes", time.time() - start_time)
+            return stream
+
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {endpoint.name: endpoint.get_stats() for endpoint in self.endpoints}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait)
+
+    def _select_endpoint(
+        self, exclude: List[LLMEndpoint] = (), reuse: bool = True
+    ) -> Optional[LLMEndpoint]:
+        """
+        按顺序选择熔断器允许的端点，优先没有用过的，reuse 为 False 时只选择没有用过的
+        每个端点在一次选择中最多记录一次拒绝
+        """
+        candidates = [
+            endpoint for endpoint in self.endpoints if endpoint not in exclude
+        ]
+        if reuse:
+            candidates += [
+                endpoint for endpoint in self.endpoints if endpoint in exclude
+            ]
+
+        for endpoint in candidates:
+            if endpoint.breaker.allow_request():
+                return endpoint
+            endpoint.record("rejected")
+        return None
+
+    def _hedge_delay(self, endpoint: LLMEndpoint) -> Optional[float]:
+        p95 = endpoint.latency_percentile(self.hedge_percentile, self.hedge_min_samples)
+        if p95 is None:
+            return None
+        return max(self.hedge_min_delay, p95)
+
+    def _submit(
+        self,
+        endpoint: LLMEndpoint,
+        build_messages: MessagesBuilder,
+        deadline_at: float,
+        kwargs: Dict[str, Any],
+    ) -> Future:
+        def call():
+            start_time = time.time()
+            endpoint.record("requests")
+            try:
+                response = endpoint.client.chat.completions.create(
+                    model=endpoint.config.model,
+                    messages=build_messages(endpoint.config),
+                    timeout=max(0.001, deadline_at - start_time),
+                    **kwargs,
+                )
+            except Exception:
+                endpoint.breaker.record_failure()
+                endpoint.record("failures")
+                raise
+            endpoint.breaker.record_success()
+            endpoint.record("successes", time.time() - start_time)
+            return response
+
+        return self._executor.submit(call)
+
+    def _attempt(
+        self,
+        build_messages: MessagesBuilder,
+        deadline_at: float,
+        kwargs: Dict[str, Any],
+        tried: List[LLMEndpoint],
+    ):
+        """一次尝试: 主请求，超过 p95 延迟仍未返回时发出对冲请求"""
+        primary = self._select_endpoint(exclude=tried)
+        if primary is None:
+            raise RuntimeError("所有模型服务端点都已熔断")
+
+        primary_future = self._submit(primary, build_messages, deadline_at, kwargs)
+        pending = {primary_future}
+        # 每个请求对应的端点，超时时只记录仍未返回的端点
+        endpoints = {primary_future: primary}
+        used = [primary]
+        tried.append(primary)
+        hedge_delay = self._hedge_delay(primary)
+        last_error: Exception = None
+
+        while pending:
+            remaining = deadline_at - time.time()
+            if remaining <= 0:
+                break
+
+            wait_time = remaining
+            if hedge_delay is not None:
+                wait_time = min(wait_time, hedge_delay)
+
+            done, pending = wait(
+                pending, timeout=wait_time, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+
+            if done and not pending:
+                break
+
+            if not done and hedge_delay is not None:
+                # 主请求过慢，向另一个端点发出一次对冲请求
+                hedge_delay = None
+                hedge = self._select_endpoint(exclude=used, reuse=False)
+                if hedge is not None:
+                    hedge.record("hedges")
+                    used.append(hedge)
+                    tried.append(hedge)
+                    hedge_future = self._submit(
+                        hedge, build_messages, deadline_at, kwargs
+                    )
+                    endpoints[hedge_future] = hedge
+                    pending.add(hedge_future)
+
+        if pending:
+            # 已经失败的请求记为失败，不再重复记为超时；还没开始的请求直接取消，
+            # 已在执行的请求由传给客户端的超时结束
+            for future in pending:
+                future.cancel()
+                endpoints[future].record("timeouts")
+            raise TimeoutError("模型调用超过截止时间")
+        raise last_error
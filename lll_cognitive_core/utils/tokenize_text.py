@@ -0,0 +1,25 @@
+import re
+from typing import List
+
+# 拉丁字母/数字连续片段，或单个中日韩字符
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+|[぀-ヿ㐀-䶿一-鿿]")
+_CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿]")
+
+
+def tokenize_text(text: str, cjk_bigrams: bool = True) -> List[str]:
+    """
+    轻量分词
+    拉丁文本按单词切分，中文按单字切分并补充相邻字的二元组
+    """
+    if not text:
+        return []
+
+    pieces = _TOKEN_PATTERN.findall(text.lower())
+    tokens = list(pieces)
+
+    if cjk_bigrams:
+        for current, following in zip(pieces, pieces[1:]):
+            if _CJK_PATTERN.match(current) and _CJK_PATTERN.match(following):
+                tokens.append(current + following)
+
+    return tokens
@@ -0,0 +1,221 @@
+import time
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class UsageContext:
+    """当前调用所属的统计器、会话和事件"""
+
+    tracker: Optional["UsageTracker"] = None
+    session_id: Optional[str] = None
+    event_id: Optional[str] = None
+
+
+_usage_context: ContextVar[UsageContext] = ContextVar(
+    "usage_context", default=UsageContext()
+)
+
+
+def current_usage_context() -> UsageContext:
+    return _usage_context.get()
+
+
+@contextmanager
+def usage_scope(
+    tracker: "UsageTracker" = None, session_id: str = None, event_id: str = None
+):
+    """在作用域内的模型调用记到指定的统计器、会话和事件下，未指定的沿用外层"""
+    outer = _usage_context.get()
+    token = _usage_context.set(
+        UsageContext(
+            tracker=tracker or outer.tracker,
+            session_id=session_id or outer.session_id,
+            event_id=event_id or outer.event_id,
+        )
+    )
+    try:
+        yield
+    finally:
+        _usage_context.reset(token)
+
+
+def record_usage(stage: str, model: str, usage: Any):
+    """记录一次模型调用的用量，当前作用域没有统计器或响应没有用量时忽略"""
+    context = _usage_context.get()
+    if context.tracker is None or usage is None:
+        return
+
+    context.tracker.record(
+        stage,
+        model,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        session_id=context.session_id,
+        event_id=context.event_id,
+    )
+
+
+def is_over_budget() -> bool:
+    """当前作用域的会话是否超出预算"""
+    context = _usage_context.get()
+    if context.tracker is None:
+        return False
+    return context.tracker.is_over_budget(context.session_id)
+
+
+def _new_counter() -> Dict[str, Any]:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0}
+
+
+def _add(counter: Dict[str, Any], prompt_tokens: int, completion_tokens: int, cost):
+    counter["calls"] += 1
+    counter["prompt_tokens"] += prompt_tokens
+    counter["completion_tokens"] += completion_tokens
+    counter["cost"] += cost
+
+
+class UsageTracker:
+    """
+    模型调用用量统计
+    按阶段、模型、会话、事件累计 token 数和费用，并统计最近 window 秒内的滚动用量
+    费用按 model_prices 中每千 token 的价格 [输入, 输出] 计算，没有价格的模型费用为 0
+    会话的累计 token 数或费用超过预算后，is_over_budget 返回 True，由调用方改走更便宜的路径
+    """
+
+    def __init__(
+        self,
+        model_prices: Dict[str, List[float]] = None,
+        session_token_budget: int = 0,
+        session_cost_budget: float = 0.0,
+        window: float = 60.0,
+        max_events: int = 1000,
+    ):
+        self.model_prices = model_prices or {}
+        self.session_token_budget = session_token_budget
+        self.session_cost_budget = session_cost_budget
+        self.window = window
+        self.max_events = max_events
+
+        self._lock = threading.Lock()
+        self._total = _new_counter()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._session_stages: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # 只保留最近 max_events 个事件的用量
+        self._events: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 滚动窗口: (时间, token 数, 费用)
+        self._recent: Deque[Tuple[float, int, float]] = deque()
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prices = self.model_prices.get(model)
+        if not prices:
+            return 0.0
+        return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1000
+
+    def record(
+        self,
+        stage: str,
+        model: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        session_id: str = None,
+        event_id: str = None,
+    ):
+        cost = self.cost(model, prompt_tokens, completion_tokens)
+        now = time.time()
+
+        with self._lock:
+            _add(self._total, prompt_tokens, completion_tokens, cost)
+            session_stages = self._session_stages.setdefault(
+                session_id or "default", {}
+            )
+            for counters, key in (
+                (self._stages, stage or "unknown"),
+                (self._models, model or "unknown"),
+                (self._sessions, session_id or "default"),
+                (session_stages, stage or "unknown"),
+            ):
+                counter = counters.get(key)
+                if counter is None:
+                    counter = counters[key] = _new_counter()
+                _add(counter, prompt_tokens, completion_tokens, cost)
+
+            if event_id:
+                counter = self._events.get(event_id)
+                if counter is None:
+                    counter = self._events[event_id] = _new_counter()
+                    if len(self._events) > self.max_events:
+                        self._events.popitem(last=False)
+                _add(counter, prompt_tokens, completion_tokens, cost)
+
+            self._recent.append((now, prompt_tokens + completion_tokens, cost))
+            self._trim(now)
+
+    def is_over_budget(self, session_id: str = None) -> bool:
+        if not self.session_token_budget and not self.session_cost_budget:
+            return False
+
+        with self._lock:
+            counter = self._sessions.get(session_id or "default")
+        if counter is None:
+            return False
+
+        tokens = counter["prompt_tokens"] + counter["completion_tokens"]
+        return bool(
+            (self.session_token_budget and tokens >= self.session_token_budget)
+            or (
+                self.session_cost_budget and counter["cost"] >= self.session_cost_budget
+            )
+        )
+
+    def reset_session(self, session_id: str):
+        """清空会话用量，重新开始计算预算"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._session_stages.pop(session_id, None)
+
+    def get_event_usage(self, event_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            counter = self._events.get(event_id)
+            return dict(counter) if counter is not None else None
+
+    def get_stats(self, session_id: str = None) -> Dict[str, Any]:
+        """所有会话的汇总用量，指定 session_id 时只返回该会话的用量"""
+        if session_id is not None:
+            with self._lock:
+                stats = {
+                    **(self._sessions.get(session_id) or _new_counter()),
+                    "stages": {
+                        k: dict(v)
+                        for k, v in self._session_stages.get(session_id, {}).items()
+                    },
+                }
+            stats["over_budget"] = self.is_over_budget(session_id)
+            return stats
+
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            recent_tokens = sum(tokens for _, tokens, _ in self._recent)
+            recent_cost = sum(cost for _, _, cost in self._recent)
+
+            stats = {
+                **dict(self._total),
+                "stages": {k: dict(v) for k, v in self._stages.items()},
+                "models": {k: dict(v) for k, v in self._models.items()},
+                "sessions": len(self._sessions),
+                "window": self.window,
+                "window_tokens": recent_tokens,
+                "window_cost": recent_cost,
+            }
+        return stats
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0][0] > self.window:
+            self._recent.popleft()
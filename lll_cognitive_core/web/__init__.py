@@ -1,3 +1,19 @@
-from .create_cognitive_app import create_cognitive_app
+from typing import TYPE_CHECKING
+from ..utils.lazy_import import lazy_import
 
-__all__ = ["create_cognitive_app"]
+if TYPE_CHECKING:
+    from .create_cognitive_app import create_cognitive_app
+    from .create_shard_router_app import create_shard_router_app
+    from .launch_sharded_workers import launch_sharded_workers
+
+__all__ = ["create_cognitive_app", "create_shard_router_app", "launch_sharded_workers"]
+
+# 按需导入，只在第一次访问时加载对应模块
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "create_cognitive_app": ".create_cognitive_app",
+        "create_shard_router_app": ".create_shard_router_app",
+        "launch_sharded_workers": ".launch_sharded_workers",
+    },
+)
@@ -1,13 +1,29 @@
-from flask import Flask, request, jsonify
+import atexit
+from flask import Flask, Response, request, jsonify
 from ..core.cognitive_core import CognitiveCore
+from ..core.session_manager import SessionManager
 from ..config.cognitive_core_config import CognitiveCoreConfig
 
+# 长轮询最长等待时间(秒)
+MAX_STATUS_WAIT = 30.0
 
-def create_cognitive_app(config: CognitiveCoreConfig = None):
-    """创建Flask应用"""
+
+def create_cognitive_app(
+    config: CognitiveCoreConfig = None, session_manager: SessionManager = None
+):
+    """
+    创建Flask应用
+    传入 session_manager 时按请求中的 session_id 托管多个会话
+    """
     app = Flask(__name__)
 
-    cognitive_core = CognitiveCore(config)
+    cognitive_core = CognitiveCore(config) if session_manager is None else None
+
+    # 进程退出时保存快照
+    if cognitive_core is not None and cognitive_core.snapshot_store is not None:
+        atexit.register(cognitive_core.shutdown)
+    elif session_manager is not None and session_manager.config.snapshot_path:
+        atexit.register(session_manager.shutdown, False)
 
     @app.route("/health", methods=["GET"])
     def health_check():
@@ -15,7 +31,28 @@ def create_cognitive_app(config: CognitiveCoreConfig = None):
 
     @app.route("/get-system-status", methods=["GET"])
     def get_system_status():
-        return jsonify({"success": True, "data": cognitive_core.get_system_status()})
+        # 传入上次拿到的 version 时等待下一个版本(长轮询)，timeout 为最长等待秒数
+        version = request.args.get("version", type=int)
+        timeout = min(
+            max(request.args.get("timeout", MAX_STATUS_WAIT, type=float), 0.0),
+            MAX_STATUS_WAIT,
+        )
+
+        if session_manager is not None:
+            snapshot = session_manager.get_status_snapshot(
+                request.args.get("session_id"), version, timeout
+            )
+            if snapshot is None:
+                return jsonify({"success": True, "data": {"status": "parked"}})
+        else:
+            snapshot = cognitive_core.get_status_snapshot(version, timeout)
+
+        # 快照已经预先序列化，直接拼接响应
+        return Response(
+            b'{"success":true,"version":%d,"data":%s}'
+            % (snapshot.version, snapshot.payload),
+            mimetype="application/json",
+        )
 
     @app.route("/receive-event", methods=["POST"])
     def receive_event():
@@ -29,6 +66,20 @@ def create_cognitive_app(config: CognitiveCoreConfig = None):
         if not type:
             return jsonify({"success": False, "error": "缺少type参数"})
 
+        if session_manager is not None:
+            session_id = data.get("session_id")
+            if not session_id:
+                return jsonify({"success": False, "error": "缺少session_id参数"})
+
+            if type == "wake_up":
+                session_manager.wake_up(session_id)
+            elif type == "sleep":
+                session_manager.sleep(session_id)
+            else:
+                session_manager.receive_event(session_id, data)
+
+            return jsonify({"success": True})
+
         if type == "wake_up":
             cognitive_core.wake_up()
         elif type == "sleep":
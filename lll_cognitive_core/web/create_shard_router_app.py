@@ -0,0 +1,226 @@
+import json
+import queue
+import socket
+import threading
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, request, jsonify
+
+from ..utils.consistent_hash_ring import ConsistentHashRing
+
+# 汇总状态时直接相加的字段
+_SUMMED_STATUS_FIELDS = (
+    "sessions",
+    "events_processed",
+    "queued_events",
+    "sessions_created",
+    "sessions_parked",
+)
+
+
+class WorkerConnectionPool:
+    """
+    到一个工作进程的长连接池
+    请求结束后连接放回池中复用，不必每次转发都重新建立 TCP 连接，空闲连接最多保留 max_idle 个
+    复用的空闲连接可能已被对端关闭，这时换新连接重试一次；超时不重试，避免重复投递事件
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10.0, max_idle: int = 32):
+        parsed = urllib.parse.urlsplit(base_url)
+        self._scheme = parsed.scheme or "http"
+        self._host = parsed.hostname or "127.0.0.1"
+        self._port = parsed.port
+        self._base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=max(1, max_idle))
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections": 0, "reconnects": 0}
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, bytes]:
+        """发送请求，返回 (状态码, 响应体)"""
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self.stats["requests"] += 1
+
+        try:
+            connection, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self._new_connection(), False
+
+        try:
+            result = self._send(connection, method, path, body, headers, timeout)
+        except socket.timeout:
+            connection.close()
+            raise
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            if not reused:
+                raise
+            with self._lock:
+                self.stats["reconnects"] += 1
+            connection = self._new_connection()
+            try:
+                result = self._send(connection, method, path, body, headers, timeout)
+            except Exception:
+                connection.close()
+                raise
+        except Exception:
+            connection.close()
+            raise
+
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "idle": self._idle.qsize()}
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        connection_class = (
+            http.client.HTTPSConnection
+            if self._scheme == "https"
+            else http.client.HTTPConnection
+        )
+        with self._lock:
+            self.stats["connections"] += 1
+        return connection_class(self._host, self._port, timeout=self.timeout)
+
+    def _send(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]],
+        timeout: float,
+    ) -> Tuple[int, bytes]:
+        # 长轮询的超时比普通请求长，每次请求按需要设置
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        connection.request(
+            method, self._base_path + path, body=body, headers=headers or {}
+        )
+        response = connection.getresponse()
+        return response.status, response.read()
+
+
+def create_shard_router_app(
+    worker_urls: List[str], timeout: float = 10.0, max_idle_connections: int = 32
+):
+    """
+    创建分片路由Flask应用
+    按 session_id 的一致性哈希把请求转发到对应的工作进程，系统状态汇总所有工作进程
+    每个工作进程一个长连接池，转发时复用连接
+    """
+    app = Flask(__name__)
+
+    ring = ConsistentHashRing(worker_urls)
+    pools = {
+        worker_url: WorkerConnectionPool(worker_url, timeout, max_idle_connections)
+        for worker_url in worker_urls
+    }
+    status_executor = ThreadPoolExecutor(
+        max_workers=max(1, len(worker_urls)), thread_name_prefix="shard-status"
+    )
+
+    def forward(
+        worker_url: str,
+        path: str,
+        method: str = "GET",
+        payload: Any = None,
+        wait: float = 0.0,
+    ):
+        body = None
+        headers = {}
+        if payload is not None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        return pools[worker_url].request(
+            method, path, body=body, headers=headers, timeout=timeout + wait
+        )
+
+    def fetch_status(worker_url: str) -> Dict[str, Any]:
+        try:
+            _, body = forward(worker_url, "/get-system-status")
+            return json.loads(body).get("data") or {}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @app.route("/health", methods=["GET"])
+    def health_check():
+        return jsonify({"success": True})
+
+    @app.route("/get-system-status", methods=["GET"])
+    def get_system_status():
+        session_id = request.args.get("session_id")
+        if session_id:
+            worker_url = ring.get_node(session_id)
+            # version/timeout 一起转发，长轮询时按等待时间延长转发超时
+            query = urllib.parse.urlencode(request.args)
+            wait = (
+                request.args.get("timeout", 30.0, type=float)
+                if "version" in request.args
+                else 0.0
+            )
+            try:
+                status, body = forward(
+                    worker_url, f"/get-system-status?{query}", wait=wait
+                )
+            except Exception as e:
+                return jsonify({"success": False, "error": f"转发失败: {e}"})
+            return Response(body, status=status, mimetype="application/json")
+
+        worker_status = list(status_executor.map(fetch_status, worker_urls))
+
+        aggregated: Dict[str, Any] = {field: 0 for field in _SUMMED_STATUS_FIELDS}
+        session_status: Dict[str, int] = {}
+        for data in worker_status:
+            for field in _SUMMED_STATUS_FIELDS:
+                aggregated[field] += data.get(field, 0) or 0
+            for status, count in (data.get("session_status") or {}).items():
+                session_status[status] = session_status.get(status, 0) + count
+
+        aggregated["session_status"] = session_status
+        aggregated["workers"] = dict(zip(worker_urls, worker_status))
+        aggregated["connections"] = {
+            worker_url: pool.get_stats() for worker_url, pool in pools.items()
+        }
+
+        return jsonify({"success": True, "data": aggregated})
+
+    @app.route("/receive-event", methods=["POST"])
+    def receive_event():
+        data = request.json
+
+        if not data:
+            return jsonify({"success": False, "error": "缺少参数"})
+
+        session_id = data.get("session_id")
+        if not session_id:
+            return jsonify({"success": False, "error": "缺少session_id参数"})
+
+        worker_url = ring.get_node(session_id)
+        try:
+            status, body = forward(worker_url, "/receive-event", "POST", data)
+        except Exception as e:
+            return jsonify({"success": False, "error": f"转发失败: {e}"})
+
+        return Response(body, status=status, mimetype="application/json")
+
+    return app
@@ -0,0 +1,69 @@
+import os
+import multiprocessing
+from typing import List, Optional, Tuple
+
+from ..config.cognitive_core_config import CognitiveCoreConfig
+from ..core.session_manager import PluginFactory, SessionManager
+from .create_cognitive_app import create_cognitive_app
+from .create_shard_router_app import create_shard_router_app
+
+
+def run_shard_worker(
+    host: str,
+    port: int,
+    config: CognitiveCoreConfig = None,
+    plugin_factory: Optional[PluginFactory] = None,
+    num_workers: int = 8,
+):
+    """工作进程入口，托管路由分配给本进程的会话"""
+    session_manager = SessionManager(config, plugin_factory, num_workers=num_workers)
+    app = create_cognitive_app(config, session_manager=session_manager)
+    app.run(host=host, port=port, threaded=True)
+
+
+def launch_sharded_workers(
+    num_processes: Optional[int] = None,
+    host: str = "127.0.0.1",
+    base_port: int = 5101,
+    router_port: int = 5100,
+    config: CognitiveCoreConfig = None,
+    plugin_factory: Optional[PluginFactory] = None,
+    num_workers: int = 8,
+    run_router: bool = True,
+) -> Tuple[List[multiprocessing.Process], List[str]]:
+    """
+    启动多进程分片
+    每个工作进程独立托管一部分会话，前端路由按会话ID的一致性哈希转发请求
+    plugin_factory 需要可以被 pickle(模块级函数)，以便传递给子进程
+    run_router 为 True 时在当前进程运行路由并阻塞，退出时结束所有工作进程
+    """
+    num_processes = num_processes or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+
+    processes: List[multiprocessing.Process] = []
+    worker_urls: List[str] = []
+    for i in range(num_processes):
+        port = base_port + i
+        process = context.Process(
+            target=run_shard_worker,
+            args=(host, port, config, plugin_factory, num_workers),
+            name=f"cognitive-shard-{i}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+        worker_urls.append(f"http://{host}:{port}")
+
+    if not run_router:
+        return processes, worker_urls
+
+    router = create_shard_router_app(worker_urls)
+    try:
+        router.run(host=host, port=router_port, threaded=True)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+    return processes, worker_urls
@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from lll_simple_ai_shared import (
+    BehaviorPlan,
+    EpisodicMemoriesModels,
+    RecallResultsModels,
+    UnderstoodData,
+)
+
+from lll_cognitive_core.core.data_structures import CognitiveEvent, UnderstandEventData
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def wait_until(predicate, timeout: float = 60.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+def make_memory(
+    index: int,
+    keywords: List[str] = None,
+    days: int = 0,
+    importance: int = 50,
+) -> EpisodicMemoriesModels:
+    return EpisodicMemoriesModels(
+        id=f"memory_{index}",
+        content=f"content {index}",
+        importance=importance,
+        keywords=keywords or [],
+        associations=[],
+        timestamp=BASE_TIME + timedelta(days=days),
+        entities=[],
+        source="test",
+    )
+
+
+def day(days: int) -> str:
+    return (BASE_TIME + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def make_event(index: int, content: str = None, entity: str = "user") -> CognitiveEvent:
+    """已经理解过的语音事件"""
+    content = content if content is not None else f"event {index}"
+    return CognitiveEvent(
+        event_id=f"event_{index}",
+        timestamp=BASE_TIME.timestamp() + index,
+        source=entity,
+        event_type="other",
+        modality_type="asr",
+        raw_data=UnderstandEventData(
+            type="asr", data=content, source=entity, timestamp=BASE_TIME
+        ),
+        understood_data=UnderstoodData(
+            response_priority="low",
+            main_content=content,
+            current_situation="test",
+            event_entity=entity,
+            memory_query_plan={"query_type": "none"},
+        ),
+        importance_score=0,
+    )
+
+
+def make_recent_memory(index: int, keywords: List[str], days_ago: int = 0):
+    memory = make_memory(index, keywords)
+    memory.timestamp = datetime.now() - timedelta(days=days_ago)
+    return memory
+
+
+class EchoUnderstanding:
+    """把事件内容原样作为理解结果的事件理解插件"""
+
+    def __init__(self, memory_query_plan=None):
+        self.memory_query_plan = memory_query_plan or {"query_type": "none"}
+        self.calls = 0
+
+    def understand_event(self, event_input):
+        self.calls += 1
+        return self.understood(event_input.understand_event.data)
+
+    def understood(self, data):
+        return UnderstoodData(
+            response_priority="high",
+            main_content=data,
+            current_situation="test",
+            event_entity="user",
+            importance_score=50,
+            memory_query_plan=self.memory_query_plan,
+        )
+
+
+class RecordingBehavior:
+    """记录每次行为生成收到的输入，不产生动作"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def generate_behavior(self, behavior_input):
+        self.inputs.append(behavior_input)
+        return BehaviorPlan(plan=[], current_situation="test")
+
+
+class CountingRecall:
+    """记录调用次数的联想回忆插件，情境保持不变"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def associative_recall(self, recall_input):
+        self.calls += 1
+        return RecallResultsModels(
+            recalled_episode=f"recalled {len(recall_input.episodic_memories)}",
+            current_situation=recall_input.current_situation,
+        )
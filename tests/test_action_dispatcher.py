@@ -0,0 +1,147 @@
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lll_cognitive_core.core.action_dispatcher import ActionDispatcher
+
+
+class StubOrchestrator:
+    """记录收到的批次，按 statuses 依次返回状态码，用完后返回 200"""
+
+    def __init__(self, statuses=(), max_delay=0.0):
+        self.batches = []
+        self.max_delay = max_delay
+        self.connections = set()
+        self.statuses = list(statuses)
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if stub.max_delay:
+                    time.sleep(random.uniform(0, stub.max_delay))
+                with stub.lock:
+                    stub.connections.add(self.client_address)
+                    status = stub.statuses.pop(0) if stub.statuses else 200
+                    if status < 300:
+                        stub.batches.append((self.path, body))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/api"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def orchestrator(request):
+    stub = StubOrchestrator(getattr(request, "param", ()))
+    yield stub
+    stub.close()
+
+
+def test_batches_actions_per_session_and_target(orchestrator):
+    dispatcher = ActionDispatcher(
+        orchestrator.url, num_workers=2, batch_size=8, batch_wait=0.05
+    )
+    for i in range(40):
+        assert dispatcher.dispatch(
+            f"s{i % 2}", {"type": "tts" if i % 4 < 2 else "motor", "index": i}
+        )
+    dispatcher.shutdown(wait=True, timeout=10)
+
+    stats = dispatcher.get_stats()
+    assert stats["sent_actions"] == 40
+    assert stats["failed_actions"] == 0
+    # 合并成批发送，长连接复用
+    assert stats["sent_batches"] < 40
+    assert len(orchestrator.connections) <= 2
+
+    received = []
+    for path, body in orchestrator.batches:
+        assert path == "/api/actions"
+        for action in body["actions"]:
+            assert body["target"] == action["type"]
+            assert body["session_id"] == f"s{action['index'] % 2}"
+            received.append(action["index"])
+    assert sorted(received) == list(range(40))
+
+
+def test_keeps_per_session_order_with_multiple_workers():
+    # 服务端随机延迟，共享队列时同一会话的批次会被不同线程并发发送而乱序
+    stub = StubOrchestrator(max_delay=0.01)
+    dispatcher = ActionDispatcher(stub.url, num_workers=4, batch_size=1)
+    for i in range(120):
+        assert dispatcher.dispatch(f"s{i % 6}", {"type": "tts", "index": i})
+    dispatcher.shutdown(wait=True, timeout=20)
+    stub.close()
+
+    assert dispatcher.get_stats()["sent_actions"] == 120
+    received = {}
+    for _, body in stub.batches:
+        for action in body["actions"]:
+            received.setdefault(body["session_id"], []).append(action["index"])
+    assert len(received) == 6
+    for session_id, indexes in received.items():
+        assert indexes == sorted(indexes), session_id
+        assert len(indexes) == 20
+
+
+@pytest.mark.parametrize("orchestrator", [(503, 502)], indirect=True)
+def test_retries_retryable_status(orchestrator):
+    dispatcher = ActionDispatcher(orchestrator.url, num_workers=1, retry_backoff=0.01)
+    dispatcher.dispatch("s", {"type": "tts", "index": 0})
+    dispatcher.shutdown(wait=True, timeout=10)
+
+    stats = dispatcher.get_stats()
+    assert stats["retries"] == 2
+    assert stats["sent_actions"] == 1
+    assert len(orchestrator.batches) == 1
+
+
+@pytest.mark.parametrize("orchestrator", [(400,)], indirect=True)
+def test_gives_up_on_client_error(orchestrator):
+    dispatcher = ActionDispatcher(orchestrator.url, num_workers=1, retry_backoff=0.01)
+    dispatcher.dispatch("s", {"type": "tts", "index": 0})
+    dispatcher.shutdown(wait=True, timeout=10)
+
+    stats = dispatcher.get_stats()
+    assert stats["retries"] == 0
+    assert stats["failed_actions"] == 1
+    assert orchestrator.batches == []
+
+
+def test_reconnects_when_server_is_unreachable():
+    stub = StubOrchestrator()
+    url = stub.url
+    stub.close()
+
+    dispatcher = ActionDispatcher(
+        url, num_workers=1, max_retries=1, retry_backoff=0.01, timeout=1
+    )
+    dispatcher.dispatch("s", {"type": "tts", "index": 0})
+    dispatcher.shutdown(wait=True, timeout=10)
+
+    stats = dispatcher.get_stats()
+    assert stats["reconnects"] == 2
+    assert stats["failed_actions"] == 1
@@ -0,0 +1,63 @@
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import CoreStatus
+
+from .helpers import EchoUnderstanding, RecordingBehavior
+
+
+class BatchEchoUnderstanding(EchoUnderstanding):
+    """支持批量理解的插件，drop 个结果会从批量结果的开头丢掉"""
+
+    def __init__(self, drop: int = 0):
+        super().__init__()
+        self.drop = drop
+        self.batch_calls = 0
+
+    def understand_events(self, events_input):
+        self.batch_calls += 1
+        results = [
+            self.understood(event.data) for event in events_input.understand_events
+        ]
+        return results[self.drop :]
+
+
+def process_backlog(plugin, count: int = 6) -> CognitiveCore:
+    core = CognitiveCore(
+        CognitiveCoreConfig(
+            batch_understanding_threshold=4, batch_understanding_size=count
+        )
+    )
+    core.register_plugin("event_understanding", plugin)
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    core.status = CoreStatus.AWARE
+    for i in range(count):
+        core.receive_event({"type": "user", "data": f"event {i}"})
+    core._process_events()
+    return core
+
+
+def contents(core: CognitiveCore):
+    return [
+        event.get_understood("main_content")
+        for event in core.working_memory.recent_events
+    ]
+
+
+def test_backlog_is_understood_in_one_call():
+    plugin = BatchEchoUnderstanding()
+    core = process_backlog(plugin)
+
+    assert plugin.batch_calls == 1
+    assert plugin.calls == 0
+    assert contents(core) == [f"event {i}" for i in range(6)]
+
+
+def test_mismatched_batch_falls_back_to_single_understanding():
+    # 少了第一个结果，按位置对应会把每个结果都套到错误的事件上
+    plugin = BatchEchoUnderstanding(drop=1)
+    core = process_backlog(plugin)
+
+    assert plugin.batch_calls == 1
+    assert plugin.calls == 6
+    assert core.stats["batched_understanding_mismatches"] == 1
+    assert contents(core) == [f"event {i}" for i in range(6)]
@@ -0,0 +1,117 @@
+from lll_cognitive_core.core.cache_memory_manager import CacheMemoryManager
+from lll_cognitive_core.core.keyword_dictionary import KeywordDictionary
+from lll_cognitive_core.core.posting_list import PostingList
+
+from .helpers import day, make_memory
+
+SCALE = 100_000
+DAYS = 365
+
+
+def build_memories(count: int):
+    return [
+        make_memory(i, [f"kw{i % 1000}", f"group{i % 7}"], days=i % DAYS)
+        for i in range(count)
+    ]
+
+
+def build_manager(memories) -> CacheMemoryManager:
+    # 只做精确匹配，便于和暴力结果对比
+    manager = CacheMemoryManager(
+        max_count=0,
+        max_bytes=0,
+        keyword_dictionary=KeywordDictionary(prefix_min_length=0, fuzzy_max_edits=0),
+    )
+    manager.save_episodic_memories(memories)
+    return manager
+
+
+def test_posting_list_keeps_insertion_order():
+    posting_list = PostingList(["b", "a", "b"])
+    posting_list.add("c")
+    posting_list.discard("a")
+    assert posting_list.to_list() == ["b", "c"]
+    assert "c" in posting_list and "a" not in posting_list
+
+    assert PostingList.union(["x", "y"], ["y", "z"]).to_list() == ["x", "y", "z"]
+    assert PostingList.intersection(
+        PostingList(["x", "y", "z"]), PostingList(["z", "y"])
+    ).to_list() == ["z", "y"]
+
+
+def test_query_matches_brute_force_at_scale():
+    memories = build_memories(SCALE)
+    manager = build_manager(memories)
+    assert len(manager.episodic_memory.episodic_memories) == SCALE
+
+    keywords = ["kw1", "kw2", "kw3"]
+    results = manager.query_episodic_memories([day(10), day(12)], keywords=keywords)
+
+    expected = {
+        memory.id
+        for memory in memories
+        if 10 <= memory.timestamp.toordinal() - memories[0].timestamp.toordinal() <= 12
+        or set(memory.keywords) & set(keywords)
+    }
+    ids = [memory.id for memory in results]
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
+
+
+def test_budget_eviction_removes_lowest_scores_down_to_low_water():
+    manager = CacheMemoryManager(max_count=10, low_water_ratio=0.5)
+    manager.save_episodic_memories(
+        [make_memory(i, [f"kw{i}"], importance=i * 10) for i in range(10)]
+    )
+    assert manager.get_cache_stats()["evictions"] == 0
+
+    # 超出上限后淘汰重要性最低的记忆，直到数量不超过低水位
+    manager.save_episodic_memories([make_memory(10, ["kw10"], importance=100)])
+    assert set(manager.episodic_memory.episodic_memories) == {
+        f"memory_{i}" for i in (6, 7, 8, 9, 10)
+    }
+    stats = manager.get_cache_stats()
+    assert stats["evictions"] == 6
+    assert stats["eviction_runs"] == 1
+
+
+def test_evict_removes_index_entries():
+    manager = build_manager([make_memory(i, ["shared"], days=0) for i in range(10)])
+    manager.evict("memory_3")
+
+    results = manager.query_episodic_memories([day(100), day(100)], keywords=["shared"])
+    assert "memory_3" not in {memory.id for memory in results}
+    assert len(results) == 9
+
+
+class CountingDict(dict):
+    """统计 get 调用次数，即查询实际读取的候选记录数"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.gets = 0
+
+    def get(self, *args):
+        self.gets += 1
+        return super().get(*args)
+
+
+def test_index_size_and_query_work_scale_with_hits():
+    memories = build_memories(SCALE)
+    manager = build_manager(memories)
+    time_index = manager.episodic_memory.time_index
+    keyword_index = manager.episodic_memory.keyword_index
+
+    # 每条记忆在时间索引中出现一次，在每个关键词的记录表中各出现一次
+    assert sum(len(ids) for ids in time_index.values()) == SCALE
+    assert sum(len(ids) for ids in keyword_index.values()) == SCALE * 2
+    assert len(time_index) == DAYS
+
+    # 关键词直接查表，查询只读取命中的记录，与缓存总量无关
+    counting = CountingDict(manager.episodic_memory.episodic_memories)
+    manager.episodic_memory.episodic_memories = counting
+    results = manager.query_episodic_memories(
+        [day(400), day(400)], keywords=["kw1", "missing"]
+    )
+    assert len(results) == SCALE // 1000
+    assert counting.gets == SCALE // 1000
@@ -0,0 +1,135 @@
+from datetime import datetime
+
+from lll_simple_ai_shared import UnderstoodData
+
+from lll_cognitive_core.core.data_structures import (
+    UnderstandEventData,
+    UnderstandEventInput,
+    UnderstandEventsInput,
+)
+from lll_cognitive_core.core.understanding_classifier import UnderstandingClassifier
+from lll_cognitive_core.plugins.cognitive_core_plugin_cascading_event_understanding import (
+    CognitiveCorePluginCascadingEventUnderstanding,
+)
+
+from .helpers import EchoUnderstanding
+
+TRAINING = [
+    ("door opened front", "object_detected", "medium", "door", 60),
+    ("door opened back", "object_detected", "medium", "door", 60),
+    ("temperature reading normal", "other", "low", "thermostat", 10),
+    ("temperature reading stable", "other", "low", "thermostat", 10),
+]
+
+
+def make_event(data: str, type: str = "sensor") -> UnderstandEventData:
+    return UnderstandEventData(
+        type=type, data=data, source="test", timestamp=datetime.now()
+    )
+
+
+def make_input(data: str, type: str = "sensor") -> UnderstandEventInput:
+    return UnderstandEventInput(
+        understand_event=make_event(data, type), recent_events=[], active_goals=[]
+    )
+
+
+def fitted_classifier() -> UnderstandingClassifier:
+    classifier = UnderstandingClassifier(dim=64)
+    for _ in range(5):
+        for data, event_type, priority, entity, importance in TRAINING:
+            classifier.add_sample(
+                make_event(data),
+                UnderstoodData(
+                    event_type=event_type,
+                    response_priority=priority,
+                    main_content=data,
+                    current_situation="",
+                    event_entity=entity,
+                    key_entities=[],
+                    importance_score=importance,
+                    memory_query_plan={"query_type": "none"},
+                ),
+            )
+    assert classifier.fit()
+    return classifier
+
+
+def make_plugin():
+    fallback = EchoUnderstanding()
+    plugin = CognitiveCorePluginCascadingEventUnderstanding(
+        fallback,
+        classifier=fitted_classifier(),
+        confidence_threshold=0.8,
+        # 不在测试中触发后台训练
+        min_training_samples=10_000,
+    )
+    return plugin, fallback
+
+
+def test_rule_handles_heartbeat_without_llm():
+    plugin, fallback = make_plugin()
+    result = plugin.understand_event(make_input("heartbeat", type="system"))
+
+    assert result.event_entity == "system"
+    assert fallback.calls == 0
+
+
+def test_confident_classifier_hit_skips_llm():
+    plugin, fallback = make_plugin()
+    prediction = plugin.classifier.predict(make_event("door opened front"))
+    assert prediction[1] >= 0.8
+
+    result = plugin.understand_event(make_input("door opened front"))
+    assert result.event_type == "object_detected"
+    assert result.event_entity == "door"
+    assert result.importance_score == 60
+    assert result.main_content == "door opened front"
+    assert fallback.calls == 0
+
+
+def test_low_confidence_falls_through_to_llm():
+    plugin, fallback = make_plugin()
+    _, confidence = plugin.classifier.predict(make_event("unfamiliar words"))
+    assert confidence < 0.8
+
+    result = plugin.understand_event(make_input("unfamiliar words"))
+    assert fallback.calls == 1
+    assert result.event_entity == "user"
+    # 大模型的结果记录为分类器的训练样本
+    assert plugin.classifier.num_samples == len(TRAINING) * 5 + 1
+
+
+def test_modalities_outside_local_list_go_to_llm():
+    plugin, fallback = make_plugin()
+    plugin.understand_event(make_input("door opened front", type="user"))
+    assert fallback.calls == 1
+
+
+def test_stats_per_modality():
+    plugin, _ = make_plugin()
+    plugin.understand_event(make_input("heartbeat", type="system"))
+    plugin.understand_event(make_input("door opened front"))
+    plugin.understand_event(make_input("temperature reading normal"))
+    plugin.understand_event(make_input("unfamiliar words"))
+    plugin.understand_events(
+        UnderstandEventsInput(
+            understand_events=[
+                make_event("door opened back"),
+                make_event("hi", "user"),
+            ],
+            recent_events=[],
+            active_goals=[],
+        )
+    )
+
+    stats = plugin.get_stats()["cascade"]
+    assert stats["system"]["events"] == 1
+    assert stats["system"]["rule"] == 1
+    assert stats["sensor"]["events"] == 4
+    assert stats["sensor"]["classifier"] == 3
+    assert stats["sensor"]["llm"] == 1
+    assert stats["sensor"]["local_hit_rate"] == 0.75
+    assert stats["user"]["llm"] == 1
+    assert stats["user"]["local_hit_rate"] == 0.0
+    assert plugin.get_stats()["classifier_trained"]
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from pydantic import BaseModel, TypeAdapter
+from lll_simple_ai_shared import UnderstoodData
+from lll_simple_ai_shared.utils.extract import safe_event_to_string
+
+from lll_cognitive_core.core.data_structures import (
+    CognitiveEvent,
+    ExtractMemoriesInput,
+    UnderstandEventData,
+    _PackedModel,
+)
+
+from .helpers import BASE_TIME, EchoUnderstanding
+
+
+@dataclass
+class LegacyCognitiveEvent:
+    """改为紧凑存储之前的事件结构，用来核对序列化结果"""
+
+    event_id: str
+    timestamp: float
+    source: str
+    event_type: str
+    modality_type: str
+    raw_data: UnderstandEventData
+    understood_data: UnderstoodData
+    importance_score: float
+
+
+class Point(BaseModel):
+    x: int
+    y: int
+
+
+class Shape(BaseModel):
+    name: str
+    corners: Tuple[Point, ...]
+    bounds: Tuple[int, int]
+    tags: list
+    parent: Optional["Shape"] = None
+
+
+def make_understood(content: str = "hello") -> UnderstoodData:
+    return UnderstoodData(
+        event_type="user_command",
+        response_priority="high",
+        main_content=content,
+        current_situation="test",
+        event_entity="user",
+        key_entities=["lamp", "kitchen"],
+        importance_score=70,
+        memory_query_plan={
+            "query_type": "long_term_cached",
+            "query_triggers": ["lamp"],
+            "time_range": [0, 7],
+        },
+    )
+
+
+def make_raw(content: str = "hello") -> UnderstandEventData:
+    return UnderstandEventData(
+        type="asr", data=content, source="user", timestamp=BASE_TIME, sequence=3
+    )
+
+
+def make_event(content: str = "hello") -> CognitiveEvent:
+    understood = make_understood(content)
+    return CognitiveEvent(
+        event_id="event_1",
+        timestamp=1700000000.5,
+        source="user",
+        event_type=understood.event_type,
+        modality_type="asr",
+        raw_data=make_raw(content),
+        understood_data=understood,
+        importance_score=understood.importance_score,
+    )
+
+
+def test_packed_model_round_trip():
+    shape = Shape(
+        name="square",
+        corners=(Point(x=0, y=0), Point(x=1, y=1)),
+        bounds=(2, 3),
+        tags=["a", ["b", Point(x=5, y=6)]],
+        parent=Shape(name="root", corners=(), bounds=(0, 0), tags=[]),
+    )
+
+    unpacked = _PackedModel(shape).unpack()
+
+    assert unpacked == shape
+    assert unpacked.model_fields_set == shape.model_fields_set
+    # 元组和列表分别还原成原来的类型
+    assert type(unpacked.corners) is tuple
+    assert type(unpacked.bounds) is tuple
+    assert type(unpacked.tags) is list
+    assert type(unpacked.tags[1]) is list
+    assert unpacked.tags[1][1] == Point(x=5, y=6)
+
+
+def test_event_views_match_the_original_models():
+    event = make_event()
+
+    assert event.understood_data == make_understood()
+    assert event.raw_data == make_raw()
+    assert event.get_understood("main_content") == "hello"
+    assert event.get_understood("key_entities") == ["lamp", "kitchen"]
+    assert event.get_understood("memory_query_plan").query_triggers == ["lamp"]
+    assert event.get_understood("missing", "default") == "default"
+
+
+def test_prompt_fragment_matches_full_event_string():
+    event = make_event()
+
+    expected = safe_event_to_string(event.to_dict())
+    assert event.prompt_fragment() == expected
+    assert event.prompt_fragment(with_id=True) == f"ID: event_1 | {expected}"
+
+    event.understood_data = make_understood("changed")
+    assert "changed" in event.prompt_fragment()
+
+
+def test_serialization_matches_previous_schema():
+    event = make_event()
+    legacy = LegacyCognitiveEvent(
+        event_id="event_1",
+        timestamp=1700000000.5,
+        source="user",
+        event_type="user_command",
+        modality_type="asr",
+        raw_data=make_raw(),
+        understood_data=make_understood(),
+        importance_score=70,
+    )
+    expected = TypeAdapter(LegacyCognitiveEvent).dump_python(legacy, mode="json")
+
+    assert event.to_dict() == expected
+    dumped = ExtractMemoriesInput(
+        current_situation="test", recent_events=[event], active_goals=[]
+    ).model_dump(mode="json")
+    assert dumped["recent_events"] == [expected]
+
+
+def test_events_share_interned_strings():
+    first = make_event("first")
+    second = make_event("second")
+    second.understood_data = EchoUnderstanding().understood("second")
+
+    assert first.source is second.source
+    assert first.get_understood("response_priority") is second.get_understood(
+        "response_priority"
+    )
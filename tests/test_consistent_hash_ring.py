@@ -0,0 +1,60 @@
+import pytest
+
+from lll_cognitive_core.utils.consistent_hash_ring import ConsistentHashRing
+
+NODES = [f"http://127.0.0.1:{5101 + i}" for i in range(4)]
+KEYS = [f"session_{i}" for i in range(2000)]
+
+
+def assignment(ring: ConsistentHashRing):
+    return {key: ring.get_node(key) for key in KEYS}
+
+
+def test_assignment_is_stable():
+    ring = ConsistentHashRing(NODES)
+    assert assignment(ring) == assignment(ring)
+    # 与节点加入顺序无关，其他进程建立的环结果相同
+    assert assignment(ConsistentHashRing(reversed(NODES))) == assignment(ring)
+
+
+def test_keys_spread_over_all_nodes():
+    counts = {}
+    for node in assignment(ConsistentHashRing(NODES)).values():
+        counts[node] = counts.get(node, 0) + 1
+
+    assert set(counts) == set(NODES)
+    assert min(counts.values()) > len(KEYS) / len(NODES) / 2
+
+
+def test_adding_node_only_moves_keys_to_new_node():
+    ring = ConsistentHashRing(NODES)
+    before = assignment(ring)
+    new_node = "http://127.0.0.1:5105"
+    ring.add_node(new_node)
+    after = assignment(ring)
+
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == new_node for key in moved)
+    # 大约 1/5 的键迁移到新节点
+    assert 0.1 < len(moved) / len(KEYS) < 0.3
+
+
+def test_removing_node_only_moves_its_keys():
+    ring = ConsistentHashRing(NODES)
+    before = assignment(ring)
+    ring.remove_node(NODES[0])
+    after = assignment(ring)
+
+    for key in KEYS:
+        if before[key] == NODES[0]:
+            assert after[key] != NODES[0]
+        else:
+            assert after[key] == before[key]
+
+    ring.add_node(NODES[0])
+    assert assignment(ring) == before
+
+
+def test_empty_ring_raises():
+    with pytest.raises(ValueError):
+        ConsistentHashRing().get_node("session")
@@ -0,0 +1,207 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.consolidation_scheduler import ConsolidationScheduler
+from lll_cognitive_core.core.data_structures import CoreStatus
+from lll_cognitive_core.core.fair_worker_pool import FairWorkerPool
+
+from .helpers import EchoUnderstanding, RecordingBehavior, wait_until
+
+
+def make_scheduler(**thresholds) -> ConsolidationScheduler:
+    return ConsolidationScheduler(
+        **{
+            "event_count_threshold": 0,
+            "cognitive_load_threshold": 0.0,
+            "interval_seconds": 0.0,
+            **thresholds,
+        }
+    )
+
+
+def test_no_trigger_without_new_events():
+    scheduler = make_scheduler(
+        event_count_threshold=1, cognitive_load_threshold=0.1, interval_seconds=1
+    )
+    assert scheduler.check_trigger(1.0, now=time.time() + 60) is None
+
+
+def test_event_count_trigger():
+    scheduler = make_scheduler(event_count_threshold=5)
+    scheduler.record_events(4)
+    assert scheduler.check_trigger(0.0) is None
+    scheduler.record_events(1)
+    assert scheduler.check_trigger(0.0) == "event_count"
+
+
+def test_cognitive_load_trigger():
+    scheduler = make_scheduler(cognitive_load_threshold=0.8, load_min_events=1)
+    scheduler.record_events(1)
+    assert scheduler.check_trigger(0.5) is None
+    assert scheduler.check_trigger(0.8) == "cognitive_load"
+
+
+def test_cognitive_load_trigger_needs_new_events():
+    scheduler = make_scheduler(cognitive_load_threshold=0.8, load_min_events=5)
+    scheduler.record_events(4)
+    # 整理后负荷仍然很高，新事件不够时不再触发
+    assert scheduler.check_trigger(1.0) is None
+    scheduler.record_events(1)
+    assert scheduler.check_trigger(1.0) == "cognitive_load"
+
+
+def test_interval_trigger():
+    scheduler = make_scheduler(interval_seconds=60)
+    assert scheduler.next_due_time() is None
+    scheduler.record_events(1)
+    assert scheduler.check_trigger(0.0) is None
+    assert scheduler.check_trigger(0.0, now=time.time() + 61) == "interval"
+    assert scheduler.next_due_time() == pytest.approx(time.time() + 60, abs=1)
+
+    scheduler.skip()
+    assert scheduler.next_due_time() is None
+
+
+def test_jobs_run_on_the_given_executor():
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared")
+    threads = []
+    scheduler = make_scheduler(run_job=executor.submit)
+
+    assert scheduler.submit(lambda: threads.append(threading.current_thread().name))
+    scheduler.join(5)
+    assert threads == ["shared_0"]
+    assert scheduler.get_stats()["runs"] == 1
+    executor.shutdown()
+
+
+def test_only_one_job_runs_at_a_time():
+    scheduler = make_scheduler(event_count_threshold=1)
+    release = threading.Event()
+    scheduler.record_events(1)
+
+    assert scheduler.submit(release.wait, scheduler.check_trigger(0.0))
+    scheduler.record_events(1)
+    # 运行期间不再触发，也不能再提交
+    assert scheduler.check_trigger(0.0) is None
+    assert not scheduler.submit(lambda: None)
+
+    release.set()
+    scheduler.join(5)
+    stats = scheduler.get_stats()
+    assert stats["runs"] == 1
+    assert stats["last_trigger"] == "event_count"
+    assert stats["events_since_last_run"] == 1
+
+
+class BlockingExtraction:
+    """阻塞到 release 后才返回，记录每次提取收到的事件内容"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+        self.extracted = []
+
+    def extract_memories(self, extraction_input):
+        self.calls += 1
+        self.extracted.append(
+            [
+                event.get_understood("main_content")
+                for event in extraction_input.recent_events
+            ]
+        )
+        self.release.wait(5)
+        return []
+
+
+def make_core(extraction, worker_pool=None, **config) -> CognitiveCore:
+    core = CognitiveCore(
+        CognitiveCoreConfig(batch_understanding_threshold=0, **config),
+        worker_pool=worker_pool,
+    )
+    core.register_plugin("event_understanding", EchoUnderstanding())
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    core.register_plugin("memory_extraction", extraction)
+    return core
+
+
+def receive(core: CognitiveCore, start: int, count: int):
+    for i in range(start, start + count):
+        core.receive_event({"type": "user", "data": f"event {i}"})
+    while not core.event_queue.empty():
+        core._run_loop_iteration()
+
+
+def contents(core: CognitiveCore):
+    return [
+        event.get_understood("main_content")
+        for event in core.working_memory.recent_events
+    ]
+
+
+def test_light_consolidation_does_not_block_event_processing():
+    extraction = BlockingExtraction()
+    core = make_core(extraction, light_consolidation_event_count=30)
+    core.status = CoreStatus.AWARE
+
+    receive(core, 0, 30)
+    assert core.consolidation_scheduler.is_running()
+
+    # 整理进行中新事件照常处理
+    receive(core, 30, 10)
+    assert len(core.working_memory.recent_events) == 40
+    assert core.consolidation_scheduler.is_running()
+
+    extraction.release.set()
+    core.consolidation_scheduler.join(5)
+    assert extraction.calls == 1
+    core._update_system_state()
+    # 只移除已整理的旧事件，整理期间到达的事件全部保留
+    assert contents(core) == [f"event {i}" for i in range(15, 40)]
+    assert core.working_memory.extracted_count == 15
+    assert core.stats["memory_consolidations"] == 1
+
+
+def test_light_consolidation_extracts_only_new_events():
+    extraction = BlockingExtraction()
+    extraction.release.set()
+    core = make_core(extraction, light_consolidation_event_count=10)
+    core.status = CoreStatus.AWARE
+
+    receive(core, 0, 10)
+    core.consolidation_scheduler.join(5)
+    receive(core, 10, 10)
+    core.consolidation_scheduler.join(5)
+    core._update_system_state()
+
+    # 第二次整理只提取上次之后的事件，保留的已提取事件不会再次提取
+    assert extraction.extracted == [
+        [f"event {i}" for i in range(0, 10)],
+        [f"event {i}" for i in range(10, 20)],
+    ]
+    assert core.working_memory.extracted_count == 20
+
+    # 深度整理也跳过已提取的事件
+    receive(core, 20, 3)
+    core._consolidate_memories("deep")
+    assert extraction.extracted[-1] == ["event 20", "event 21", "event 22"]
+
+
+def test_interval_trigger_fires_for_idle_pooled_session():
+    pool = FairWorkerPool(num_workers=2)
+    extraction = BlockingExtraction()
+    extraction.release.set()
+    core = make_core(extraction, worker_pool=pool, light_consolidation_interval=0.2)
+    core.wake_up()
+
+    # 之后没有新事件，由定时迭代在间隔到期后触发整理并应用结果
+    for i in range(3):
+        core.receive_event({"type": "user", "data": f"event {i}"})
+    assert wait_until(lambda: core.stats["memory_consolidations"] == 1, timeout=5)
+    assert extraction.extracted == [["event 0", "event 1", "event 2"]]
+    assert core.consolidation_scheduler.get_stats()["last_trigger"] == "interval"
+    pool.shutdown()
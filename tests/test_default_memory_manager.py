@@ -0,0 +1,83 @@
+import os
+import threading
+
+from lll_cognitive_core.plugins.cognitive_core_plugin_default_memory_manager import (
+    EMBEDDING_DELTA_COMPACT_COUNT,
+    CognitiveCorePluginDefaultMemoryManager,
+)
+
+from .helpers import day, make_memory
+
+
+def test_keyword_query_survives_reload(tmp_path):
+    manager = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    manager.save_episodic_memories(
+        [make_memory(1, ["Python"]), make_memory(2, ["weather"], days=1)]
+    )
+
+    reloaded = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    results = reloaded.query_episodic_memories([day(0), day(1)], keywords=["python"])
+    assert [memory.id for memory in results] == ["memory_1"]
+
+
+def test_concurrent_save_and_query(tmp_path):
+    manager = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    manager.save_episodic_memories([make_memory(0, ["shared"])])
+
+    stop = threading.Event()
+    empty_results = []
+
+    def query():
+        while not stop.is_set():
+            for mode in ("keyword", "semantic"):
+                results = manager.query_episodic_memories(
+                    [day(0), day(0)], keywords=["shared"], mode=mode
+                )
+                if not results:
+                    empty_results.append(mode)
+
+    readers = [threading.Thread(target=query) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    try:
+        for batch in range(20):
+            manager.save_episodic_memories(
+                [
+                    make_memory(batch * 10 + i + 1, ["shared", f"kw{batch}_{i}"])
+                    for i in range(10)
+                ]
+            )
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    # 查询出错时会被吞掉返回空列表
+    assert empty_results == []
+    assert (
+        len(manager.query_episodic_memories([day(0), day(0)], keywords=["shared"]))
+        == 201
+    )
+
+
+def test_embedding_index_is_saved_incrementally(tmp_path):
+    manager = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    index_dir = os.path.join(str(tmp_path), "index")
+    full_path = os.path.join(index_dir, "embedding_index.npz")
+
+    for i in range(EMBEDDING_DELTA_COMPACT_COUNT):
+        manager.save_episodic_memories([make_memory(i, [f"kw{i}"])])
+    # 每次保存只写入一个增量文件，不重写完整文件
+    assert not os.path.exists(full_path)
+    assert len(manager.list_embedding_deltas()) == EMBEDDING_DELTA_COMPACT_COUNT
+
+    reloaded = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    assert len(reloaded.load_embedding_index()) == EMBEDDING_DELTA_COMPACT_COUNT
+
+    # 增量文件达到上限后合并为完整文件
+    manager.save_episodic_memories([make_memory(1000, ["last"])])
+    assert os.path.exists(full_path)
+    assert manager.list_embedding_deltas() == []
+
+    reloaded = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    assert len(reloaded.load_embedding_index()) == EMBEDDING_DELTA_COMPACT_COUNT + 1
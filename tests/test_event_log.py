@@ -0,0 +1,155 @@
+import threading
+
+import pytest
+from lll_simple_ai_shared import BehaviorPlan
+from lll_simple_ai_shared.data_models.behavior_models import TTSAction
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import CoreStatus
+from lll_cognitive_core.core.event_log import EventLog
+
+from .helpers import EchoUnderstanding
+
+
+class SpeakingBehavior:
+    """每个事件回应一句话"""
+
+    def generate_behavior(self, behavior_input):
+        return BehaviorPlan(
+            plan=[TTSAction(action="speak", data="ok")], current_situation="test"
+        )
+
+
+class FailingFile:
+    """写入时抛出 OSError 的文件，partial 为 True 时先写入一半数据"""
+
+    def __init__(self, file, partial: bool = False):
+        self._file = file
+        self.partial = partial
+
+    def write(self, data):
+        if self.partial:
+            self._file.write(data[: len(data) // 2])
+            self._file.flush()
+        raise OSError("disk full")
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+def test_event_ids_are_unique_with_event_log(tmp_path):
+    core = CognitiveCore(
+        CognitiveCoreConfig(
+            batch_understanding_threshold=0,
+            event_log_path=str(tmp_path / "{session_id}.log"),
+        )
+    )
+    core.register_plugin("event_understanding", EchoUnderstanding())
+    core.register_plugin("behavior_generation", SpeakingBehavior())
+    core.status = CoreStatus.AWARE
+
+    for i in range(400):
+        core.receive_event({"type": "user", "data": f"event {i}"})
+        core._process_events()
+    core.shutdown()
+
+    event_ids = [event.event_id for event in core.working_memory.recent_events]
+    # 400 个接收的事件加上 400 个行为
+    assert len(event_ids) == 800
+    assert len(set(event_ids)) == 800
+
+
+def test_sync_append_raises_when_write_fails(tmp_path):
+    log = EventLog(str(tmp_path / "events.log"))
+    first = log.append({"type": "user", "data": "ok"})
+
+    log._file = FailingFile(log._file)
+    with pytest.raises(OSError):
+        log.append({"type": "user", "data": "lost"})
+    stats = log.get_stats()
+    assert stats["write_errors"] == 1
+    assert stats["committed_records"] == 1
+
+    # 写入失败后重新打开文件继续写入；写入失败的记录计入水位，不会让水位停住
+    last = log.append({"type": "user", "data": "ok again"})
+    log.mark_processed(first)
+    log.mark_processed(last)
+    assert log.get_stats()["processed_seq"] == last
+    log.close()
+
+    reopened = EventLog(str(tmp_path / "events.log"))
+    assert reopened.take_unprocessed() == []
+    reopened.close()
+
+
+def test_partial_write_is_truncated(tmp_path):
+    path = tmp_path / "events.log"
+    log = EventLog(str(path))
+    log.append({"type": "user", "data": "first"})
+    size = path.stat().st_size
+
+    log._file = FailingFile(log._file, partial=True)
+    with pytest.raises(OSError):
+        log.append({"type": "user", "data": "x" * 100})
+    # 部分写入的字节被截断
+    assert path.stat().st_size == size
+
+    # 失败后第一条成功提交的记录完整保留，重启后可以重放
+    second = log.append({"type": "user", "data": "second"})
+    third = log.append({"type": "user", "data": "third"})
+    log.close()
+
+    reopened = EventLog(str(path))
+    records = reopened.take_unprocessed()
+    reopened.close()
+    assert [record["data"] for record in records] == ["first", "second", "third"]
+    assert [record["seq"] for record in records][1:] == [second, third]
+
+
+def test_partial_line_is_terminated_when_truncate_fails(tmp_path, monkeypatch):
+    path = tmp_path / "events.log"
+    log = EventLog(str(path))
+
+    def fail_truncate(*args):
+        raise OSError("read-only")
+
+    monkeypatch.setattr("os.truncate", fail_truncate)
+    log._file = FailingFile(log._file, partial=True)
+    with pytest.raises(OSError):
+        log.append({"type": "user", "data": "x" * 100})
+
+    # 不能截断时下一次提交先换行，半行不会吞掉新记录
+    log.append({"type": "user", "data": "kept"})
+    log.close()
+
+    reopened = EventLog(str(path))
+    records = reopened.take_unprocessed()
+    reopened.close()
+    assert [record["data"] for record in records] == ["kept"]
+
+
+def test_group_commit_batches_concurrent_appends(tmp_path):
+    log = EventLog(str(tmp_path / "events.log"))
+    threads_count, per_thread = 8, 250
+
+    def append_many(index):
+        for i in range(per_thread):
+            log.append({"type": "user", "data": f"{index}-{i}", "timestamp": 0})
+
+    threads = [
+        threading.Thread(target=append_many, args=(index,))
+        for index in range(threads_count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+
+    stats = log.get_stats()
+    total = threads_count * per_thread
+    assert stats["committed_records"] == total
+    # 并发写入时多条记录合并成一次 fsync
+    assert stats["commits"] < total
+    assert stats["average_commit_size"] > 1
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+from lll_simple_ai_shared import EpisodicMemoriesGenerateModels, UnderstoodData
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import (
+    CognitiveEvent,
+    ExtractMemoriesInput,
+    UnderstandEventData,
+)
+from lll_cognitive_core.core.event_windows import (
+    estimate_event_tokens,
+    split_event_windows,
+)
+
+
+def make_event(index: int, timestamp: float = 0.0, length: int = 76) -> CognitiveEvent:
+    content = f"{index:0{length}d}"
+    return CognitiveEvent(
+        event_id=f"event_{index}",
+        timestamp=timestamp,
+        source="user",
+        event_type="other",
+        modality_type="user",
+        raw_data=UnderstandEventData(
+            type="user", data=content, source="user", timestamp=datetime.now()
+        ),
+        understood_data=UnderstoodData(
+            response_priority="low",
+            main_content=content,
+            current_situation="",
+            event_entity="",
+            key_entities=[],
+            importance_score=0,
+            memory_query_plan={"query_type": "none"},
+        ),
+        importance_score=0,
+    )
+
+
+def ids(windows):
+    return [
+        [int(event.event_id.split("_")[1]) for event in window] for window in windows
+    ]
+
+
+def test_event_token_estimate():
+    assert estimate_event_tokens(make_event(0)) == 100
+
+
+def test_splits_by_token_budget_without_overlap():
+    events = [make_event(i) for i in range(10)]
+    windows = split_event_windows(events, max_tokens=300, overlap=0)
+    assert ids(windows) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+
+
+def test_adjacent_windows_overlap():
+    events = [make_event(i) for i in range(8)]
+    windows = split_event_windows(events, max_tokens=400, overlap=1)
+    assert ids(windows) == [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7]]
+
+
+def test_overlap_never_fills_the_budget():
+    events = [make_event(i) for i in range(5)]
+    windows = split_event_windows(events, max_tokens=200, overlap=3)
+    # 重叠部分被裁剪，每个窗口至少有一个新事件，不会无限循环
+    assert ids(windows) == [[0, 1], [1, 2], [2, 3], [3, 4]]
+    assert all(
+        sum(estimate_event_tokens(event) for event in window) <= 200
+        for window in windows
+    )
+
+
+def test_splits_by_time_span():
+    events = [make_event(i, timestamp=i * 10.0) for i in range(6)]
+    windows = split_event_windows(events, max_tokens=0, max_seconds=25, overlap=0)
+    assert ids(windows) == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_single_window_when_within_limits():
+    events = [make_event(i) for i in range(3)]
+    assert ids(split_event_windows(events, max_tokens=3000)) == [[0, 1, 2]]
+    assert split_event_windows([]) == []
+
+
+class WindowExtraction:
+    """每个窗口为其中的事件生成记忆，记录收到的窗口"""
+
+    def __init__(self):
+        self.windows = []
+
+    def extract_memories(self, extraction_input):
+        events = extraction_input.recent_events
+        self.windows.append([event.event_id for event in events])
+        return [
+            EpisodicMemoriesGenerateModels(
+                id=event.event_id,
+                content=event.get_understood("main_content"),
+                importance=50,
+                keywords=[],
+                associations=[],
+            )
+            for event in events
+        ]
+
+
+def test_windows_are_extracted_in_parallel_and_merged():
+    core = CognitiveCore(
+        CognitiveCoreConfig(extraction_window_tokens=300, extraction_window_overlap=1)
+    )
+    extraction = WindowExtraction()
+    core.register_plugin("memory_extraction", extraction)
+
+    events = [make_event(i) for i in range(7)]
+    result = core._extract_episodic_memories(
+        ExtractMemoriesInput(
+            current_situation="", recent_events=events, active_goals=[]
+        )
+    )
+
+    assert core.stats["last_extraction_windows"] == 3
+    assert len(extraction.windows) == 3
+    # 重叠窗口中的同一事件只保留一条记忆
+    assert sorted(memory.id for memory in result) == [f"event_{i}" for i in range(7)]
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from lll_cognitive_core.core.fair_worker_pool import FairWorkerPool
+
+from .helpers import wait_until
+
+
+def test_timers_submit_in_due_order():
+    pool = FairWorkerPool(num_workers=2)
+    ran = []
+    lock = threading.Lock()
+
+    def record(name):
+        with lock:
+            ran.append((name, threading.current_thread().name))
+
+    start = time.time()
+    pool.submit_after(0.2, "session", record, "late")
+    pool.submit_after(0.05, "session", record, "early")
+    pool.submit("session", record, "now")
+
+    assert wait_until(lambda: len(ran) == 3, timeout=5)
+    assert [name for name, _ in ran] == ["now", "early", "late"]
+    # 到期的任务在工作线程中执行
+    assert all(thread.startswith("cognitive-worker") for _, thread in ran)
+    assert time.time() - start >= 0.2
+    assert pool.get_stats()["pending_timers"] == 0
+    pool.shutdown()
+
+
+def test_shutdown_drops_pending_timers():
+    pool = FairWorkerPool(num_workers=1)
+    ran = []
+    pool.submit_after(60, "session", ran.append, "never")
+
+    pool.shutdown()
+    assert ran == []
+    assert not pool._timer_thread.is_alive()
@@ -0,0 +1,185 @@
+import time
+from datetime import datetime
+
+import pytest
+from lll_simple_ai_shared import UnderstoodData
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import CoreStatus, UnderstandEventData
+from lll_cognitive_core.core.fair_worker_pool import FairWorkerPool
+from lll_cognitive_core.core.fast_path_rules import (
+    DEFAULT_FAST_PATH_RULES,
+    FastPathEngine,
+    FastPathRule,
+)
+
+from .helpers import EchoUnderstanding, RecordingBehavior, wait_until
+
+RULES = [
+    {"name": "ignore_heartbeat", "action": "skip", "match": {"type": "heartbeat"}},
+    {
+        "name": "greet",
+        "action": "canned",
+        "match": {"type": "user"},
+        "data_pattern": "^hello",
+        "plan": [{"type": "tts", "action": "speak", "data": "hi"}],
+    },
+    {
+        "name": "ambient",
+        "action": "defer",
+        "match": {"type": "sensor", "response_priority": "low"},
+    },
+]
+
+
+class PriorityUnderstanding(EchoUnderstanding):
+    """传感器事件理解为低优先级，其他事件为高优先级"""
+
+    def understand_event(self, event_input):
+        understood = super().understand_event(event_input)
+        if event_input.understand_event.type == "sensor":
+            understood.response_priority = "low"
+        return understood
+
+
+def make_event(type: str = "user", data: str = "x") -> UnderstandEventData:
+    return UnderstandEventData(
+        type=type, data=data, source="test", timestamp=datetime.now()
+    )
+
+
+def make_core(**config) -> CognitiveCore:
+    core = CognitiveCore(
+        CognitiveCoreConfig(
+            batch_understanding_threshold=0, fast_path_rules=RULES, **config
+        )
+    )
+    core.register_plugin("event_understanding", PriorityUnderstanding())
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    core.status = CoreStatus.AWARE
+    return core
+
+
+def receive(core: CognitiveCore, type: str, data: str = "x", count: int = 1):
+    for _ in range(count):
+        core.receive_event({"type": type, "data": data})
+    core._process_events()
+
+
+def behavior_calls(core: CognitiveCore) -> int:
+    return len(core.get_plugin("behavior_generation").inputs)
+
+
+def test_understood_field_does_not_fall_back_to_event_data():
+    rule = FastPathRule(name="r", action="skip", match={"event_type": "user"})
+    understood = EchoUnderstanding().understood("x")
+    assert not rule.matches(make_event(type="user"), understood)
+
+
+def test_unknown_match_field_is_rejected():
+    with pytest.raises(ValueError):
+        FastPathRule(name="r", action="skip", match={"expected_response": "none"})
+
+
+def test_default_rules_are_valid():
+    engine = FastPathEngine(DEFAULT_FAST_PATH_RULES)
+    understood = UnderstoodData(
+        event_type="other",
+        response_priority="low",
+        main_content="noise",
+        current_situation="",
+        event_entity="",
+        key_entities=[],
+        importance_score=5,
+        memory_query_plan={"query_type": "none"},
+    )
+    assert engine.evaluate(make_event(), understood).name == "low_priority_background"
+
+
+def test_skip_does_not_generate_behavior():
+    core = make_core()
+    receive(core, "heartbeat", count=3)
+
+    assert behavior_calls(core) == 0
+    assert len(core.working_memory.recent_events) == 3
+
+
+def test_canned_plan_is_executed_without_behavior_generation():
+    core = make_core()
+    receive(core, "user", "hello there")
+
+    assert behavior_calls(core) == 0
+    assert [event.source for event in core.working_memory.recent_events] == [
+        "",
+        "me",
+    ]
+    assert core.working_memory.recent_events[-1].get_understood("main_content") == "hi"
+
+    # 不满足 data_pattern 的事件走完整流程
+    receive(core, "user", "bye")
+    assert behavior_calls(core) == 1
+
+
+def test_deferred_events_flush_at_batch_size():
+    core = make_core(fast_path_defer_batch_size=3, fast_path_defer_max_wait=60)
+    receive(core, "sensor", count=2)
+    assert behavior_calls(core) == 0
+
+    receive(core, "sensor")
+    assert behavior_calls(core) == 1
+    assert core.stats["deferred_batches"] == 1
+    # 一次行为生成看到整批暂存的事件
+    assert len(core.get_plugin("behavior_generation").inputs[0].recent_events) == 3
+
+
+def test_deferred_events_flush_after_max_wait():
+    core = make_core(fast_path_defer_batch_size=10, fast_path_defer_max_wait=0.05)
+    receive(core, "sensor")
+    core._flush_deferred_events()
+    assert behavior_calls(core) == 0
+
+    time.sleep(0.06)
+    core._flush_deferred_events()
+    assert behavior_calls(core) == 1
+
+
+def test_rule_hit_counters():
+    core = make_core(fast_path_defer_batch_size=10, fast_path_defer_max_wait=60)
+    receive(core, "heartbeat", count=2)
+    receive(core, "user", "hello")
+    receive(core, "sensor")
+    receive(core, "user", "bye")
+
+    stats = core.fast_path.get_stats()
+    assert stats["rule_hits"] == {"ignore_heartbeat": 2, "greet": 1, "ambient": 1}
+    assert stats["skip"] == 2
+    assert stats["canned"] == 1
+    assert stats["defer"] == 1
+    assert stats["matched"] == 4
+    # 预设行为计划中执行的动作不经过规则匹配
+    assert stats["evaluated"] == 5
+
+
+def test_deferred_events_flush_in_pool_without_new_events():
+    pool = FairWorkerPool(num_workers=2)
+    core = CognitiveCore(
+        CognitiveCoreConfig(
+            batch_understanding_threshold=0,
+            fast_path_rules=RULES,
+            fast_path_defer_batch_size=10,
+            fast_path_defer_max_wait=0.1,
+        ),
+        worker_pool=pool,
+    )
+    core.register_plugin("event_understanding", PriorityUnderstanding())
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    core.wake_up()
+
+    # 只有一个暂存事件，之后没有新事件，由定时迭代在等待超时后处理
+    core.receive_event({"type": "sensor", "data": "x"})
+    assert wait_until(lambda: core.stats["events_processed"] == 1, timeout=5)
+    assert behavior_calls(core) == 0
+    assert wait_until(lambda: behavior_calls(core) == 1, timeout=5)
+    assert core.stats["deferred_batches"] == 1
+    pool.shutdown()
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from lll_cognitive_core.config.create_openai_config import CreateOpenaiConfig
+from lll_cognitive_core.utils.get_chat_response import (
+    GetChatResponseInput,
+    get_chat_response_stream,
+)
+from lll_cognitive_core.utils.usage_tracker import UsageTracker, usage_scope
+
+
+class Plan(BaseModel):
+    plan: list
+
+
+class RecordingClient:
+    """记录调用参数，把 content 拆成两个流式分块返回"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        middle = len(self.content) // 2
+        return [
+            SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=part))],
+                usage=None,
+            )
+            for part in (self.content[:middle], self.content[middle:])
+        ]
+
+
+def stream(client):
+    items = []
+    result = get_chat_response_stream(
+        GetChatResponseInput(
+            client=client,
+            config=CreateOpenaiConfig("http://test", "TEST_KEY", "test", []),
+            input_template="{value}",
+            format_inputs_func=lambda inputs: inputs,
+            inputs={"value": "test"},
+            data_model=Plan,
+        ),
+        "plan",
+        items.append,
+    )
+    return result, items
+
+
+class RejectingClient(RecordingClient):
+    """不支持 stream_options 的兼容服务"""
+
+    def create(self, **kwargs):
+        if "stream_options" in kwargs:
+            self.calls.append(kwargs)
+            error = Exception("Unrecognized request argument: stream_options")
+            error.status_code = 400
+            raise error
+        return super().create(**kwargs)
+
+
+def test_requests_stream_usage():
+    client = RecordingClient('{"plan": [{"a": 1}, {"b": 2}]}')
+
+    result, items = stream(client)
+    assert items == [{"a": 1}, {"b": 2}]
+    assert result.plan == items
+    assert len(client.calls) == 1
+    assert client.calls[0]["stream_options"] == {"include_usage": True}
+
+
+def test_retries_without_stream_options_when_rejected():
+    client = RejectingClient('{"plan": [{"a": 1}, {"b": 2}]}')
+
+    with usage_scope(UsageTracker(), session_id="s"):
+        result, items = stream(client)
+    assert items == [{"a": 1}, {"b": 2}]
+    assert result.plan == items
+    assert len(client.calls) == 2
+    assert "stream_options" not in client.calls[1]
@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("flask", "openai", "jinja2")
+
+
+def loaded_after_import(statement: str):
+    """在新的解释器中执行导入，返回已加载的重量级模块"""
+    code = (
+        "import json, sys\n"
+        f"{statement}\n"
+        f"loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n"
+        "print(json.dumps(loaded))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_package_import_is_lazy():
+    assert loaded_after_import("import lll_cognitive_core") == []
+
+    # 访问属性时才导入对应的子模块
+    loaded = loaded_after_import(
+        "from lll_cognitive_core import CognitiveCore, create_cognitive_app"
+    )
+    assert "flask" in loaded
+
+
+def test_memory_manager_import_skips_web_and_model_clients():
+    loaded = loaded_after_import(
+        "from lll_cognitive_core.plugins import CognitiveCorePluginDefaultMemoryManager"
+    )
+    assert loaded == []
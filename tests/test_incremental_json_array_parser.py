@@ -0,0 +1,78 @@
+import json
+
+from lll_cognitive_core.utils.incremental_json_array_parser import (
+    IncrementalJsonArrayParser,
+)
+
+
+def feed_chunks(chunks, key: str = "plan"):
+    parser = IncrementalJsonArrayParser(key)
+    results = [parser.feed(chunk) for chunk in chunks]
+    return parser, results
+
+
+def feed_by_char(text: str, key: str = "plan"):
+    parser, results = feed_chunks(list(text), key)
+    return [item for items in results for item in items]
+
+
+def test_items_emitted_as_soon_as_complete():
+    parser, results = feed_chunks(
+        ['{"plan": [{"a": 1}, {"b"', ": 2}", "]}"],
+    )
+    assert results == [[{"a": 1}], [{"b": 2}], []]
+    assert json.loads(parser.text) == {"plan": [{"a": 1}, {"b": 2}]}
+
+
+def test_braces_and_brackets_inside_strings():
+    plan = [{"data": "{not] an [object}"}, {"data": "}]}"}]
+    text = json.dumps({"plan": plan})
+    assert feed_by_char(text) == plan
+
+
+def test_escaped_quotes_in_strings():
+    plan = [{"data": 'say "hi" \\ {'}, {"data": '\\"}'}]
+    text = json.dumps({"plan": plan})
+    assert feed_by_char(text) == plan
+
+
+def test_chunk_boundary_inside_escape_sequence():
+    text = '{"plan": [{"data": "a\\"}b"}, {"data": "\\u4f60"}]}'
+    backslash = text.index("\\")
+    # 在转义符和被转义的引号之间切分
+    _, results = feed_chunks([text[: backslash + 1], text[backslash + 1 :]])
+    assert results == [[], [{"data": 'a"}b'}, {"data": "你"}]]
+
+    unicode_escape = text.index("\\u")
+    _, results = feed_chunks([text[: unicode_escape + 3], text[unicode_escape + 3 :]])
+    assert results == [[{"data": 'a"}b'}], [{"data": "你"}]]
+
+
+def test_nested_arrays_and_objects_are_one_item():
+    plan = [
+        {"type": "motor", "data": {"joints": [1, [2, 3]], "meta": {"k": "v"}}},
+        {"type": "tts", "data": "ok"},
+    ]
+    text = json.dumps({"plan": plan})
+    assert feed_by_char(text) == plan
+
+
+def test_ignores_other_keys_and_nested_key_names():
+    text = json.dumps(
+        {
+            "other": [{"x": 1}],
+            "meta": {"plan": [{"y": 2}]},
+            "current_situation": "plan",
+            "plan": [{"z": 3}],
+        }
+    )
+    assert feed_by_char(text) == [{"z": 3}]
+
+
+def test_truncated_stream_keeps_complete_items():
+    text = '{"plan": [{"a": 1}, {"b": "unfinished'
+    parser, results = feed_chunks([text])
+    assert results == [[{"a": 1}]]
+    assert parser.text == text
+    # 截断后的文本不是合法的JSON，由调用方处理
+    assert parser.feed("") == []
@@ -0,0 +1,97 @@
+import pytest
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cache_memory_manager import CacheMemoryManager
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.keyword_dictionary import (
+    KeywordDictionary,
+    normalize_keyword,
+)
+from lll_cognitive_core.plugins.cognitive_core_plugin_default_memory_manager import (
+    CognitiveCorePluginDefaultMemoryManager,
+)
+
+from .helpers import day, make_memory
+
+
+@pytest.mark.parametrize(
+    "keyword, expected",
+    [
+        ("ＰＹＴＨＯＮ", "python"),
+        ("Machine-Learning!", "machine learning"),
+        ("apples", "apple"),
+        ("boxes", "box"),
+        ("cities", "city"),
+        ("movies", "movie"),
+        ("news", "news"),
+        ("series", "series"),
+        ("species", "species"),
+        ("status", "status"),
+        ("天气预报", "天气预报"),
+    ],
+)
+def test_normalize_keyword(keyword, expected):
+    assert normalize_keyword(keyword) == expected
+
+
+def test_plural_and_singular_share_a_term():
+    dictionary = KeywordDictionary()
+    for singular, plural in (("movie", "movies"), ("city", "cities")):
+        assert dictionary.intern(singular) == dictionary.intern(plural)
+    assert dictionary.intern("news") != dictionary.intern("new")
+
+
+def test_prefix_and_fuzzy_matching_are_opt_in():
+    dictionary = KeywordDictionary()
+    dictionary.intern("python")
+    dictionary.intern("pythonic")
+    assert dictionary.lookup("pyth") == []
+    assert dictionary.lookup("pyhton") == []
+
+    dictionary = KeywordDictionary(prefix_min_length=3, fuzzy_max_edits=1)
+    python = dictionary.intern("python")
+    pythonic = dictionary.intern("pythonic")
+    assert set(dictionary.lookup("pyth")) == {python, pythonic}
+    assert dictionary.lookup("pyhton") == [python]
+
+
+def test_cache_clear_keeps_shared_dictionary(tmp_path):
+    dictionary = KeywordDictionary()
+    memory_manager = CognitiveCorePluginDefaultMemoryManager(
+        str(tmp_path), keyword_dictionary=dictionary
+    )
+    memory_manager.save_episodic_memories([make_memory(0, ["python"])])
+
+    cache = CacheMemoryManager(keyword_dictionary=dictionary)
+    cache.save_episodic_memories([make_memory(1, ["weather"])])
+    cache.clear()
+
+    # 文件管理器索引中的词项ID仍然有效
+    assert dictionary.get_id("python") is not None
+    results = memory_manager.query_episodic_memories(
+        [day(0), day(0)], keywords=["python"]
+    )
+    assert [memory.id for memory in results] == ["memory_0"]
+    assert cache.query_episodic_memories([day(0), day(0)], keywords=["weather"]) == []
+
+
+def test_owned_dictionary_is_cleared_with_cache():
+    cache = CacheMemoryManager()
+    cache.save_episodic_memories([make_memory(0, ["python"])])
+    cache.clear()
+    assert len(cache.keyword_dictionary) == 0
+
+
+def test_config_reaches_memory_manager_dictionary(tmp_path):
+    core = CognitiveCore(
+        CognitiveCoreConfig(keyword_prefix_min_length=4, keyword_fuzzy_max_edits=1)
+    )
+    memory_manager = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    core.register_plugin("memory_manager", memory_manager)
+
+    for dictionary in (
+        core.episodic_memory_manager.keyword_dictionary,
+        memory_manager.keyword_dictionary,
+    ):
+        assert dictionary.prefix_min_length == 4
+        assert dictionary.fuzzy_max_edits == 1
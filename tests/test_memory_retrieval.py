@@ -0,0 +1,94 @@
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import CoreStatus
+from lll_cognitive_core.plugins.cognitive_core_plugin_default_memory_manager import (
+    CognitiveCorePluginDefaultMemoryManager,
+)
+
+from .helpers import (
+    CountingRecall,
+    EchoUnderstanding,
+    RecordingBehavior,
+    make_recent_memory,
+)
+
+
+def make_core(tmp_path, query_type: str, **config) -> CognitiveCore:
+    core = CognitiveCore(CognitiveCoreConfig(batch_understanding_threshold=0, **config))
+    memory_manager = CognitiveCorePluginDefaultMemoryManager(str(tmp_path))
+    memory_manager.save_episodic_memories(
+        [make_recent_memory(i, ["python"], days_ago=i) for i in range(5)]
+        + [make_recent_memory(100, ["python"], days_ago=30)]
+    )
+    core.register_plugin("memory_manager", memory_manager)
+    core.register_plugin(
+        "event_understanding",
+        EchoUnderstanding(
+            {
+                "query_type": query_type,
+                "query_triggers": ["Python"],
+                "time_range": [0, 7],
+            }
+        ),
+    )
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    core.status = CoreStatus.AWARE
+    return core
+
+
+def process(core: CognitiveCore, data: str = "python?"):
+    core.receive_event({"type": "user", "data": data})
+    core._process_events()
+    return core.get_plugin("behavior_generation").inputs[-1]
+
+
+def test_fresh_query_reaches_memory_manager_and_ranking(tmp_path):
+    core = make_core(tmp_path, "long_term_fresh", ranked_memories_top_k=3)
+
+    behavior_input = process(core)
+
+    memories = behavior_input.episodic_memories
+    # [0, 7] 表示最近7天，30天前的记忆不在范围内；排序后只保留3条
+    assert len(memories) == 3
+    assert {memory.id for memory in memories} <= {f"memory_{i}" for i in range(5)}
+    assert core.stats["memories_ranked_out"] == 2
+    # 查到的记忆写入缓存
+    assert len(core.episodic_memory_manager.episodic_memory.episodic_memories) == 5
+
+
+def test_cached_query_reads_cache(tmp_path):
+    core = make_core(tmp_path, "long_term_fresh")
+    process(core)
+
+    core.get_plugin("event_understanding").memory_query_plan[
+        "query_type"
+    ] = "long_term_cached"
+    behavior_input = process(core)
+    assert len(behavior_input.episodic_memories) == 5
+
+
+def test_no_query(tmp_path):
+    core = make_core(tmp_path, "none")
+    assert process(core).episodic_memories == []
+
+
+def test_recall_cache_reuses_result_for_same_memories(tmp_path):
+    core = make_core(tmp_path, "long_term_fresh", episodic_memories_direct_threshold=2)
+    recall = CountingRecall()
+    core.register_plugin("associative_recall", recall)
+
+    inputs = [process(core) for _ in range(3)]
+
+    # 记忆集合和情境都没有变化，只有第一次调用插件
+    assert recall.calls == 1
+    assert core.recall_cache.get_stats()["hits"] == 2
+    assert all(
+        behavior_input.episodic_memories_text == "recalled 5"
+        for behavior_input in inputs
+    )
+
+    # 记忆内容变化后缓存失效
+    changed = make_recent_memory(0, ["python", "changed"])
+    core.get_plugin("memory_manager").save_episodic_memories([changed])
+    process(core)
+    assert recall.calls == 2
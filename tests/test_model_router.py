@@ -0,0 +1,117 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from lll_cognitive_core.utils.model_router import ModelRoute, ModelRouter
+from lll_cognitive_core.utils.usage_tracker import UsageTracker, usage_scope
+
+
+def make_router() -> ModelRouter:
+    def route(name, max_pressure=1.0):
+        return ModelRoute(
+            name=name,
+            client=SimpleNamespace(),
+            config=SimpleNamespace(model=name),
+            max_pressure=max_pressure,
+        )
+
+    return ModelRouter(
+        {"event_understanding": [route("large", 0.3), route("small")]},
+        queue_capacity=10,
+    )
+
+
+def test_pressure_is_per_session():
+    router = make_router()
+    tracker = UsageTracker()
+    router.update_signals(0.9, 20, source="busy")
+    router.update_signals(0.1, 0, source="idle")
+
+    with usage_scope(tracker, session_id="busy"):
+        assert router.pressure() == 1.0
+        assert router.select_route("event_understanding").name == "small"
+
+    # 另一个会话繁忙不影响当前会话的路由
+    with usage_scope(tracker, session_id="idle"):
+        assert router.pressure() == 0.1
+        assert router.select_route("event_understanding").name == "large"
+
+    assert router.get_stats()["pressure"] == {"busy": 1.0, "idle": 0.1}
+
+
+def test_expired_signals_are_ignored():
+    router = make_router()
+    router.signal_ttl = -1
+    router.update_signals(0.9, 0)
+    assert router.pressure() == 0.0
+
+
+class SlowStream:
+    """每个分块间隔 delay 秒的流"""
+
+    def __init__(self, chunks, delay, error: Exception = None):
+        self.chunks = chunks
+        self.delay = delay
+        self.error = error
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+class StreamClient:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def create_chat_completion(self, build_messages, stage="", **kwargs):
+        raise NotImplementedError
+
+    def create_chat_completion_stream(self, build_messages, stage="", **kwargs):
+        return self.stream
+
+
+def make_stream_router(stream) -> ModelRouter:
+    route = ModelRoute(name="stream", client=StreamClient(stream), latency_budget=1)
+    return ModelRouter({"behavior_generation": [route]})
+
+
+def route_stats(router: ModelRouter):
+    return router.get_stats()["stages"]["behavior_generation"]["routes"]["stream"]
+
+
+def test_stream_latency_is_recorded_when_exhausted():
+    router = make_stream_router(SlowStream(["a", "b", "c"], delay=0.05))
+    stream = router.create_chat_completion_stream(None, stage="behavior_generation")
+
+    # 创建流时还没有读完，不记录延迟
+    assert route_stats(router)["latency_avg"] == 0.0
+    assert list(stream) == ["a", "b", "c"]
+    assert route_stats(router)["latency_avg"] >= 0.15
+    assert router.stage_routes["behavior_generation"][0].latency_p95() >= 0.15
+
+
+def test_stream_error_is_counted_as_failure():
+    router = make_stream_router(
+        SlowStream(["a"], delay=0, error=RuntimeError("connection reset"))
+    )
+
+    with pytest.raises(RuntimeError):
+        list(router.create_chat_completion_stream(None, stage="behavior_generation"))
+    stats = route_stats(router)
+    assert stats["failures"] == 1
+    assert stats["latency_avg"] == 0.0
+
+
+def test_closed_stream_records_latency_once():
+    router = make_stream_router(SlowStream(["a", "b"], delay=0))
+    with router.create_chat_completion_stream(
+        None, stage="behavior_generation"
+    ) as stream:
+        for chunk in stream:
+            break
+    stream.close()
+    assert len(router.stage_routes["behavior_generation"][0]._latencies) == 1
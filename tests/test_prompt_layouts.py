@@ -0,0 +1,226 @@
+from collections import Counter
+
+import pytest
+from jinja2 import Template
+from lll_simple_ai_shared import (
+    associative_recall_system_template,
+    associative_recall_task_format_inputs,
+    behavior_system_template,
+    behavior_task_format_inputs,
+    extract_events_string,
+    extract_memories_system_template,
+    extract_memories_task_format_inputs,
+    understand_system_template,
+    understand_task_format_inputs,
+)
+
+from lll_cognitive_core.core import data_structures
+from lll_cognitive_core.core.data_structures import (
+    AssociativeRecallInput,
+    ExtractMemoriesInput,
+    GenerateBehaviorInput,
+    Goal,
+    UnderstandEventData,
+    UnderstandEventInput,
+)
+from lll_cognitive_core.utils import prompt_layouts
+from lll_cognitive_core.utils.generate_template_prompt import generate_template_prompt
+from lll_cognitive_core.utils.prompt_stats import PromptStats, common_prefix_length
+from lll_cognitive_core.utils.render_events_prompt import render_events_prompt
+
+from .helpers import BASE_TIME, make_event, make_memory
+
+GOAL = Goal(
+    goal_id="goal_1",
+    goal_type="task",
+    description="整理厨房",
+    priority=1,
+    status="active",
+    subgoals=[],
+    constraints=[],
+    success_criteria=[],
+    created_time=0.0,
+    deadline=None,
+)
+
+
+def make_events(count: int):
+    return [
+        make_event(i, entity="user" if i % 2 else "assistant") for i in range(count)
+    ]
+
+
+def lines(text: str) -> Counter:
+    return Counter(line for line in text.splitlines() if line.strip())
+
+
+def baseline_prompt(system_template: str, format_inputs, inputs) -> str:
+    """共享模板和共享格式化函数渲染的提示词"""
+    return Template(system_template).render(**format_inputs(inputs))
+
+
+def test_event_fragments_are_rendered_once(monkeypatch):
+    calls = []
+    render = data_structures.safe_event_to_string
+    monkeypatch.setattr(
+        data_structures,
+        "safe_event_to_string",
+        lambda event: calls.append(event) or render(event),
+    )
+    events = make_events(5)
+
+    first = render_events_prompt(events)
+    assert render_events_prompt(events) == first
+    assert render_events_prompt(events, with_id=True).count("ID: ") == 5
+    assert len(calls) == 5
+
+    # 理解数据改变后只重新渲染该事件
+    events[2].understood_data = make_event(
+        2, "changed", entity="assistant"
+    ).understood_data
+    updated = render_events_prompt(events)
+    assert len(calls) == 6
+    assert "内容: changed" in updated
+    assert updated.replace("内容: changed", "内容: event 2") == first
+
+
+def test_events_render_like_shared_extractors():
+    events = make_events(4)
+    dumped = [event.to_dict() for event in events]
+
+    assert render_events_prompt(events) == extract_events_string(dumped)
+    assert (
+        render_events_prompt(events, with_id=True)
+        == extract_memories_task_format_inputs({"recent_events": dumped})[
+            "recent_events"
+        ]
+    )
+    assert render_events_prompt([]) == extract_events_string([])
+
+
+@pytest.mark.parametrize(
+    "template, format_inputs, system_template, shared_format_inputs, inputs",
+    [
+        (
+            prompt_layouts.UNDERSTAND_PROMPT_TEMPLATE,
+            prompt_layouts.format_understand_inputs,
+            understand_system_template,
+            understand_task_format_inputs,
+            UnderstandEventInput(
+                understand_event=UnderstandEventData(
+                    type="asr", data="把灯打开", source="user", timestamp=BASE_TIME
+                ),
+                recent_events=make_events(3),
+                active_goals=[GOAL],
+            ),
+        ),
+        (
+            prompt_layouts.ASSOCIATIVE_RECALL_PROMPT_TEMPLATE,
+            prompt_layouts.format_associative_recall_inputs,
+            associative_recall_system_template,
+            associative_recall_task_format_inputs,
+            AssociativeRecallInput(
+                current_situation="用户在厨房",
+                recent_events=make_events(3),
+                episodic_memories=[make_memory(1), make_memory(2)],
+                active_goals=[GOAL],
+            ),
+        ),
+        (
+            prompt_layouts.BEHAVIOR_PROMPT_TEMPLATE,
+            prompt_layouts.format_behavior_inputs,
+            behavior_system_template,
+            behavior_task_format_inputs,
+            GenerateBehaviorInput(
+                current_situation="用户在厨房",
+                recent_events=make_events(3),
+                episodic_memories=[make_memory(1)],
+                episodic_memories_text="昨天也开过灯",
+                active_goals=[GOAL],
+                social_norms=["说话礼貌"],
+            ),
+        ),
+        (
+            prompt_layouts.EXTRACT_MEMORIES_PROMPT_TEMPLATE,
+            prompt_layouts.format_extract_memories_inputs,
+            extract_memories_system_template,
+            extract_memories_task_format_inputs,
+            ExtractMemoriesInput(
+                current_situation="用户在厨房",
+                recent_events=make_events(3),
+                active_goals=[GOAL],
+            ),
+        ),
+    ],
+)
+def test_layouts_keep_shared_content(
+    template, format_inputs, system_template, shared_format_inputs, inputs
+):
+    prompt = generate_template_prompt(template, format_inputs, inputs)
+
+    dumped = inputs.model_dump(mode="json")
+    if "understand_event" in dumped:
+        # 共享格式化函数从 text 字段读取待理解的内容
+        dumped["understand_event"]["text"] = dumped["understand_event"]["data"]
+    expected = baseline_prompt(system_template, shared_format_inputs, dumped)
+
+    # 除了段落顺序和新增的输出格式说明，共享模板的每一行都保留
+    assert lines(expected) - lines(prompt) == Counter()
+
+
+def test_sections_are_ordered_from_stable_to_volatile():
+    events = make_events(4)
+    inputs = GenerateBehaviorInput(
+        current_situation="用户在厨房",
+        recent_events=events,
+        episodic_memories=[],
+        episodic_memories_text="昨天也开过灯",
+        active_goals=[GOAL],
+        social_norms=["说话礼貌"],
+    )
+    prompt = generate_template_prompt(
+        prompt_layouts.BEHAVIOR_PROMPT_TEMPLATE,
+        prompt_layouts.format_behavior_inputs,
+        inputs,
+    )
+    sections = ["【你正在做的事】", "【社交规范】", "【刚才的对话和事件】"]
+    sections += ["【当前情境】", "【相关的历史记忆】"]
+    positions = [prompt.index(section) for section in sections]
+    assert positions == sorted(positions)
+
+    # 追加事件、情境变化后，事件段落之前的内容都是上一次提示词的前缀
+    inputs.recent_events = events + [make_event(4)]
+    inputs.current_situation = "用户离开了厨房"
+    next_prompt = generate_template_prompt(
+        prompt_layouts.BEHAVIOR_PROMPT_TEMPLATE,
+        prompt_layouts.format_behavior_inputs,
+        inputs,
+    )
+    assert next_prompt.startswith(prompt[: prompt.index("\n\n【当前情境】")])
+
+
+def test_instructions_require_the_first_section():
+    with pytest.raises(ValueError):
+        prompt_layouts._instructions(
+            behavior_system_template,
+            prompt_layouts.behavior_output_json_template,
+            "【不存在的段落】",
+        )
+
+
+def test_prompt_stats():
+    assert common_prefix_length("abcdef", "abcxyz") == 3
+    assert common_prefix_length("", "abc") == 0
+    assert common_prefix_length("abc", "abc") == 3
+
+    stats = PromptStats()
+    assert stats.get_stats()["renders"] == 0
+    stats.record("abcdef", 0.1)
+    stats.record("abcxyz", 0.3)
+
+    result = stats.get_stats()
+    assert result["renders"] == 2
+    assert result["average_render_time"] == pytest.approx(0.2)
+    assert result["average_prompt_chars"] == 6
+    assert result["last_prefix_stability"] == 0.5
+    assert result["prefix_stability"] == 0.25
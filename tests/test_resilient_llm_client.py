@@ -0,0 +1,221 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+from lll_cognitive_core.config.create_openai_config import CreateOpenaiConfig
+from lll_cognitive_core.utils.resilient_llm_client import ResilientLLMClient
+
+
+class FakeChatServer:
+    """
+    OpenAI 兼容的假模型服务
+    latency 为每次响应前的等待秒数，fail 为 True 时返回 500，可以在测试中随时修改
+    """
+
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.requests = 0
+        self.lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                request = json.loads(
+                    self.rfile.read(int(self.headers["Content-Length"]))
+                )
+                with fake.lock:
+                    fake.requests += 1
+                time.sleep(fake.latency)
+                if fake.fail:
+                    self._reply(500, {"error": {"message": "injected failure"}})
+                    return
+                self._reply(
+                    200,
+                    {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": fake.name},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": 1,
+                            "completion_tokens": 1,
+                            "total_tokens": 2,
+                        },
+                    },
+                )
+
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    # 客户端已经超时断开
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def endpoint(self):
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        client = OpenAI(api_key="test", base_url=base_url, max_retries=0)
+        return client, CreateOpenaiConfig(base_url, "TEST_KEY", self.name, [])
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def servers():
+    created = [FakeChatServer("primary"), FakeChatServer("secondary")]
+    yield created
+    for server in created:
+        server.close()
+
+
+def make_client(servers, **kwargs) -> ResilientLLMClient:
+    options = {"retry_backoff": 0.01, "default_deadline": 5.0, **kwargs}
+    return ResilientLLMClient([server.endpoint() for server in servers], **options)
+
+
+def complete(client: ResilientLLMClient, **kwargs) -> str:
+    response = client.create_chat_completion(
+        lambda config: [{"role": "user", "content": "hi"}], **kwargs
+    )
+    return response.choices[0].message.content
+
+
+def test_fails_over_to_healthy_endpoint(servers):
+    primary, secondary = servers
+    primary.fail = True
+    client = make_client(servers)
+
+    assert complete(client) == "secondary"
+
+    assert client.endpoints[0].get_stats()["failures"] == 1
+    assert primary.requests == 1
+    assert secondary.requests == 1
+    client.shutdown()
+
+
+def test_circuit_breaker_skips_failing_endpoint(servers):
+    primary, secondary = servers
+    primary.fail = True
+    client = make_client(servers, failure_threshold=2, reset_timeout=60)
+
+    for _ in range(5):
+        assert complete(client) == "secondary"
+    # 连续失败两次后熔断，之后不再请求故障端点
+    assert primary.requests == 2
+    assert secondary.requests == 5
+
+    primary_stats = client.endpoints[0].get_stats()
+    assert primary_stats["circuit"] == "open"
+    assert primary_stats["rejected"] >= 3
+    client.shutdown()
+
+
+def test_deadline_bounds_slow_endpoints(servers):
+    for server in servers:
+        server.latency = 1.0
+    client = make_client(servers, max_retries=0)
+
+    start = time.time()
+    with pytest.raises(Exception):
+        complete(client, deadline=0.2)
+    assert time.time() - start < 0.8
+    client.shutdown()
+
+
+def test_hedges_when_primary_exceeds_p95(servers):
+    primary, secondary = servers
+    client = make_client(servers, hedge_min_samples=3, hedge_min_delay=0.05)
+    for _ in range(3):
+        assert complete(client) == "primary"
+
+    # 主端点突然变慢，超过 p95 延迟后对冲请求先返回
+    primary.latency = 1.0
+    start = time.time()
+    assert complete(client) == "secondary"
+    assert time.time() - start < 0.8
+    assert client.endpoints[1].get_stats()["hedges"] == 1
+    client.shutdown()
+
+
+def test_rejections_are_counted_once_per_call(servers):
+    client = make_client(servers, max_retries=0, failure_threshold=1, reset_timeout=60)
+    for endpoint in client.endpoints:
+        endpoint.breaker.record_failure()
+
+    with pytest.raises(RuntimeError):
+        complete(client)
+    assert [endpoint.get_stats()["rejected"] for endpoint in client.endpoints] == [
+        1,
+        1,
+    ]
+    client.shutdown()
+
+
+def test_does_not_hedge_to_the_slow_endpoint(servers):
+    primary, secondary = servers
+    client = make_client(
+        servers,
+        hedge_min_samples=3,
+        hedge_min_delay=0.05,
+        failure_threshold=1,
+        reset_timeout=60,
+    )
+    for _ in range(3):
+        assert complete(client) == "primary"
+
+    # 另一个端点已熔断，只剩主端点时不对冲
+    client.endpoints[1].breaker.record_failure()
+    primary.latency = 0.3
+    assert complete(client) == "primary"
+    assert primary.requests == 4
+    assert secondary.requests == 0
+    assert client.endpoints[0].get_stats()["hedges"] == 0
+    client.shutdown()
+
+
+def test_timeout_is_counted_only_on_pending_endpoints(servers):
+    primary, secondary = servers
+    client = make_client(servers, max_retries=0, hedge_min_samples=3)
+    for _ in range(3):
+        assert complete(client) == "primary"
+
+    # 主端点在对冲之后失败，对冲请求一直到截止时间都没有返回
+    primary.latency = 0.2
+    primary.fail = True
+    secondary.latency = 1.0
+    with pytest.raises(TimeoutError):
+        complete(client, deadline=0.6)
+
+    primary_stats = client.endpoints[0].get_stats()
+    secondary_stats = client.endpoints[1].get_stats()
+    assert (primary_stats["failures"], primary_stats["timeouts"]) == (1, 0)
+    assert (secondary_stats["hedges"], secondary_stats["timeouts"]) == (1, 1)
+    client.shutdown()
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.data_structures import CoreStatus
+from lll_cognitive_core.core.session_manager import SessionManager
+from lll_cognitive_core.plugins.cognitive_core_plugin_default_memory_manager import (
+    CognitiveCorePluginDefaultMemoryManager,
+)
+
+from .helpers import EchoUnderstanding, RecordingBehavior, wait_until
+
+SESSIONS = 1000
+EVENTS_PER_SESSION = 3
+
+
+def test_thousand_sessions_share_one_pool(tmp_path):
+    def plugin_factory(session_id: str):
+        return {
+            "event_understanding": EchoUnderstanding(),
+            "behavior_generation": RecordingBehavior(),
+            "memory_manager": CognitiveCorePluginDefaultMemoryManager(
+                str(tmp_path / session_id)
+            ),
+        }
+
+    threads_before = threading.active_count()
+    manager = SessionManager(
+        CognitiveCoreConfig(batch_understanding_threshold=0),
+        plugin_factory=plugin_factory,
+        num_workers=8,
+        idle_timeout=60.0,
+        reaper_interval=0,
+    )
+    try:
+        start = time.time()
+        for i in range(EVENTS_PER_SESSION):
+            for session in range(SESSIONS):
+                manager.receive_event(
+                    f"s{session}", {"type": "user", "data": f"s{session}-e{i}"}
+                )
+
+        total = SESSIONS * EVENTS_PER_SESSION
+        cores = lambda: list(manager._sessions.values())
+        assert wait_until(
+            lambda: sum(core.stats["events_processed"] for core in cores()) >= total
+        )
+        elapsed = time.time() - start
+
+        status = manager.get_system_status()
+        assert status["sessions"] == SESSIONS
+        assert status["session_status"] == {"aware": SESSIONS}
+        # 会话不再各自创建处理线程
+        assert threading.active_count() - threads_before < 64
+        assert elapsed < 60
+
+        # 每个会话只看到自己的事件，记忆管理器使用独立的根目录
+        for session in (0, SESSIONS // 2, SESSIONS - 1):
+            core = manager.get_session(f"s{session}")
+            contents = [
+                event.get_understood("main_content")
+                for event in core.working_memory.recent_events
+            ]
+            assert contents == [f"s{session}-e{i}" for i in range(EVENTS_PER_SESSION)]
+            assert core.get_plugin("memory_manager").root_dir == str(
+                tmp_path / f"s{session}"
+            )
+
+        # 空闲会话先睡眠整理，再停放
+        later = time.time() + 120
+        manager.park_idle_sessions(later)
+        assert wait_until(
+            lambda: all(
+                core.status == CoreStatus.AWAITING
+                and core.stats["deep_consolidations_pending"] == 0
+                for core in cores()
+            )
+        )
+        manager.park_idle_sessions(later)
+        assert cores() == []
+        assert manager.stats["sessions_parked"] == SESSIONS
+    finally:
+        manager.shutdown()
@@ -0,0 +1,172 @@
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lll_cognitive_core.utils.consistent_hash_ring import ConsistentHashRing
+from lll_cognitive_core.web.create_shard_router_app import create_shard_router_app
+
+
+class StubWorker:
+    """
+    记录收到的事件和客户端端口，按 status 返回系统状态
+    drop_connections 为 True 时回复后直接关闭连接，模拟对端关闭空闲的长连接
+    """
+
+    def __init__(self, status):
+        self.status = status
+        self.events = []
+        self.status_queries = []
+        self.client_ports = []
+        self.drop_connections = False
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                stub.status_queries.append(urllib.parse.parse_qs(url.query))
+                self.reply({"success": True, "data": stub.status})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.events.append(body)
+                self.reply({"success": True})
+
+            def reply(self, body):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                stub.client_ports.append(self.client_address[1])
+                if stub.drop_connections:
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        # 路由保留的长连接不会主动关闭，关闭服务时不等待处理线程
+        self.server.daemon_threads = True
+        self.server.block_on_close = False
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def workers():
+    stubs = [
+        StubWorker(
+            {
+                "sessions": i + 1,
+                "events_processed": 10 * (i + 1),
+                "queued_events": i,
+                "session_status": {"aware": 1, "awaiting": i},
+            }
+        )
+        for i in range(3)
+    ]
+    yield stubs
+    for stub in stubs:
+        stub.close()
+
+
+def test_events_are_forwarded_to_the_owning_worker(workers):
+    client = create_shard_router_app([worker.url for worker in workers]).test_client()
+    ring = ConsistentHashRing([worker.url for worker in workers])
+
+    for i in range(30):
+        response = client.post(
+            "/receive-event",
+            json={"session_id": f"s{i}", "type": "user", "data": f"event {i}"},
+        )
+        assert response.get_json() == {"success": True}
+
+    for worker in workers:
+        for event in worker.events:
+            assert ring.get_node(event["session_id"]) == worker.url
+    assert sum(len(worker.events) for worker in workers) == 30
+    assert all(worker.events for worker in workers)
+
+
+def test_missing_session_id_is_rejected(workers):
+    client = create_shard_router_app([worker.url for worker in workers]).test_client()
+    response = client.post("/receive-event", json={"type": "user", "data": "x"})
+    assert response.get_json()["success"] is False
+    assert not any(worker.events for worker in workers)
+
+
+def test_session_status_is_forwarded_with_long_poll_arguments(workers):
+    urls = [worker.url for worker in workers]
+    client = create_shard_router_app(urls).test_client()
+    owner = workers[urls.index(ConsistentHashRing(urls).get_node("s1"))]
+
+    response = client.get("/get-system-status?session_id=s1&version=3&timeout=0.1")
+    assert response.get_json()["data"] == owner.status
+    assert owner.status_queries == [
+        {"session_id": ["s1"], "version": ["3"], "timeout": ["0.1"]}
+    ]
+
+
+def test_status_is_aggregated_over_workers(workers):
+    urls = [worker.url for worker in workers]
+    unreachable = StubWorker({})
+    unreachable.close()
+    client = create_shard_router_app(urls + [unreachable.url]).test_client()
+
+    data = client.get("/get-system-status").get_json()["data"]
+    assert data["sessions"] == 6
+    assert data["events_processed"] == 60
+    assert data["queued_events"] == 3
+    assert data["session_status"] == {"aware": 3, "awaiting": 3}
+    assert data["workers"][urls[0]] == workers[0].status
+    assert "error" in data["workers"][unreachable.url]
+
+
+def test_forwarding_reuses_worker_connections(workers):
+    urls = [worker.url for worker in workers]
+    client = create_shard_router_app(urls).test_client()
+
+    for i in range(20):
+        client.post("/receive-event", json={"session_id": "s1", "data": f"{i}"})
+    owner = workers[urls.index(ConsistentHashRing(urls).get_node("s1"))]
+    assert len(owner.events) == 20
+    # 顺序转发时一直复用同一个连接
+    assert len(set(owner.client_ports)) == 1
+
+    connections = client.get("/get-system-status").get_json()["data"]["connections"]
+    assert connections[owner.url]["requests"] == 21
+    assert connections[owner.url]["connections"] == 1
+
+
+def test_closed_idle_connection_is_replaced(workers):
+    urls = [worker.url for worker in workers]
+    client = create_shard_router_app(urls).test_client()
+    owner = workers[urls.index(ConsistentHashRing(urls).get_node("s1"))]
+    owner.drop_connections = True
+
+    for i in range(3):
+        response = client.post(
+            "/receive-event", json={"session_id": "s1", "data": f"{i}"}
+        )
+        assert response.get_json() == {"success": True}
+    # 每个事件只投递一次
+    assert [event["data"] for event in owner.events] == ["0", "1", "2"]
+    # 第一次之后每次请求都先用到已被关闭的连接，包括汇总状态的请求
+    connections = client.get("/get-system-status").get_json()["data"]["connections"]
+    assert connections[owner.url]["reconnects"] == 3
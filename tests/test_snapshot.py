@@ -0,0 +1,141 @@
+import threading
+import time
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import CoreStatus, WorkingMemory
+from lll_cognitive_core.core.fair_worker_pool import FairWorkerPool
+from lll_cognitive_core.core.snapshot_store import (
+    dump_working_memory,
+    load_working_memory,
+)
+
+from .helpers import EchoUnderstanding, RecordingBehavior, make_event, wait_until
+
+
+def make_core(tmp_path) -> CognitiveCore:
+    core = CognitiveCore(
+        CognitiveCoreConfig(
+            batch_understanding_threshold=0,
+            snapshot_path=str(tmp_path / "{session_id}.snapshot"),
+            snapshot_interval=0,
+        )
+    )
+    core.register_plugin("event_understanding", EchoUnderstanding())
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    return core
+
+
+class BlockingExtraction:
+    """记忆提取插件，可以阻塞模拟整理进行中崩溃，并记录收到的事件"""
+
+    def __init__(self, block: bool = False):
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+        self.extracted = []
+
+    def extract_memories(self, extraction_input):
+        self.release.wait(5)
+        self.extracted.extend(
+            event.raw_data.data for event in extraction_input.recent_events
+        )
+        return []
+
+
+def wait_for_deep_consolidation(core: CognitiveCore):
+    core._consolidation_executor.shutdown(wait=True)
+
+
+def test_pending_consolidation_survives_restart(tmp_path):
+    core = make_core(tmp_path)
+    crashed_extraction = BlockingExtraction(block=True)
+    core.register_plugin("memory_extraction", crashed_extraction)
+    core.status = CoreStatus.AWARE
+    for i in range(10):
+        core.receive_event({"type": "user", "data": f"event {i}"})
+    while not core.event_queue.empty():
+        core._process_events()
+
+    core.status = CoreStatus.WINDING_DOWN
+    core._check_sleep()
+    assert core.status == CoreStatus.AWAITING
+    assert core.working_memory.recent_events == []
+
+    # 深度整理进行中崩溃，重启后冻结的事件重新整理，不会恢复到新的工作记忆
+    restarted = make_core(tmp_path)
+    extraction = BlockingExtraction()
+    restarted.register_plugin("memory_extraction", extraction)
+    restarted._restore_snapshot()
+    assert restarted.working_memory.recent_events == []
+    wait_for_deep_consolidation(restarted)
+    assert extraction.extracted == [f"event {i}" for i in range(10)]
+    assert restarted.snapshot_store.load()["pending_consolidations"] == []
+
+    crashed_extraction.release.set()
+    wait_for_deep_consolidation(core)
+
+
+def test_failed_consolidation_stays_pending(tmp_path):
+    core = make_core(tmp_path)
+    core.register_plugin("memory_extraction", BlockingExtraction())
+    core._consolidate_memories = lambda *args: False
+    core.status = CoreStatus.AWARE
+    core.receive_event({"type": "user", "data": "event"})
+    core._process_events()
+
+    core.status = CoreStatus.WINDING_DOWN
+    core._check_sleep()
+    wait_for_deep_consolidation(core)
+
+    pending = core.snapshot_store.load()["pending_consolidations"]
+    assert len(pending) == 1
+    assert len(pending[0]["recent_events"]) == 1
+
+
+def test_working_memory_keeps_extraction_watermark():
+    working_memory = WorkingMemory(
+        recent_events=[make_event(i) for i in range(3)], extracted_count=2
+    )
+
+    data = dump_working_memory(working_memory)
+    restored = load_working_memory(data)
+    assert restored.extracted_count == 2
+    assert [event.event_id for event in restored.recent_events] == [
+        "event_0",
+        "event_1",
+        "event_2",
+    ]
+
+    # 旧快照没有该字段时按未提取处理
+    del data["extracted_count"]
+    assert load_working_memory(data).extracted_count == 0
+
+
+def test_idle_pooled_session_saves_periodic_snapshot(tmp_path):
+    pool = FairWorkerPool(num_workers=2)
+    core = CognitiveCore(
+        CognitiveCoreConfig(
+            batch_understanding_threshold=0,
+            snapshot_path=str(tmp_path / "{session_id}.snapshot"),
+            snapshot_interval=0.2,
+        ),
+        worker_pool=pool,
+    )
+    core.register_plugin("event_understanding", EchoUnderstanding())
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    core.wake_up()
+
+    # 之后没有新事件，由定时迭代在间隔到期后保存
+    core.receive_event({"type": "user", "data": "hello"})
+    assert wait_until(lambda: "last_snapshot_time" in core.stats, timeout=5)
+    saved = core.snapshot_store.load()
+    assert [
+        event["raw_data"]["data"] for event in saved["working_memory"]["recent_events"]
+    ] == ["hello"]
+
+    # 状态没有变化时不再重复保存
+    saved_at = core.stats["last_snapshot_time"]
+    time.sleep(0.5)
+    assert core.stats["last_snapshot_time"] == saved_at
+    pool.shutdown()
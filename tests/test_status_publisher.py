@@ -0,0 +1,140 @@
+import threading
+import time
+
+from lll_simple_ai_shared import BehaviorPlan
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import CoreStatus
+from lll_cognitive_core.core.status_publisher import StatusPublisher
+
+from .helpers import EchoUnderstanding
+
+
+class Source:
+    def __init__(self):
+        self.value = 0
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {"value": self.value}
+
+
+def test_version_increments_on_change():
+    source = Source()
+    publisher = StatusPublisher(source.build, min_interval=0)
+
+    assert publisher.publish()
+    assert publisher.version == 1
+    source.value = 1
+    assert publisher.publish()
+
+    snapshot = publisher.latest()
+    assert snapshot.version == 2
+    assert snapshot.status == {"value": 1}
+    assert snapshot.payload == b'{"value":1}'
+
+
+def test_unchanged_payload_keeps_version():
+    source = Source()
+    publisher = StatusPublisher(source.build, min_interval=0)
+    publisher.publish()
+    first = publisher.latest()
+
+    assert not publisher.publish(force=True)
+    assert publisher.version == 1
+    assert publisher.latest().published_at >= first.published_at
+
+
+def test_publish_is_rate_limited():
+    source = Source()
+    publisher = StatusPublisher(source.build, min_interval=60)
+    publisher.publish()
+    source.value = 1
+
+    assert not publisher.publish()
+    assert source.builds == 1
+    assert publisher.latest().status == {"value": 0}
+    # 强制发布不受间隔限制
+    assert publisher.publish(force=True)
+    assert publisher.latest().status == {"value": 1}
+
+
+def test_wait_for_returns_on_new_version():
+    source = Source()
+    publisher = StatusPublisher(source.build, min_interval=0)
+    publisher.publish()
+
+    def publish_later():
+        time.sleep(0.05)
+        source.value = 1
+        publisher.publish()
+
+    thread = threading.Thread(target=publish_later)
+    thread.start()
+    start = time.time()
+    snapshot = publisher.wait_for(1, timeout=5)
+    thread.join()
+
+    assert snapshot.version == 2
+    assert time.time() - start < 5
+
+
+def test_wait_for_times_out_without_new_version():
+    source = Source()
+    publisher = StatusPublisher(source.build, min_interval=0)
+    publisher.publish()
+
+    start = time.time()
+    snapshot = publisher.wait_for(1, timeout=0.05)
+    assert snapshot.version == 1
+    assert time.time() - start >= 0.05
+
+
+def test_consolidation_thread_publishes_while_sleeping():
+    core = CognitiveCore(CognitiveCoreConfig())
+    core.status = CoreStatus.AWAITING
+
+    core._submit_deep_consolidation(core._swap_working_memory())
+    core._consolidation_executor.shutdown(wait=True)
+
+    # 睡眠中没有处理循环，整理线程完成后发布最新统计
+    status = core.get_system_status()
+    assert status["processing_stats"]["deep_consolidations_pending"] == 0
+
+
+class BlockingBehavior:
+    """行为生成阻塞到 release 后才返回"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def generate_behavior(self, behavior_input):
+        self.started.set()
+        self.release.wait(5)
+        return BehaviorPlan(plan=[], current_situation="after behavior")
+
+
+def test_state_lock_is_not_held_during_model_calls():
+    core = CognitiveCore(CognitiveCoreConfig(batch_understanding_threshold=0))
+    behavior = BlockingBehavior()
+    core.register_plugin("event_understanding", EchoUnderstanding())
+    core.register_plugin("behavior_generation", behavior)
+    core.status = CoreStatus.AWARE
+    core.receive_event({"type": "user", "data": "hello"})
+
+    thread = threading.Thread(target=core._run_loop_iteration)
+    thread.start()
+    assert behavior.started.wait(5)
+
+    # 行为生成期间其他线程可以获取状态锁，读到已经加入工作记忆的事件
+    assert core._state_lock.acquire(timeout=1)
+    core._state_lock.release()
+    core._publish_status(force=True)
+    assert core.get_system_status()["working_memory_usage"] == 1
+
+    behavior.release.set()
+    thread.join(5)
+    assert core.working_memory.current_situation == "after behavior"
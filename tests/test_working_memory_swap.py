@@ -0,0 +1,76 @@
+import threading
+
+from lll_cognitive_core.config.cognitive_core_config import CognitiveCoreConfig
+from lll_cognitive_core.core.cognitive_core import CognitiveCore
+from lll_cognitive_core.core.data_structures import CoreStatus
+
+from .helpers import EchoUnderstanding, RecordingBehavior
+
+
+class BlockingExtraction:
+    """阻塞到 release 后才返回，记录每次整理收到的事件"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.extracted = []
+
+    def extract_memories(self, extraction_input):
+        self.started.set()
+        self.release.wait(5)
+        self.extracted.append(
+            [
+                event.get_understood("main_content")
+                for event in extraction_input.recent_events
+            ]
+        )
+        return []
+
+
+def receive(core: CognitiveCore, start: int, count: int):
+    for i in range(start, start + count):
+        core.receive_event({"type": "user", "data": f"event {i}"})
+    while not core.event_queue.empty():
+        core._process_events()
+
+
+def contents(core: CognitiveCore):
+    return [
+        event.get_understood("main_content")
+        for event in core.working_memory.recent_events
+    ]
+
+
+def test_new_session_runs_while_previous_one_consolidates():
+    core = CognitiveCore(CognitiveCoreConfig(batch_understanding_threshold=0))
+    extraction = BlockingExtraction()
+    core.register_plugin("event_understanding", EchoUnderstanding())
+    core.register_plugin("behavior_generation", RecordingBehavior())
+    core.register_plugin("memory_extraction", extraction)
+
+    core.status = CoreStatus.AWARE
+    receive(core, 0, 5)
+    frozen = core.working_memory
+
+    core.status = CoreStatus.WINDING_DOWN
+    core._check_sleep()
+    assert extraction.started.wait(5)
+
+    # 睡眠立即完成，换上空的工作记忆，冻结的工作记忆仍在整理
+    assert core.status == CoreStatus.AWAITING
+    assert core.working_memory is not frozen
+    assert core.working_memory.recent_events == []
+    assert core.working_memory.cognitive_load == 0.0
+    assert core.stats["deep_consolidations_pending"] == 1
+
+    # 新会话可以立即接收和处理事件
+    core.status = CoreStatus.AWARE
+    receive(core, 5, 3)
+    assert contents(core) == ["event 5", "event 6", "event 7"]
+    assert len(frozen.recent_events) == 5
+
+    extraction.release.set()
+    core._consolidation_executor.shutdown(wait=True)
+    assert extraction.extracted == [[f"event {i}" for i in range(5)]]
+    assert core.stats["deep_consolidations_pending"] == 0
+    assert contents(core) == ["event 5", "event 6", "event 7"]